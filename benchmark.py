@@ -0,0 +1,282 @@
+"""
+Benchmark Ponta a Ponta - Trabalho Final Redes de Computadores (UFJF)
+
+Automatiza a avaliação da Questão 6: para cada caso da matriz (tamanho do
+payload × perda × criptografia × algoritmo de congestionamento) sobe o
+servidor em um subprocesso, numa porta efêmera de loopback, transfere os
+pacotes com o Sender (modo pipeline) e mede:
+    - goodput (Mbps de payload entregue)
+    - taxa de retransmissão (retransmitidos / enviados)
+    - latência envio→ACK por pacote (p50 e p99, ms)
+    - CPU (cliente + servidor) por GB transferido
+
+Os resultados saem em JSON; um arquivo de baseline permite acusar regressões.
+
+Uso:
+    python3 benchmark.py                           # Matriz completa (24 casos)
+    python3 benchmark.py --rapido                  # Matriz reduzida
+    python3 benchmark.py --pacotes=20000           # Pacotes por caso (padrão 10000)
+    python3 benchmark.py --saida=resultados.json   # Grava os resultados
+    python3 benchmark.py --salvar-baseline         # Grava benchmark_baseline.json
+    python3 benchmark.py --baseline=arquivo.json --tolerancia=0.2
+                                                   # Compara (código de saída 1 se regrediu)
+    python3 benchmark.py --rapido --rastro=rastros # Rastros binários por caso (ver rastro.py)
+"""
+
+import io
+import os
+import sys
+import json
+import time
+import resource
+import itertools
+import contextlib
+import subprocess
+import tempfile
+import rastro
+from cliente import Sender
+
+SERVER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "servidor.py")
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+SERVER_START_TIMEOUT = 10.0     # Segundos para o servidor anunciar a porta
+DEFAULT_TOLERANCE = 0.15        # Piora relativa tolerada antes de acusar regressão
+
+PAYLOAD_SIZES = (100, 500, 1000)
+LOSS_RATES = (0.0, 0.05)
+CRYPTO_MODES = (False, True)
+CC_ALGORITHMS = ("reno", "cubic")
+
+# Métrica: True se maior é melhor
+METRICS = {
+    "goodput_mbps": True,
+    "retrans_ratio": False,
+    "ack_p50_ms": False,
+    "ack_p99_ms": False,
+    "cpu_s_per_gb": False,
+}
+
+
+def build_matrix(sizes=PAYLOAD_SIZES, losses=LOSS_RATES, crypto=CRYPTO_MODES, ccs=CC_ALGORITHMS):
+    """Casos (payload, perda, cripto, cc) do produto cartesiano."""
+    return [{"payload": size, "loss": loss, "crypto": enc, "cc": cc}
+            for size, loss, enc, cc in itertools.product(sizes, losses, crypto, ccs)]
+
+
+def case_id(case):
+    """Identificador estável do caso (chave no baseline)."""
+    return (f"p{case['payload']}-perda{case['loss']:g}-"
+            f"{'cripto' if case['crypto'] else 'claro'}-{case['cc']}")
+
+
+def _percentile(values, q):
+    """Percentil q (0-100) por vizinho mais próximo; None se vazio."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))]
+
+
+def _children_cpu():
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVIDOR EM SUBPROCESSO
+# ═══════════════════════════════════════════════════════════════════════════
+
+def start_server(loss, trace_path=None):
+    """Sobe servidor.py -b numa porta efêmera; retorna (processo, endereço)."""
+    log = tempfile.TemporaryFile(mode="w+")
+    args = [sys.executable, "-u", SERVER_SCRIPT, "-b", "--porta=0", f"--perda={loss}"]
+    if trace_path:
+        args.append(f"--rastro={trace_path}")
+    proc = subprocess.Popen(args, stdout=log, stderr=subprocess.STDOUT)
+    proc.log = log
+    deadline = time.time() + SERVER_START_TIMEOUT
+    while time.time() < deadline:
+        log.seek(0)
+        for line in log:
+            if "Endereço:" in line:
+                host, port = line.split("Endereço:")[1].strip().rsplit(":", 1)
+                return proc, (host, int(port))
+        if proc.poll() is not None:
+            break
+        time.sleep(0.02)
+    stop_server(proc)
+    raise RuntimeError("Servidor não anunciou a porta (veja servidor.py --porta=0)")
+
+
+def stop_server(proc):
+    proc.terminate()
+    try:
+        proc.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+    proc.log.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# EXECUÇÃO DOS CASOS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def run_case(case, num_packets=10000, trace_dir=None):
+    """Executa um caso e retorna o dicionário de métricas.
+    
+    trace_dir: grava <caso>.cliente.rastro e <caso>.servidor.rastro nesse diretório.
+    """
+    trace_prefix = os.path.join(trace_dir, case_id(case)) if trace_dir else None
+    payloads = [bytes([i % 256]) * case["payload"] for i in range(num_packets)]
+    total_bytes = case["payload"] * num_packets
+
+    server_cpu_before = _children_cpu()
+    proc, addr = start_server(case["loss"], trace_prefix and trace_prefix + ".servidor.rastro")
+    trace = rastro.PacketTrace(path=trace_prefix + ".cliente.rastro") if trace_prefix else None
+    sender = Sender(timeout=0.2, use_encryption=case["crypto"], verbose=False, pipelined=True,
+                    cc_algorithm=case["cc"], server_addr=addr, trace=trace)
+    sender.ack_latencies = []
+    start_seq = sender.next_seq
+    try:
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            sender.send_data(payloads)
+        duration = time.perf_counter() - wall_start
+        client_cpu = time.process_time() - cpu_start
+    finally:
+        sender.close()
+        stop_server(proc)
+        if trace is not None:
+            trace.close()
+    server_cpu = _children_cpu() - server_cpu_before
+
+    delivered = sender.base_seq - start_seq
+    stats = sender.stats
+    p50 = _percentile(sender.ack_latencies, 50)
+    p99 = _percentile(sender.ack_latencies, 99)
+    return {
+        "id": case_id(case),
+        **case,
+        "packets": num_packets,
+        "ok": delivered == total_bytes,
+        "duration_s": duration,
+        "goodput_mbps": delivered * 8 / duration / 1e6 if duration > 0 else 0.0,
+        "retrans_ratio": stats["packets_retransmitted"] / max(1, stats["packets_sent"]),
+        "ack_p50_ms": p50 * 1000 if p50 is not None else None,
+        "ack_p99_ms": p99 * 1000 if p99 is not None else None,
+        "cpu_client_s": client_cpu,
+        "cpu_server_s": server_cpu,
+        "cpu_s_per_gb": (client_cpu + server_cpu) / (delivered / 1e9) if delivered else None,
+    }
+
+
+def run_matrix(cases, num_packets=10000, trace_dir=None):
+    """Executa todos os casos imprimindo uma linha por caso."""
+    print("\n" + "═"*100)
+    print(f"🏁 BENCHMARK PONTA A PONTA: {len(cases)} casos × {num_packets} pacotes (loopback)")
+    print("═"*100)
+    print(f"  {'Caso':<30} | {'Goodput':>11} | {'Retrans':>8} | {'ACK p50':>9} | "
+          f"{'ACK p99':>9} | {'CPU s/GB':>9}")
+    print(f"  {'─'*30}─┼─{'─'*11}─┼─{'─'*8}─┼─{'─'*9}─┼─{'─'*9}─┼─{'─'*9}")
+    results = []
+    for case in cases:
+        result = run_case(case, num_packets, trace_dir)
+        results.append(result)
+        status = "" if result["ok"] else "  ❌ incompleto"
+        print(f"  {result['id']:<30} | {result['goodput_mbps']:>6.2f} Mbps | "
+              f"{result['retrans_ratio']*100:>7.2f}% | {_fmt_ms(result['ack_p50_ms'])} | "
+              f"{_fmt_ms(result['ack_p99_ms'])} | {_fmt(result['cpu_s_per_gb'], 9, 1)}{status}")
+    print("═"*100)
+    return results
+
+
+def _fmt(value, width, digits):
+    return f"{value:>{width}.{digits}f}" if value is not None else f"{'-':>{width}}"
+
+
+def _fmt_ms(value):
+    return _fmt(value, 6, 3) + " ms" if value is not None else f"{'-':>9}"
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# BASELINE E REGRESSÕES
+# ═══════════════════════════════════════════════════════════════════════════
+
+def save_baseline(results, path=BASELINE_FILE):
+    with open(path, "w") as f:
+        json.dump({r["id"]: {m: r[m] for m in METRICS} for r in results}, f, indent=2)
+
+
+def compare_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Lista (id, métrica, baseline, atual, piora relativa) das regressões."""
+    regressions = []
+    for result in results:
+        reference = baseline.get(result["id"])
+        if reference is None:
+            continue
+        if not result["ok"]:
+            regressions.append((result["id"], "ok", True, False, 1.0))
+            continue
+        for metric, higher_is_better in METRICS.items():
+            old, new = reference.get(metric), result[metric]
+            if old is None or new is None or old == 0:
+                continue
+            change = (old - new) / old if higher_is_better else (new - old) / old
+            if change > tolerance:
+                regressions.append((result["id"], metric, old, new, change))
+    return regressions
+
+
+def print_regressions(regressions, tolerance):
+    if not regressions:
+        print(f"\n✅ Nenhuma regressão acima de {tolerance*100:.0f}% em relação ao baseline")
+        return
+    print(f"\n⚠️  {len(regressions)} REGRESSÃO(ÕES) acima de {tolerance*100:.0f}%:")
+    for case, metric, old, new, change in regressions:
+        print(f"  • {case:<30} {metric:<14} {old} → {new} (piora de {change*100:.0f}%)")
+
+
+if __name__ == "__main__":
+    num_packets = 10000
+    cases = build_matrix()
+    output = None
+    baseline_path = None
+    save = False
+    tolerance = DEFAULT_TOLERANCE
+    trace_dir = None
+
+    for arg in sys.argv[1:]:
+        if arg.startswith("--pacotes="):
+            num_packets = int(arg.split("=", 1)[1])
+        elif arg == "--rapido":
+            cases = build_matrix(sizes=(500,), crypto=(False,), ccs=("reno",))
+        elif arg.startswith("--saida="):
+            output = arg.split("=", 1)[1]
+        elif arg == "--salvar-baseline":
+            save = True
+        elif arg.startswith("--baseline="):
+            baseline_path = arg.split("=", 1)[1]
+        elif arg.startswith("--tolerancia="):
+            tolerance = float(arg.split("=", 1)[1])
+        elif arg.startswith("--rastro="):
+            trace_dir = arg.split("=", 1)[1]
+            os.makedirs(trace_dir, exist_ok=True)
+        elif arg in ("--help", "-h"):
+            print(__doc__)
+            sys.exit(0)
+
+    results = run_matrix(cases, num_packets, trace_dir)
+
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📝 Resultados salvos: {output}")
+    if save:
+        save_baseline(results, baseline_path or BASELINE_FILE)
+        print(f"📌 Baseline salvo: {baseline_path or BASELINE_FILE}")
+    elif baseline_path or os.path.exists(BASELINE_FILE):
+        with open(baseline_path or BASELINE_FILE) as f:
+            regressions = compare_baseline(results, json.load(f), tolerance)
+        print_regressions(regressions, tolerance)
+        sys.exit(1 if regressions else 0)
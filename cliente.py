@@ -6,157 +6,293 @@ Implementa:
 - Questão 1: Números de sequência para ordenação
 - Questão 2: ACK cumulativo
 - Questão 3: Controle de fluxo (rwnd)
-- Questão 4: Controle de congestionamento (TCP Reno)
+- Questão 4: Controle de congestionamento (Reno ou CUBIC, ver congestionamento.py)
 """
 
 import socket
-import time
+from collections import deque
 from utils import *
+from transporte import UDPTransport
+from registro import EventLogger, DEBUG, INFO
+import rastro
+from metricas import MetricsRegistry, start_http_server
+import perfil
+from congestionamento import (CongestionControl, CONGESTION_CONTROLS,
+                              create_congestion_control)
+
+MAX_CONSECUTIVE_TIMEOUTS = 50   # Desiste se o servidor parar de responder
+HANDSHAKE_RETRIES = 3           # Tentativas do handshake de criptografia
+
+# Limites do RTO adaptativo (segundos)
+MIN_RTO = 0.0005                # Piso absoluto (em loopback o termo G domina)
+MAX_RTO = 10.0                  # Teto do backoff exponencial
+CLOCK_GRANULARITY = 0.001       # G da RFC 6298: RTO >= SRTT + G mesmo com RTTVAR -> 0
+
+# Pacing (modo pipeline)
+PACING_GAIN = 1.25              # Ganho sobre min(cwnd, rwnd)/SRTT em Congestion Avoidance
+PACING_GAIN_SLOW_START = 2.0    # Multiplicador extra em Slow Start (cwnd dobra por RTT)
+PACING_BURST = 2 * MSS          # Capacidade do balde de fichas (bytes)
+PACING_TOLERANCE = 1e-6         # Fichas faltando (bytes) tratadas como zero
+
+# Pipeline de criptografia (modo pipeline + criptografia)
+CRYPTO_MAX_PENDING = 256        # Payloads cifrados à frente da janela
+CRYPTO_POLL_INTERVAL = 0.0005   # Espera máxima quando o próximo payload ainda está no pool
+
+# ────── Mensagens de log (formatadas na thread de escrita do registro) ──────
+_RULE = "=" * 70
+_THIN = "─" * 70
+_SEND_WINDOW = ("\n[Q1 - NUMERAÇÃO]\n  • seq_num = {seq}\n  • Tamanho payload = {size}b\n"
+                "  • Próximo seq será = {next_seq}\n"
+                "\n[Q3 - CONTROLE DE FLUXO]\n  • rwnd (janela do servidor) = {rwnd}b\n"
+                "  • bytes_in_flight (não confirmados) = {in_flight}b\n"
+                "\n[Q4 - CONTROLE DE CONGESTIONAMENTO]\n  • cwnd = {cwnd:.0f}b\n"
+                "  • ssthresh = {ssthresh:.0f}b\n  • Fase = {phase}\n"
+                "  • Janela efetiva = min(cwnd, rwnd) = min({cwnd:.0f}, {rwnd}) = {effective:.0f}b\n"
+                "  • Espaço disponível = {available}b")
+LOG_SEND_MSG = f"\n{_RULE}\n📤 ENVIANDO MENSAGEM #{{msg_num}}\n{_RULE}\n" + _SEND_WINDOW
+LOG_SEND_PKT = f"\n{_RULE}\n📤 ENVIANDO PACOTE\n{_RULE}\n" + _SEND_WINDOW
+LOG_BLOCKED_WINDOW = "\n❌ BLOQUEADO: Janela cheia!\n   Aguarde ACKs para liberar espaço..."
+LOG_BLOCKED_SIZE = ("\n❌ BLOQUEADO: Payload muito grande!\n"
+                    "   Necessário: {needed}b, Disponível: {available}b")
+LOG_ENCRYPTED = ("\n[Q5 - CRIPTOGRAFIA]\n  • Original: {original}...\n"
+                 "  • Criptografado: {encrypted}...\n  • Flag ENC definida")
+LOG_SENT = ("\n[Q2 - RETRANSMISSÃO]\n  • Pacote armazenado no buffer para possível retransmissão\n"
+            "  • Total de pacotes não confirmados = {pending}\n"
+            f"\n✅ ENVIANDO PARA {{host}}:{{port}}\n   seq={{seq}}, tamanho={{size}}b\n{_RULE}\n")
+LOG_WAIT_ACK = f"\n{'-'*70}\n📥 AGUARDANDO ACK DO SERVIDOR...\n{'-'*70}"
+LOG_TIMEOUT = (f"\n{'═'*70}\n⏱️  TIMEOUT DETECTADO!\n{'═'*70}\n"
+               f"Nenhum ACK recebido no tempo esperado ({{timeout}}s)")
+LOG_ACK = ("\n✅ ACK RECEBIDO\n  • ack_num = {ack} (próximo byte esperado pelo servidor)\n"
+           "  • window = {window}b (espaço disponível no servidor)\n"
+           "\n[Q3 - CONTROLE DE FLUXO]\n  • rwnd atualizada: {old_rwnd}b → {rwnd}b{status}")
+LOG_SACK = ("\n[SACK] Blocos recebidos pelo servidor: {blocks}\n"
+            "  • {newly_sacked} segmento(s) marcado(s) | {sacked_bytes}b confirmados seletivamente")
+LOG_NEW_ACK = ("\n[Q2 - ACK CUMULATIVO]\n  • NOVO ACK!\n  • Confirma todos os bytes até {ack}\n"
+               "  • Total confirmado neste ACK: {confirmed}b")
+LOG_DUP_ACK = ("\n[Q2 - ACK CUMULATIVO]\n  • ACK DUPLICADO (já recebido)\n"
+               "  • ack_num={ack}, last_ack={last_ack}")
+LOG_ACK_END = f"{_THIN}\n"
+LOG_RELEASED = "[SENDER] ✓ Removidos {count} pacotes confirmados"
+LOG_FAST_RETRANSMIT = "[FAST RETRANSMIT] 🔄 Retransmitindo seq={seq}"
+LOG_FAST_RETRANSMIT_MISSING = "[FAST RETRANSMIT] ⚠️  Pacote seq={seq} não encontrado"
+LOG_SACK_RETRANSMIT = "[SACK RETRANSMIT] 🔄 Retransmitindo buraco seq={seq}"
+LOG_TIMEOUT_RETRANSMIT = "[TIMEOUT RETRANSMIT] 🔄 Retransmitindo seq={seq}"
+LOG_CONFIRMED = "\n✅ Pacotes confirmados até agora: {acks}/{total}\n"
+LOG_REWIND = "\n🔄 Timeout! Voltando para pacote {idx}...\n"
+LOG_BATCH = ("Pacotes {first}-{last}:\n  seq={start_seq} até {end_seq} | "
+             "Perdas={losses} ({loss_pct:.1f}%) | cwnd={cwnd:.0f}b | fase={phase}")
+LOG_PIPELINE_PROGRESS = ("ACKs {acks}: confirmados={confirmed}b | em voo={in_flight}b | "
+                         "cwnd={cwnd:.0f}b | rwnd={rwnd}b | fase={phase}")
+LOG_PIPELINE_TIMEOUT = "\n⏱️  TIMEOUT (RTO = {rto_ms:.2f}ms)"
+LOG_UNREACHABLE = "\n❌ {count} timeouts seguidos - servidor inacessível?"
 
 
 # ═══════════════════════════════════════════════════════════════════════════
-# QUESTÃO 4: CONTROLE DE CONGESTIONAMENTO (TCP Reno - AIMD)
+# ESTIMATIVA DE RTT E TIMEOUT DE RETRANSMISSÃO (RFC 6298)
 # ═══════════════════════════════════════════════════════════════════════════
 # Implementa:
-#   - Slow Start: crescimento exponencial (cwnd += MSS)
-#   - Congestion Avoidance: crescimento linear (cwnd += MSS²/cwnd)
-#   - Timeout: perda severa (ssthresh = cwnd/2, cwnd = 1*MSS)
-#   - Fast Retransmit: 3 ACKs dup (ssthresh = cwnd/2, cwnd = ssthresh)
+#   - SRTT   = (1 - α)·SRTT + α·R               (α = 1/8)
+#   - RTTVAR = (1 - β)·RTTVAR + β·|SRTT - R|    (β = 1/4)
+#   - RTO    = SRTT + 4·RTTVAR
+#   - Backoff exponencial a cada timeout (RTO *= 2)
+#   - Algoritmo de Karn: amostras de pacotes retransmitidos são ignoradas
 # ═══════════════════════════════════════════════════════════════════════════
 
-class CongestionControl:
-    """Controle de congestionamento baseado no TCP Reno (AIMD)."""
+class RTTEstimator:
+    """Estimador de RTT suavizado e de RTO adaptativo."""
     
-    def __init__(self):
-        # Variáveis de estado
-        self.cwnd = 1 * MSS          # Janela de congestionamento (1000b)
-        self.ssthresh = 64000        # Slow Start Threshold (64KB)
-        self.dup_ack_count = 0       # Contador de ACKs duplicados
-        self.last_ack_received = 0   # Último ACK para detectar duplicatas
-        self.state = "slow_start"
-        
-        print(f"[Q4-CONGESTION] Inicializado: cwnd={self.cwnd}b, ssthresh={self.ssthresh}b")
-        print(f"[Q4-CONGESTION] Estado inicial: {self.state.upper()}")
-    
-    def get_phase(self):
-        """Retorna fase atual: slow_start ou congestion_avoidance."""
-        return "slow_start" if self.cwnd < self.ssthresh else "congestion_avoidance"
-    
-    def on_new_ack(self, ack_num, verbose=True):
-        """Processa novo ACK - atualiza cwnd conforme a fase."""
-        if ack_num > self.last_ack_received:
-            self.dup_ack_count = 0
-            self.last_ack_received = ack_num
-            old_cwnd = self.cwnd
-            old_phase = self.get_phase()
-            
-            if verbose:
-                print(f"\n  ┌─ [Q4] Processando ACK #{ack_num} ─────────────────")
-                print(f"  │ Estado ANTES:")
-                print(f"  │   • cwnd = {old_cwnd:.0f}b")
-                print(f"  │   • ssthresh = {self.ssthresh:.0f}b")
-                print(f"  │   • Fase = {old_phase.upper()}")
-            
-            if self.get_phase() == "slow_start":
-                # Slow Start: cwnd += MSS (crescimento exponencial)
-                self.cwnd += MSS
-                self.state = "slow_start"
-                if verbose:
-                    print(f"  │")
-                    print(f"  │ Aplicando SLOW START:")
-                    print(f"  │   Equação: cwnd = cwnd + MSS")
-                    print(f"  │   Cálculo: {old_cwnd} + {MSS} = {self.cwnd}b")
-            else:
-                # Congestion Avoidance: cwnd += MSS²/cwnd (crescimento linear)
-                increment = (MSS * MSS) / self.cwnd
-                self.cwnd += increment
-                self.state = "congestion_avoidance"
-                if verbose:
-                    print(f"  │")
-                    print(f"  │ Aplicando CONGESTION AVOIDANCE:")
-                    print(f"  │   Equação: cwnd = cwnd + (MSS² / cwnd)")
-                    print(f"  │   Cálculo: {old_cwnd:.0f} + ({MSS}² / {old_cwnd:.0f}) = {self.cwnd:.0f}b")
-                    print(f"  │   Incremento: +{increment:.1f}b")
-            
-            if verbose:
-                print(f"  │")
-                print(f"  │ Estado DEPOIS:")
-                print(f"  │   • cwnd = {self.cwnd:.0f}b")
-                print(f"  │   • ssthresh = {self.ssthresh:.0f}b")
-                print(f"  │   • Fase = {self.get_phase().upper()}")
-            
-            # Detecta transição de fase
-            if old_phase == "slow_start" and self.get_phase() == "congestion_avoidance":
-                if verbose:
-                    print(f"  │")
-                    print(f"  │ ⚡ TRANSIÇÃO DE FASE DETECTADA!")
-                    print(f"  │    Slow Start → Congestion Avoidance")
-                    print(f"  │    Motivo: cwnd ({self.cwnd:.0f}b) >= ssthresh ({self.ssthresh}b)")
-            
-            if verbose:
-                print(f"  └────────────────────────────────────────────────")
+    ALPHA = 1 / 8
+    BETA = 1 / 4
+    K = 4
+    
+    def __init__(self, initial_rto=1.0, min_rto=MIN_RTO, max_rto=MAX_RTO,
+                 granularity=CLOCK_GRANULARITY):
+        self.min_rto = min_rto
+        self.granularity = granularity
+        self.max_rto = max_rto
+        self.rto = min(max(initial_rto, min_rto), max_rto)
+        self.srtt = None             # RTT suavizado
+        self.rttvar = None           # Variação do RTT
+        self.min_rtt = None          # Menor RTT observado
+        self.samples = 0
+    
+    def on_sample(self, rtt):
+        """Incorpora uma amostra de RTT (de pacote NÃO retransmitido)."""
+        if self.srtt is None:
+            self.srtt = rtt
+            self.rttvar = rtt / 2
         else:
-            self.on_duplicate_ack(ack_num, verbose)
+            self.rttvar = (1 - self.BETA) * self.rttvar + self.BETA * abs(self.srtt - rtt)
+            self.srtt = (1 - self.ALPHA) * self.srtt + self.ALPHA * rtt
+        if self.min_rtt is None or rtt < self.min_rtt:
+            self.min_rtt = rtt
+        self.samples += 1
+        # RFC 6298: RTO = SRTT + max(G, K·RTTVAR); sem jitter RTTVAR decai a 0
+        # e, sem G, o temporizador venceria junto com a chegada do ACK.
+        # Uma amostra válida também desfaz o backoff.
+        rto = self.srtt + max(self.granularity, self.K * self.rttvar)
+        self.rto = min(max(rto, self.min_rto), self.max_rto)
+    
+    def on_timeout(self):
+        """Backoff exponencial do RTO após um timeout."""
+        self.rto = min(self.rto * 2, self.max_rto)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# QUESTÃO 2: BUFFER DE RETRANSMISSÃO ORDENADO
+# ═══════════════════════════════════════════════════════════════════════════
+
+class RetransmissionQueue:
+    """Buffer de retransmissão ordenado por seq_num, com scoreboard SACK.
+    
+    Os segmentos são enviados em ordem crescente de seq_num, então uma deque
+    já fica ordenada: o mais antigo está sempre na frente (O(1)) e o ACK
+    cumulativo libera segmentos apenas pela esquerda (O(1) amortizado por
+    segmento liberado). Um dicionário auxiliar dá acesso direto por seq_num
+    para o Fast Retransmit e para marcar blocos SACK.
     
-    def on_duplicate_ack(self, ack_num, verbose=True):
-        """Processa ACK duplicado - detecta necessidade de Fast Retransmit."""
-        self.dup_ack_count += 1
-        if verbose:
-            print(f"[DUP ACK] ACK={ack_num} duplicado ({self.dup_ack_count}/3)")
+    Scoreboard: segmentos cobertos por blocos SACK ficam marcados como
+    'sacked' e não são retransmitidos; os buracos são os segmentos não
+    marcados abaixo de highest_sacked.
+    """
+    
+    def __init__(self):
+        self._queue = deque()
+        self._by_seq = {}
+        self._sack_marks = {}     # {início do bloco: até onde já foi marcado}
+        self.sacked_bytes = 0     # Bytes em voo já confirmados via SACK
+        self.highest_sacked = 0   # Maior byte (exclusivo) coberto por SACK
+    
+    def append(self, seq_num, entry):
+        """Adiciona um segmento recém-enviado (seq_num crescente)."""
+        entry['seq'] = seq_num
+        entry['end'] = seq_num + len(entry['payload'])
+        entry['sacked'] = False
+        self._queue.append(entry)
+        self._by_seq[seq_num] = entry
+    
+    def release(self, ack_num):
+        """Remove e retorna os segmentos com seq_num < ack_num."""
+        released = []
+        queue = self._queue
+        while queue and queue[0]['seq'] < ack_num:
+            entry = queue.popleft()
+            del self._by_seq[entry['seq']]
+            if entry['sacked']:
+                self.sacked_bytes -= entry['end'] - entry['seq']
+            released.append(entry)
+        if released and self._sack_marks:
+            self._sack_marks = {start: end for start, end in self._sack_marks.items()
+                                if start >= ack_num}
+        return released
+    
+    def mark_sacked(self, start, end):
+        """Marca os segmentos dentro do bloco SACK [start, end).
         
-        if self.dup_ack_count >= 3:
-            if verbose:
-                print(f"[DUP ACK] ⚠️  3 ACKs duplicados! Iniciando Fast Retransmit...")
-            return True
-        return False
+        Retoma do ponto já marcado para o mesmo bloco, então um bloco que só
+        cresce pela direita custa apenas os segmentos novos.
+        """
+        seq = max(start, self._sack_marks.get(start, start))
+        newly_sacked = 0
+        while seq < end:
+            entry = self._by_seq.get(seq)
+            if entry is None or entry['end'] > end:
+                break
+            if not entry['sacked']:
+                entry['sacked'] = True
+                self.sacked_bytes += entry['end'] - seq
+                newly_sacked += 1
+            seq = entry['end']
+        self._sack_marks[start] = seq
+        if seq > self.highest_sacked:
+            self.highest_sacked = seq
+        return newly_sacked
+    
+    def holes(self):
+        """Segmentos não confirmados abaixo do maior byte com SACK (perdidos)."""
+        for entry in self._queue:
+            if entry['seq'] >= self.highest_sacked:
+                return
+            if not entry['sacked']:
+                yield entry
+    
+    def oldest(self):
+        """Segmento não confirmado mais antigo (ou None)."""
+        return self._queue[0] if self._queue else None
+    
+    def values(self):
+        return iter(self._queue)
+    
+    def __getitem__(self, seq_num):
+        return self._by_seq[seq_num]
+    
+    def __contains__(self, seq_num):
+        return seq_num in self._by_seq
+    
+    def __len__(self):
+        return len(self._queue)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PACING (TOKEN BUCKET)
+# ═══════════════════════════════════════════════════════════════════════════
+# Implementa:
+#   - Taxa alvo = gain · min(cwnd, rwnd) / SRTT (cc.pacing_rate)
+#   - Balde de fichas: enche à taxa alvo, comporta no máximo PACING_BURST bytes
+#     ou meia janela efetiva (com rwnd pequeno a janela não sai numa rajada só)
+#   - Um pacote só sai quando há fichas para todo o payload
+# ═══════════════════════════════════════════════════════════════════════════
+
+class Pacer:
+    """Espaça os envios no tempo em vez de despejar a janela de uma vez."""
+    
+    def __init__(self, burst=PACING_BURST):
+        self.burst = burst
+        self.rate = None             # bytes/s (None = sem limite)
+        self.tokens = burst
+        self.last_refill = None
+        # Estatísticas
+        self.bytes_sent = 0
+        self.first_send = None
+        self.last_send = None
+        self.waits = 0
+    
+    def set_rate(self, rate, burst=None):
+        self.rate = rate
+        if burst is not None:
+            self.burst = burst
+            self.tokens = min(self.tokens, burst)
+    
+    def _refill(self, now):
+        if self.last_refill is not None and self.rate:
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+    
+    def delay(self, nbytes, now):
+        """Segundos até poder enviar nbytes (0 = pode enviar já)."""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        missing = min(nbytes, self.burst) - self.tokens
+        if missing <= PACING_TOLERANCE:
+            return 0.0              # Resto de arredondamento: a espera não avançaria o relógio
+        self.waits += 1
+        return missing / self.rate
+    
+    def on_send(self, nbytes, now):
+        """Desconta as fichas de um pacote enviado."""
+        self._refill(now)
+        self.tokens -= nbytes
+        self.bytes_sent += nbytes
+        if self.first_send is None:
+            self.first_send = now
+        self.last_send = now
     
-    def on_triple_dup_ack(self, verbose=True):
-        """Fast Recovery (TCP Reno): ssthresh = cwnd/2, cwnd = ssthresh."""
-        old_cwnd = self.cwnd
-        old_ssthresh = self.ssthresh
-        
-        # Diminuição multiplicativa
-        self.ssthresh = max(self.cwnd / 2, 2 * MSS)
-        self.cwnd = self.ssthresh
-        self.dup_ack_count = 0
-        self.state = "congestion_avoidance"
-        
-        if verbose:
-            print(f"[FAST RECOVERY] ════════════════════════════════")
-            print(f"[FAST RECOVERY] 3 ACKs Duplicados - Perda Leve Detectada")
-            print(f"[FAST RECOVERY] ssthresh: {old_ssthresh}b → {self.ssthresh:.0f}b (cwnd/2)")
-            print(f"[FAST RECOVERY] cwnd: {old_cwnd:.0f}b → {self.cwnd:.0f}b (= ssthresh)")
-            print(f"[FAST RECOVERY] Estado: CONGESTION AVOIDANCE (pula Slow Start)")
-            print(f"[FAST RECOVERY] ════════════════════════════════")
-    
-    def on_timeout(self, verbose=True):
-        """Timeout (perda severa): ssthresh = cwnd/2, cwnd = 1*MSS."""
-        old_cwnd = self.cwnd
-        old_ssthresh = self.ssthresh
-        
-        # Diminuição multiplicativa + retorno ao Slow Start
-        self.ssthresh = max(self.cwnd / 2, 2 * MSS)
-        self.cwnd = 1 * MSS
-        self.dup_ack_count = 0
-        self.state = "slow_start"
-        
-        if verbose:
-            print(f"[TIMEOUT] ═════════════════════════════════════════════")
-            print(f"[TIMEOUT] ⛔ TIMEOUT - Perda Severa Detectada!")
-            print(f"[TIMEOUT] ssthresh: {old_ssthresh}b → {self.ssthresh:.0f}b (cwnd/2)")
-            print(f"[TIMEOUT] cwnd: {old_cwnd:.0f}b → {self.cwnd}b (= 1*MSS)")
-            print(f"[TIMEOUT] Estado: SLOW START (reinício completo)")
-            print(f"[TIMEOUT] ═════════════════════════════════════════════")
-    
-    def can_send(self, bytes_in_flight, rwnd):
-        """Verifica se pode enviar: bytes_in_flight <= min(cwnd, rwnd)."""
-        effective_window = min(self.cwnd, rwnd)
-        available = effective_window - bytes_in_flight
-        return (available > 0, int(available))
-    
-    def get_status(self):
-        """Status atual para log."""
-        return f"cwnd={self.cwnd:.0f}b | ssthresh={self.ssthresh:.0f}b | phase={self.get_phase()} | dup_acks={self.dup_ack_count}"
+    def achieved_rate(self):
+        """Taxa de envio efetivamente obtida (bytes/s)."""
+        if self.first_send is None or self.last_send <= self.first_send:
+            return 0.0
+        return self.bytes_sent / (self.last_send - self.first_send)
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -171,34 +307,59 @@ class Sender:
     - Questão 1: Números de sequência para ordenação
     - Questão 2: ACK cumulativo
     - Questão 3: Controle de fluxo via rwnd
-    - Questão 4: Controle de congestionamento TCP Reno
+    - Questão 4: Controle de congestionamento (Reno ou CUBIC)
     - Questão 5: Criptografia (XOR)
     """
     
-    def __init__(self, timeout=2.0, use_encryption=False, verbose=True):
-        # Socket UDP
-        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        self.sock.settimeout(timeout)
+    def __init__(self, timeout=2.0, use_encryption=False, verbose=True, pipelined=False,
+                 cc_algorithm="reno", pacing=False, pacing_gain=PACING_GAIN,
+                 crypto_workers=0, crypto_processes=False, transport=None,
+                 server_addr=(SERVER_IP, SERVER_PORT), log=None, trace=None, profiler=None):
+        # Transporte de datagramas: socket UDP real ou rede em memória (transporte.py)
+        self.transport = transport or UDPTransport()
+        self.transport.settimeout(timeout)
+        self.server_addr = server_addr
+        self.clock = self.transport.time     # Relógio do transporte (virtual em memória)
+        
+        # RTO adaptativo: timeout é apenas o valor inicial, antes da 1ª amostra
+        self.rtt = RTTEstimator(initial_rto=timeout)
         
         # ─────────── QUESTÃO 1: Números de Sequência ───────────
         self.base_seq = 100          # Primeiro byte esperado
         self.next_seq = 100          # Próximo byte a enviar
         
         # ─────────── QUESTÃO 2: ACK Cumulativo ───────────
-        self.unacked_packets = {}    # Buffer de retransmissão
+        self.unacked_packets = RetransmissionQueue()  # Buffer de retransmissão
         
         # ─────────── QUESTÃO 3: Controle de Fluxo ───────────
         self.rwnd = BUFFER_SIZE      # Janela do receptor
         
         # ─────────── QUESTÃO 4: Controle de Congestionamento ───────────
-        self.cc = CongestionControl()
+        self.cc = create_congestion_control(cc_algorithm, verbose=verbose, clock=self.clock)
         
         # ─────────── QUESTÃO 5: Criptografia ───────────
         self.security = Security()
         self.use_encryption = use_encryption
+        self.crypto_pipeline = None  # Cifra à frente da janela, fora do laço de rede
+        if use_encryption and pipelined and crypto_workers > 0:
+            self.crypto_pipeline = CryptoPipeline(workers=crypto_workers,
+                                                  max_pending=CRYPTO_MAX_PENDING,
+                                                  processes=crypto_processes)
         
         # ─────────── QUESTÃO 6: Modo de Execução ───────────
         self.verbose = verbose
+        # Detalhes por pacote no nível DEBUG; progresso do benchmark no INFO
+        self.log = log or EventLogger("cliente", level=DEBUG if verbose else INFO)
+        self.pipelined = pipelined   # Envio orientado a eventos (wait_readable)
+        self.pacing_gain = pacing_gain
+        self.pacer = Pacer() if pacing else None   # Só usado no modo pipeline
+        self.ack_latencies = None    # Lista => registra envio→ACK de cada segmento (benchmark.py)
+        self.trace = trace           # rastro.PacketTrace: registro binário por pacote (opcional)
+        self.rtt_histogram = None    # Histogramas de metricas.py (register_metrics)
+        self.ack_latency_histogram = None
+        self.profiler = profiler     # perfil.Profiler: cProfile/tracemalloc do laço (opcional)
+        if profiler is not None:
+            profiler.attach(self, "send_packet")   # Fronteira de pacote para --amostra=N
         
         # Estatísticas para modo benchmark
         self.stats = {
@@ -206,10 +367,15 @@ class Sender:
             'packets_retransmitted': 0,
             'timeouts': 0,
             'fast_retransmits': 0,
+            'sack_retransmits': 0,
             'total_bytes': 0,
             'acks_received': 0,
             'slow_start_count': 0,
-            'cong_avoid_count': 0
+            'cong_avoid_count': 0,
+            'srtt': None,
+            'rto': self.rtt.rto,
+            'min_rtt': None,
+            'pacing_rate': None
         }
         
         if self.verbose:
@@ -225,88 +391,74 @@ class Sender:
         """Bytes enviados mas não confirmados."""
         return self.next_seq - self.base_seq
     
-    def send_packet(self, payload, msg_num=None):
-        """Envia pacote se a janela permitir."""
+    def send_packet(self, payload, msg_num=None, force=False, ciphertext=None):
+        """Envia pacote se a janela permitir.
         
-        self.stats['packets_sent'] += 1
-        
-        if self.verbose:
-            print(f"\n{'='*70}")
-            if msg_num:
-                print(f"📤 ENVIANDO MENSAGEM #{msg_num}")
-            else:
-                print(f"📤 ENVIANDO PACOTE")
-            print(f"{'='*70}")
-            
-            # ────── QUESTÃO 1: Número de Sequência ──────
-            print(f"\n[Q1 - NUMERAÇÃO]")
-            print(f"  • seq_num = {self.next_seq}")
-            print(f"  • Tamanho payload = {len(payload)}b")
-            print(f"  • Próximo seq será = {self.next_seq + len(payload)}")
+        force=True ignora a janela e o espaço disponível (sonda de janela
+        zero: com nada em voo, um segmento sai mesmo se rwnd ficou menor
+        que o payload, para não travar esperando um ACK que nunca virá).
+        ciphertext é o payload já cifrado pelo pipeline de criptografia.
+        """
+        log = self.log
         
         # ────── QUESTÃO 3 e 4: Controle de Fluxo + Congestionamento ──────
         bytes_in_flight = self.bytes_in_flight()
         can_send, available = self.cc.can_send(bytes_in_flight, self.rwnd)
         
-        if self.verbose:
-            print(f"\n[Q3 - CONTROLE DE FLUXO]")
-            print(f"  • rwnd (janela do servidor) = {self.rwnd}b")
-            print(f"  • bytes_in_flight (não confirmados) = {bytes_in_flight}b")
-            
-            print(f"\n[Q4 - CONTROLE DE CONGESTIONAMENTO]")
-            print(f"  • cwnd = {self.cc.cwnd:.0f}b")
-            print(f"  • ssthresh = {self.cc.ssthresh:.0f}b")
-            print(f"  • Fase = {self.cc.get_phase().upper()}")
-            print(f"  • Janela efetiva = min(cwnd, rwnd) = min({self.cc.cwnd:.0f}, {self.rwnd}) = {min(self.cc.cwnd, self.rwnd):.0f}b")
-            print(f"  • Espaço disponível = {available}b")
+        if log.debug_on:
+            # ────── QUESTÃO 1: Número de Sequência ──────
+            log.debug("envio", LOG_SEND_MSG if msg_num else LOG_SEND_PKT, msg_num=msg_num,
+                      seq=self.next_seq, size=len(payload), next_seq=self.next_seq + len(payload),
+                      rwnd=self.rwnd, in_flight=bytes_in_flight, cwnd=self.cc.cwnd,
+                      ssthresh=self.cc.ssthresh, phase=self.cc.get_phase().upper(),
+                      effective=min(self.cc.cwnd, self.rwnd), available=available)
         
         # Verifica se pode enviar
-        if not can_send:
-            if self.verbose:
-                print(f"\n❌ BLOQUEADO: Janela cheia!")
-                print(f"   Aguarde ACKs para liberar espaço...")
+        if force:
+            pass
+        elif not can_send:
+            if log.debug_on:
+                log.debug("bloqueado", LOG_BLOCKED_WINDOW)
             return False
         
-        if len(payload) > available:
-            if self.verbose:
-                print(f"\n❌ BLOQUEADO: Payload muito grande!")
-                print(f"   Necessário: {len(payload)}b, Disponível: {available}b")
+        elif len(payload) > available:
+            if log.debug_on:
+                log.debug("bloqueado", LOG_BLOCKED_SIZE, needed=len(payload), available=available)
             return False
         
         # ────── QUESTÃO 5: Criptografia ──────
         flags = 0
         original_payload = payload
         if self.use_encryption:
-            payload = self.security.encrypt(payload)
+            payload = ciphertext if ciphertext is not None else self.security.encrypt(payload)
             flags |= ENC
-            if self.verbose:
-                print(f"\n[Q5 - CRIPTOGRAFIA]")
-                print(f"  • Original: {original_payload[:30]}...")
-                print(f"  • Criptografado: {payload[:30]}...")
-                print(f"  • Flag ENC definida")
+            if log.debug_on:
+                log.debug("cifrado", LOG_ENCRYPTED, original=original_payload[:30],
+                          encrypted=payload[:30])
         
         # ────── QUESTÃO 2: Buffer de Retransmissão ──────
         pkt = Packet(seq_num=self.next_seq, ack_num=0, flags=flags, window=0, payload=payload)
         
-        self.unacked_packets[self.next_seq] = {
+        now = self.clock()
+        self.unacked_packets.append(self.next_seq, {
             'packet': pkt,
-            'timestamp': time.time(),
-            'payload': original_payload
-        }
+            'timestamp': now,
+            'first_sent': now,
+            'payload': original_payload,
+            'retransmitted': False
+        })
         
-        if self.verbose:
-            print(f"\n[Q2 - RETRANSMISSÃO]")
-            print(f"  • Pacote armazenado no buffer para possível retransmissão")
-            print(f"  • Total de pacotes não confirmados = {len(self.unacked_packets)}")
-            
-            # Envia pacote
-            print(f"\n✅ ENVIANDO PARA {SERVER_IP}:{SERVER_PORT}")
-            print(f"   seq={self.next_seq}, tamanho={len(original_payload)}b")
-            
-            print(f"{'='*70}\n")
+        if log.debug_on:
+            log.debug("enviado", LOG_SENT, pending=len(self.unacked_packets),
+                      host=self.server_addr[0], port=self.server_addr[1],
+                      seq=self.next_seq, size=len(original_payload))
         
+        # Envia pacote
+        self.stats['packets_sent'] += 1
         self.stats['total_bytes'] += len(original_payload)
-        self.sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+        pkt.send_to(self.transport, self.server_addr)
+        if self.trace is not None:
+            self.trace.record(now, rastro.SEND, self.next_seq, 0, flags, self.rwnd, self.cc.cwnd)
         self.next_seq += len(original_payload)
         
         return True
@@ -314,106 +466,182 @@ class Sender:
     def receive_ack(self):
         """Recebe e processa ACK do servidor."""
         try:
-            if self.verbose:
-                print(f"\n{'-'*70}")
-                print(f"📥 AGUARDANDO ACK DO SERVIDOR...")
-                print(f"{'-'*70}")
-            
-            data, addr = self.sock.recvfrom(BUFFER_SIZE)
-            ack_pkt = Packet.from_bytes(data)
+            if self.log.debug_on:
+                self.log.debug("aguardando_ack", LOG_WAIT_ACK)
             
-            self.stats['acks_received'] += 1
+            self.transport.settimeout(self.rtt.rto)
+            data, addr = self.transport.recvfrom(BUFFER_SIZE)
+            return self._process_ack(Packet.from_bytes(data))
             
-            if self.verbose:
-                print(f"\n✅ ACK RECEBIDO")
-                print(f"  • ack_num = {ack_pkt.ack_num} (próximo byte esperado pelo servidor)")
-                print(f"  • window = {ack_pkt.window}b (espaço disponível no servidor)")
-            
-            # ────── QUESTÃO 3: Atualiza Janela do Receptor ──────
-            old_rwnd = self.rwnd
-            self.rwnd = ack_pkt.window
+        except socket.timeout:
+            if self.log.warning_on:
+                self.log.warning("timeout", LOG_TIMEOUT, timeout=self.transport.gettimeout())
+            self._handle_timeout()
+            return None
+    
+    def _process_ack(self, ack_pkt):
+        """Processa um ACK já decodificado (rwnd, ACK cumulativo e cwnd)."""
+        log = self.log
+        self.stats['acks_received'] += 1
+        
+        # ────── QUESTÃO 3: Atualiza Janela do Receptor ──────
+        old_rwnd = self.rwnd
+        self.rwnd = ack_pkt.window
+        
+        if log.debug_on:
+            if self.rwnd < old_rwnd:
+                status = "\n  ⚠️  Buffer do servidor enchendo!"
+            elif self.rwnd > old_rwnd:
+                status = "\n  ✓ Buffer do servidor liberando espaço"
+            else:
+                status = ""
+            log.debug("ack", LOG_ACK, ack=ack_pkt.ack_num, window=ack_pkt.window,
+                      old_rwnd=old_rwnd, rwnd=self.rwnd, status=status)
+        
+        # ────── SACK: atualiza o scoreboard ──────
+        if ack_pkt.flags & SACK:
+            blocks = decode_sack_blocks(ack_pkt.payload)
+            newly_sacked = sum(self.unacked_packets.mark_sacked(start, end) for start, end in blocks)
+            if log.debug_on:
+                log.debug("sack", LOG_SACK,
+                          blocks=", ".join(f"[{start}, {end})" for start, end in blocks),
+                          newly_sacked=newly_sacked, sacked_bytes=self.unacked_packets.sacked_bytes)
+        
+        # ────── QUESTÃO 2: ACK Cumulativo ──────
+        if ack_pkt.ack_num > self.cc.last_ack_received:
+            if log.debug_on:
+                log.debug("ack_novo", LOG_NEW_ACK, ack=ack_pkt.ack_num,
+                          confirmed=ack_pkt.ack_num - self.base_seq)
             
-            if self.verbose:
-                print(f"\n[Q3 - CONTROLE DE FLUXO]")
-                print(f"  • rwnd atualizada: {old_rwnd}b → {self.rwnd}b")
-                if self.rwnd < old_rwnd:
-                    print(f"  ⚠️  Buffer do servidor enchendo!")
-                elif self.rwnd > old_rwnd:
-                    print(f"  ✓ Buffer do servidor liberando espaço")
+            # ────── QUESTÃO 4: Atualiza cwnd ──────
+            self.cc.on_ack(ack_pkt.ack_num, verbose=self.verbose)
+            if self.trace is not None:
+                self.trace.record(self.clock(), rastro.ACK, self.next_seq, ack_pkt.ack_num,
+                                  ack_pkt.flags, ack_pkt.window, self.cc.cwnd)
             
-            # ────── QUESTÃO 2: ACK Cumulativo ──────
-            if self.verbose:
-                print(f"\n[Q2 - ACK CUMULATIVO]")
-            if ack_pkt.ack_num > self.cc.last_ack_received:
-                bytes_confirmados = ack_pkt.ack_num - self.base_seq
-                if self.verbose:
-                    print(f"  • NOVO ACK!")
-                    print(f"  • Confirma todos os bytes até {ack_pkt.ack_num}")
-                    print(f"  • Total confirmado neste ACK: {bytes_confirmados}b")
-                
-                # ────── QUESTÃO 4: Atualiza cwnd ──────
-                self.cc.on_new_ack(ack_pkt.ack_num, verbose=self.verbose)
-                
-                # Remove pacotes confirmados
-                self._remove_acked_packets(ack_pkt.ack_num)
-                self.base_seq = ack_pkt.ack_num
-            else:
-                print(f"  • ACK DUPLICADO (já recebido)")
-                print(f"  • ack_num={ack_pkt.ack_num}, last_ack={self.cc.last_ack_received}")
-                
-                # ACK duplicado - possível Fast Retransmit
-                if self.cc.on_duplicate_ack(ack_pkt.ack_num):
-                    self._fast_retransmit(ack_pkt.ack_num)
+            # Remove pacotes confirmados
+            self._remove_acked_packets(ack_pkt.ack_num)
+            self.base_seq = ack_pkt.ack_num
             
-            print(f"{'─'*70}\n")
+            # ACK parcial: o scoreboard ainda aponta buracos → recupera o próximo
+            if self.unacked_packets.highest_sacked > ack_pkt.ack_num:
+                self._retransmit_holes(limit=1)
+        else:
+            if log.debug_on:
+                log.debug("ack_duplicado", LOG_DUP_ACK, ack=ack_pkt.ack_num,
+                          last_ack=self.cc.last_ack_received)
             
-            return {'ack_num': ack_pkt.ack_num, 'window': ack_pkt.window}
+            if self.trace is not None:
+                self.trace.record(self.clock(), rastro.DUP_ACK, self.next_seq, ack_pkt.ack_num,
+                                  ack_pkt.flags, ack_pkt.window, self.cc.cwnd)
             
-        except socket.timeout:
-            print(f"\n{'═'*70}")
-            print(f"⏱️  TIMEOUT DETECTADO!")
-            print(f"{'═'*70}")
-            print(f"Nenhum ACK recebido no tempo esperado ({self.sock.gettimeout()}s)")
-            self._handle_timeout()
-            return None
+            # ACK duplicado - possível Fast Retransmit
+            if self.cc.on_dup_ack(ack_pkt.ack_num, verbose=self.verbose):
+                self._fast_retransmit(ack_pkt.ack_num)
+        
+        if log.debug_on:
+            log.debug("ack_fim", LOG_ACK_END)
+        
+        return {'ack_num': ack_pkt.ack_num, 'window': ack_pkt.window}
     
     def _remove_acked_packets(self, ack_num):
         """Remove pacotes confirmados pelo ACK cumulativo."""
-        to_remove = [seq for seq in self.unacked_packets if seq < ack_num]
-        for seq in to_remove:
-            del self.unacked_packets[seq]
-        if to_remove and self.verbose:
-            print(f"[SENDER] ✓ Removidos {len(to_remove)} pacotes confirmados")
+        released = self.unacked_packets.release(ack_num)
+        if not released:
+            return
+        if self.log.debug_on:
+            self.log.debug("liberados", LOG_RELEASED, count=len(released))
+        if self.ack_latencies is not None:
+            now = self.clock()
+            self.ack_latencies.extend(now - entry['first_sent'] for entry in released)
+        if self.ack_latency_histogram is not None:
+            now = self.clock()
+            observe = self.ack_latency_histogram.observe
+            for entry in released:
+                observe(now - entry['first_sent'])
+        
+        # Amostra de RTT do segmento mais recente confirmado. Algoritmo de Karn:
+        # se o ACK cobre algum retransmitido, a amostra é ambígua e é descartada.
+        if not any(entry['retransmitted'] for entry in released):
+            self._update_rtt(self.clock() - released[-1]['timestamp'])
+    
+    def _update_rtt(self, sample):
+        """Atualiza SRTT/RTTVAR/RTO e as estatísticas correspondentes."""
+        self.rtt.on_sample(sample)
+        if self.rtt_histogram is not None:
+            self.rtt_histogram.observe(sample)
+        self.stats['srtt'] = self.rtt.srtt
+        self.stats['rto'] = self.rtt.rto
+        self.stats['min_rtt'] = self.rtt.min_rtt
+        self.cc.on_rtt_sample(self.rtt.srtt, self.rtt.min_rtt)
     
     def _fast_retransmit(self, ack_num):
-        """Fast Retransmit após 3 ACKs duplicados."""
+        """Fast Retransmit após 3 ACKs duplicados.
+        
+        Com informação SACK retransmite apenas os buracos do scoreboard;
+        sem ela, apenas o segmento que começa em ack_num.
+        """
         self.stats['fast_retransmits'] += 1
-        self.stats['packets_retransmitted'] += 1
-        self.cc.on_triple_dup_ack(verbose=self.verbose)
+        self.cc.on_loss(verbose=self.verbose)
+        
+        if self.unacked_packets.highest_sacked > ack_num:
+            self._retransmit_holes()
+            return
         
         if ack_num in self.unacked_packets:
             pkt_info = self.unacked_packets[ack_num]
-            if self.verbose:
-                print(f"[FAST RETRANSMIT] 🔄 Retransmitindo seq={ack_num}")
-            self.sock.sendto(pkt_info['packet'].to_bytes(), (SERVER_IP, SERVER_PORT))
-            pkt_info['timestamp'] = time.time()
-        else:
-            if self.verbose:
-                print(f"[FAST RETRANSMIT] ⚠️  Pacote seq={ack_num} não encontrado")
+            if self.log.debug_on:
+                self.log.debug("fast_retransmit", LOG_FAST_RETRANSMIT, seq=ack_num)
+            self._retransmit(pkt_info)
+        elif self.log.debug_on:
+            self.log.debug("fast_retransmit", LOG_FAST_RETRANSMIT_MISSING, seq=ack_num)
+    
+    def _retransmit_holes(self, limit=None):
+        """Retransmite os buracos do scoreboard SACK; retorna quantos.
+        
+        Buracos retransmitidos há menos de um RTO são pulados, para não
+        duplicar uma retransmissão que ainda está em voo.
+        """
+        now = self.clock()
+        count = 0
+        for pkt_info in self.unacked_packets.holes():
+            if limit is not None and count >= limit:
+                break
+            if pkt_info['retransmitted'] and now - pkt_info['timestamp'] < self.rtt.rto:
+                continue
+            if self.log.debug_on:
+                self.log.debug("sack_retransmit", LOG_SACK_RETRANSMIT, seq=pkt_info['seq'])
+            self._retransmit(pkt_info)
+            self.stats['sack_retransmits'] += 1
+            count += 1
+        return count
+    
+    def _retransmit(self, pkt_info):
+        """Reenvia um segmento do buffer de retransmissão."""
+        self.stats['packets_retransmitted'] += 1
+        pkt_info['packet'].send_to(self.transport, self.server_addr)
+        pkt_info['timestamp'] = self.clock()
+        pkt_info['retransmitted'] = True
+        if self.trace is not None:
+            self.trace.record(pkt_info['timestamp'], rastro.RETRANSMIT, pkt_info['seq'], 0,
+                              pkt_info['packet'].flags, self.rwnd, self.cc.cwnd)
     
     def _handle_timeout(self):
         """Trata timeout com retransmissão."""
         self.stats['timeouts'] += 1
-        self.stats['packets_retransmitted'] += 1
         self.cc.on_timeout(verbose=self.verbose)
+        self.rtt.on_timeout()
+        self.stats['rto'] = self.rtt.rto
+        if self.trace is not None:
+            self.trace.record(self.clock(), rastro.TIMEOUT, self.base_seq, 0, 0,
+                              self.rwnd, self.cc.cwnd)
         
-        if self.unacked_packets:
-            oldest_seq = min(self.unacked_packets.keys())
-            pkt_info = self.unacked_packets[oldest_seq]
-            if self.verbose:
-                print(f"[TIMEOUT RETRANSMIT] 🔄 Retransmitindo seq={oldest_seq}")
-            self.sock.sendto(pkt_info['packet'].to_bytes(), (SERVER_IP, SERVER_PORT))
-            pkt_info['timestamp'] = time.time()
+        pkt_info = self.unacked_packets.oldest()
+        if pkt_info is not None:
+            oldest_seq = pkt_info['seq']
+            if self.log.debug_on:
+                self.log.debug("timeout_retransmit", LOG_TIMEOUT_RETRANSMIT, seq=oldest_seq)
+            self._retransmit(pkt_info)
     
     def negotiate_encryption(self):
         """Negocia criptografia com o servidor (Questão 5)."""
@@ -430,13 +658,18 @@ class Sender:
         print(f"  • Tamanho: {len(key)} bytes")
         print(f"  • Algoritmo: XOR (simétrico)")
         
-        # Envia handshake com a chave
+        # Envia handshake com a chave (o datagrama pode se perder: tenta de novo)
         handshake_pkt = Packet(seq_num=0, ack_num=0, flags=SYN|ENC, window=0, payload=key)
-        print(f"\n  → Enviando handshake (SYN|ENC)...")
-        self.sock.sendto(handshake_pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
-        
-        try:
-            data, addr = self.sock.recvfrom(BUFFER_SIZE)
+        for attempt in range(HANDSHAKE_RETRIES):
+            print(f"\n  → Enviando handshake (SYN|ENC)..." if attempt == 0 else
+                  f"  ↻ Reenviando handshake (tentativa {attempt + 1}/{HANDSHAKE_RETRIES})...")
+            self.transport.sendto(handshake_pkt.to_bytes(), self.server_addr)
+            
+            try:
+                data, addr = self.transport.recvfrom(BUFFER_SIZE)
+            except socket.timeout:
+                print(f"  ✗ Timeout ao aguardar confirmação")
+                continue
             ack_pkt = Packet.from_bytes(data)
             
             if ack_pkt.flags & ACK and ack_pkt.flags & ENC:
@@ -445,35 +678,40 @@ class Sender:
                 print(f"\n✅ CRIPTOGRAFIA ESTABELECIDA")
                 print(f"{'═'*70}\n")
                 return True
-            else:
-                print(f"  ✗ Servidor rejeitou criptografia")
-                return False
-        except socket.timeout:
-            print(f"  ✗ Timeout ao aguardar confirmação")
+            print(f"  ✗ Servidor rejeitou criptografia")
             return False
+        return False
     
     def send_data(self, data_list):
-        """Envia lista de dados com transporte confiável."""
-        start_time = time.time()
+        """Envia lista de dados com transporte confiável.
         
-        print("\n" + "═"*70)
-        print("🚀 INICIANDO TRANSMISSÃO COM TRANSPORTE CONFIÁVEL")
-        print("═"*70)
-        print(f"Total de mensagens: {len(data_list)}")
-        print(f"Servidor: {SERVER_IP}:{SERVER_PORT}")
-        print(f"Criptografia: {'HABILITADA' if self.use_encryption else 'DESABILITADA'}")
-        print(f"Modo: {'VERBOSE (detalhado)' if self.verbose else 'BENCHMARK (resumido)'}")
-        print("═"*70)
+        Durante a transferência os print() diretos (cabeçalhos, controle de
+        congestionamento, resumo) passam pela fila do registro, na ordem
+        dos eventos e fora da thread de envio.
+        """
+        with self.log.capture_stdout():
+            self._send_data(data_list)
+    
+    def _send_data(self, data_list):
+        start_time = self.clock()
         
-        # Negocia criptografia se habilitada
-        if self.use_encryption:
-            if not self.negotiate_encryption():
-                print("\n❌ Falha na negociação de criptografia!")
-                return
+        if not self._start_transfer(data_list):
+            return
         
+        # Perfil (--profile/--trace-memory) cobre só o laço, sem handshake nem resumo
+        with perfil.profiling(self.profiler):
+            if self.pipelined:
+                self._send_data_pipelined(data_list)
+            else:
+                self._send_data_bursts(data_list)
+        
+        self._print_summary(self.clock() - start_time, len(data_list))
+    
+    def _send_data_bursts(self, data_list):
+        """Envio em rajadas de até 5 pacotes, seguidas da espera pelos ACKs."""
+        log = self.log
         idx = 0
-        last_progress = 0
-        progress_interval = 500 if not self.verbose else 1
+        progress_interval = 500
         
         # Stats para agregação em benchmark
         batch_start_seq = self.next_seq
@@ -486,7 +724,8 @@ class Sender:
             while idx < len(data_list) and packets_sent_in_burst < 5:  # Máximo 5 pacotes por burst
                 payload = data_list[idx].encode() if isinstance(data_list[idx], str) else data_list[idx]
                 
-                if self.send_packet(payload, msg_num=idx+1):
+                # Sonda de janela zero: nada em voo, envia mesmo assim
+                if self.send_packet(payload, msg_num=idx+1, force=self.bytes_in_flight() == 0):
                     idx += 1
                     packets_sent_in_burst += 1
                 else:
@@ -507,17 +746,12 @@ class Sender:
                     else:
                         self.stats['cong_avoid_count'] += 1
                     
-                    if self.verbose:
-                        print(f"\n✅ Pacotes confirmados até agora: {self.stats['acks_received']}/{len(data_list)}\n")
-                    elif self.stats['acks_received'] - batch_start_idx >= progress_interval:
+                    if log.debug_on:
+                        log.debug("confirmados", LOG_CONFIRMED, acks=self.stats['acks_received'],
+                                  total=len(data_list))
+                    elif log.info_on and self.stats['acks_received'] - batch_start_idx >= progress_interval:
                         # Estatísticas em modo benchmark a cada 500 pacotes
-                        batch_end_seq = self.next_seq
-                        acks_in_batch = self.stats['acks_received'] - batch_start_idx
-                        loss_pct = (batch_losses / acks_in_batch * 100) if acks_in_batch > 0 else 0
-                        print(f"Pacotes {batch_start_idx+1}-{self.stats['acks_received']}:")
-                        print(f"  seq={batch_start_seq} até {batch_end_seq} | "
-                              f"Perdas={batch_losses} ({loss_pct:.1f}%) | "
-                              f"cwnd={self.cc.cwnd:.0f}b | fase={self.cc.get_phase()}")
+                        self._log_batch(batch_start_idx, batch_start_seq, batch_losses)
                         
                         # Reset para próximo batch
                         batch_start_idx = self.stats['acks_received']
@@ -527,26 +761,182 @@ class Sender:
                     # Timeout: ajusta idx para reenviar
                     batch_losses += 1
                     idx = self.stats['acks_received']
-                    if self.verbose:
-                        print(f"\n🔄 Timeout! Voltando para pacote {idx+1}...\n")
+                    if log.debug_on:
+                        log.debug("retomada", LOG_REWIND, idx=idx+1)
             
             # Sleep apenas em modo verbose
             if self.verbose:
-                time.sleep(0.3)
+                self.transport.sleep(0.3)
         
         # Último batch (se houver resto)
-        if not self.verbose and self.stats['acks_received'] > batch_start_idx:
-            batch_end_seq = self.next_seq
-            acks_in_batch = self.stats['acks_received'] - batch_start_idx
-            loss_pct = (batch_losses / acks_in_batch * 100) if acks_in_batch > 0 else 0
-            print(f"Pacotes {batch_start_idx+1}-{self.stats['acks_received']}:")
-            print(f"  seq={batch_start_seq} até {batch_end_seq} | "
-                  f"Perdas={batch_losses} ({loss_pct:.1f}%) | "
-                  f"cwnd={self.cc.cwnd:.0f}b | fase={self.cc.get_phase()}")
-        
-        end_time = time.time()
-        duration = end_time - start_time
+        if log.info_on and not log.debug_on and self.stats['acks_received'] > batch_start_idx:
+            self._log_batch(batch_start_idx, batch_start_seq, batch_losses)
+    
+    def _log_batch(self, batch_start_idx, batch_start_seq, batch_losses):
+        """Progresso do modo rajadas: um evento por lote de ACKs."""
+        acks_in_batch = self.stats['acks_received'] - batch_start_idx
+        self.log.info("lote", LOG_BATCH, first=batch_start_idx + 1,
+                      last=self.stats['acks_received'], start_seq=batch_start_seq,
+                      end_seq=self.next_seq, losses=batch_losses,
+                      loss_pct=batch_losses / acks_in_batch * 100 if acks_in_batch > 0 else 0,
+                      cwnd=self.cc.cwnd, phase=self.cc.get_phase())
+    
+    def _start_transfer(self, data_list):
+        """Imprime o cabeçalho da transmissão e negocia criptografia."""
+        print("\n" + "═"*70)
+        print("🚀 INICIANDO TRANSMISSÃO COM TRANSPORTE CONFIÁVEL")
+        print("═"*70)
+        print(f"Total de mensagens: {len(data_list)}")
+        print(f"Servidor: {self.server_addr[0]}:{self.server_addr[1]}")
+        print(f"Criptografia: {'HABILITADA' if self.use_encryption else 'DESABILITADA'}")
+        print(f"Modo: {'VERBOSE (detalhado)' if self.verbose else 'BENCHMARK (resumido)'}")
+        print(f"Envio: {'PIPELINE (orientado a eventos)' if self.pipelined else 'RAJADAS (até 5 pacotes)'}")
+        if self.pipelined:
+            print(f"Pacing: {f'HABILITADO (gain = {self.pacing_gain})' if self.pacer else 'DESABILITADO'}")
+        print("═"*70)
+        
+        # Negocia criptografia se habilitada
+        if self.use_encryption:
+            if not self.negotiate_encryption():
+                print("\n❌ Falha na negociação de criptografia!")
+                return False
+        return True
+    
+    def _send_data_pipelined(self, data_list):
+        """Envio orientado a eventos: mantém min(cwnd, rwnd) bytes em voo.
+        
+        O transporte fica não bloqueante (wait_readable/selector). A cada
+        iteração a janela é preenchida, e o laço dorme apenas até chegar
+        um ACK ou vencer o temporizador de retransmissão do pacote mais
+        antigo. Os ACKs são drenados e processados assim que chegam.
+        """
+        log = self.log
+        payloads = [d.encode() if isinstance(d, str) else d for d in data_list]
+        start_seq = self.next_seq
+        final_seq = start_seq + sum(len(p) for p in payloads)
+        idx = 0
+        consecutive_timeouts = 0
+        progress_interval = 500
+        next_progress = progress_interval
+        
+        # Pipeline de criptografia: payloads cifrados à frente, por índice
+        crypto = self.crypto_pipeline if self.security.encryption_enabled else None
+        encrypted = {}
+        submitted = 0
+        
+        self.transport.setblocking(False)
         
+        try:
+            while self.base_seq < final_seq:
+                # ────── Preenche a janela ──────
+                if crypto is not None:
+                    submitted = self._encrypt_ahead(payloads, idx, submitted, encrypted)
+                
+                pacing_delay = 0.0
+                crypto_wait = False
+                while idx < len(payloads):
+                    # Sonda de janela zero: nada em voo, envia mesmo assim
+                    force = self.bytes_in_flight() == 0
+                    if self.pacer is not None:
+                        pacing_delay = self._pacing_delay(len(payloads[idx]))
+                        if pacing_delay > 0:
+                            break
+                    ciphertext = None
+                    if crypto is not None:
+                        ciphertext = encrypted.get(idx)
+                        if ciphertext is None:
+                            crypto_wait = True   # Ainda no pool: não bloqueia o laço
+                            break
+                    if not self.send_packet(payloads[idx], msg_num=idx+1, force=force,
+                                            ciphertext=ciphertext):
+                        break
+                    if self.pacer is not None:
+                        self.pacer.on_send(len(payloads[idx]), self.clock())
+                    encrypted.pop(idx, None)
+                    idx += 1
+                
+                # ────── Espera ACK, vez do pacing ou estouro do temporizador ──────
+                deadline = self._retransmission_deadline()
+                wait = deadline - self.clock()
+                if pacing_delay > 0:
+                    wait = min(wait, pacing_delay)
+                if crypto_wait:
+                    wait = min(wait, CRYPTO_POLL_INTERVAL)
+                readable = self.transport.wait_readable(wait) if wait > 0 else False
+                
+                if readable:
+                    consecutive_timeouts = 0
+                    for ack_pkt in self._drain_acks():
+                        self._process_ack(ack_pkt)
+                        if self.cc.get_phase() == "slow_start":
+                            self.stats['slow_start_count'] += 1
+                        else:
+                            self.stats['cong_avoid_count'] += 1
+                    
+                    if self.stats['acks_received'] >= next_progress:
+                        next_progress += progress_interval
+                        if log.info_on and not log.debug_on:
+                            log.info("progresso", LOG_PIPELINE_PROGRESS,
+                                     acks=self.stats['acks_received'],
+                                     confirmed=self.base_seq - start_seq,
+                                     in_flight=self.bytes_in_flight(), cwnd=self.cc.cwnd,
+                                     rwnd=self.rwnd, phase=self.cc.get_phase())
+                elif self.clock() < deadline:
+                    continue    # Acordou apenas para o próximo envio cadenciado
+                else:
+                    consecutive_timeouts += 1
+                    if consecutive_timeouts > MAX_CONSECUTIVE_TIMEOUTS:
+                        log.error("inacessivel", LOG_UNREACHABLE, count=consecutive_timeouts)
+                        break
+                    if not self.unacked_packets:
+                        # Nada em voo e nada enviado: backoff e nova sonda a cada RTO
+                        self.rtt.on_timeout()
+                        continue
+                    if log.debug_on:
+                        log.debug("timeout", LOG_PIPELINE_TIMEOUT, rto_ms=self.rtt.rto*1000)
+                    self._handle_timeout()
+        finally:
+            self.transport.settimeout(self.rtt.rto)
+    
+    def _encrypt_ahead(self, payloads, idx, submitted, encrypted):
+        """Recolhe payloads já cifrados e mantém o pool trabalhando à frente."""
+        crypto = self.crypto_pipeline
+        for tag, ciphertext in crypto.ready():
+            encrypted[tag] = ciphertext
+        while (submitted < len(payloads) and submitted - idx < crypto.max_pending
+               and not crypto.full()):
+            crypto.submit(payloads[submitted], self.security.key, tag=submitted)
+            submitted += 1
+        return submitted
+    
+    def _pacing_delay(self, nbytes):
+        """Atualiza a taxa do pacer (gain · min(cwnd, rwnd) / SRTT) e retorna a espera."""
+        gain = self.pacing_gain
+        if self.cc.get_phase() == "slow_start":
+            gain *= PACING_GAIN_SLOW_START
+        rate = self.cc.pacing_rate(self.rtt.srtt, gain, self.rwnd)
+        self.pacer.set_rate(rate, burst=min(PACING_BURST, min(self.cc.cwnd, self.rwnd) / 2))
+        self.stats['pacing_rate'] = rate
+        return self.pacer.delay(nbytes, self.clock())
+    
+    def _retransmission_deadline(self):
+        """Instante em que vence o temporizador do pacote mais antigo."""
+        oldest = self.unacked_packets.oldest()
+        if oldest is None:
+            return self.clock() + self.rtt.rto
+        return oldest['timestamp'] + self.rtt.rto
+    
+    def _drain_acks(self):
+        """Lê todos os ACKs já disponíveis no socket não bloqueante."""
+        while True:
+            try:
+                data, addr = self.transport.recvfrom(BUFFER_SIZE)
+            except (BlockingIOError, InterruptedError):
+                return
+            yield Packet.from_bytes(data)
+    
+    def _print_summary(self, duration, num_messages):
+        """Imprime as estatísticas finais da transmissão."""
         print("\n" + "═"*70)
         print("🎉 TRANSMISSÃO CONCLUÍDA COM SUCESSO")
         print("═"*70)
@@ -556,12 +946,26 @@ class Sender:
         print(f"\n  📦 Pacotes enviados: {self.stats['packets_sent']}")
         print(f"  ✅ ACKs recebidos: {self.stats['acks_received']}")
         print(f"  🔄 Pacotes retransmitidos: {self.stats['packets_retransmitted']}")
-        print(f"  📊 Taxa de retransmissão: {self.stats['packets_retransmitted']/self.stats['packets_sent']*100:.2f}%")
+        print(f"  📊 Taxa de retransmissão: {self.stats['packets_retransmitted']/max(1, self.stats['packets_sent'])*100:.2f}%")
         print(f"  ⏱️  Timeouts: {self.stats['timeouts']}")
+        print(f"  🧩 Retransmissões seletivas (SACK): {self.stats['sack_retransmits']}")
         print(f"  📈 Total de bytes: {self.stats['total_bytes']:,}b ({self.stats['total_bytes']/1024:.1f} KB)")
         print(f"  🚀 Throughput médio: {self.stats['total_bytes']/duration:.0f} bytes/s ({self.stats['total_bytes']/duration/1024:.1f} KB/s)")
-        print(f"  📦 Taxa de envio: {len(data_list)/duration:.1f} pacotes/s")
-        print(f"\n  [Q4] Controle de Congestionamento:")
+        print(f"  📦 Taxa de envio: {num_messages/duration:.1f} pacotes/s")
+        print(f"\n  ⏲️  RTT / Timeout de Retransmissão:")
+        if self.rtt.srtt is not None:
+            print(f"      • SRTT = {self.rtt.srtt*1000:.3f}ms (RTTVAR = {self.rtt.rttvar*1000:.3f}ms)")
+            print(f"      • RTT mínimo = {self.rtt.min_rtt*1000:.3f}ms")
+        else:
+            print(f"      • Nenhuma amostra de RTT válida")
+        print(f"      • RTO final = {self.rtt.rto*1000:.3f}ms ({self.rtt.samples} amostras)")
+        if self.pacer is not None:
+            print(f"\n  🎚️  Pacing (gain = {self.pacing_gain}):")
+            if self.stats['pacing_rate']:
+                print(f"      • Taxa alvo final = {self.stats['pacing_rate']/1024:.1f} KB/s")
+            print(f"      • Taxa alcançada = {self.pacer.achieved_rate()/1024:.1f} KB/s")
+            print(f"      • Esperas do pacer: {self.pacer.waits}")
+        print(f"\n  [Q4] Controle de Congestionamento ({self.cc.name.upper()}):")
         print(f"      • cwnd final = {self.cc.cwnd:.0f}b")
         print(f"      • ssthresh final = {self.cc.ssthresh:.0f}b")
         print(f"      • Fase final = {self.cc.get_phase().upper()}")
@@ -569,13 +973,52 @@ class Sender:
         print(f"      • ACKs em Congestion Avoidance: {self.stats['cong_avoid_count']}")
         print("═"*70)
     
+    def register_metrics(self, registry):
+        """Publica as estatísticas em um metricas.MetricsRegistry.
+        
+        Contadores e medidores leem self.stats e o estado da janela só na
+        coleta; apenas os histogramas (RTT e latência envio→ACK) recebem
+        amostras durante a transferência.
+        """
+        stats = self.stats
+        for key, name, help_text in (
+                ('packets_sent', 'packets_sent_total', 'Segmentos novos enviados'),
+                ('packets_retransmitted', 'packets_retransmitted_total', 'Segmentos retransmitidos'),
+                ('timeouts', 'timeouts_total', 'Estouros do temporizador de retransmissão'),
+                ('fast_retransmits', 'fast_retransmits_total', 'Fast retransmits (3 ACKs duplicados)'),
+                ('sack_retransmits', 'sack_retransmits_total', 'Retransmissões seletivas (SACK)'),
+                ('acks_received', 'acks_received_total', 'ACKs recebidos'),
+                ('total_bytes', 'payload_bytes_total', 'Bytes de payload enviados')):
+            registry.counter(name, help_text, lambda key=key: stats[key])
+        registry.gauge("cwnd_bytes", "Janela de congestionamento", lambda: self.cc.cwnd)
+        registry.gauge("ssthresh_bytes", "Limiar de slow start", lambda: self.cc.ssthresh)
+        registry.gauge("rwnd_bytes", "Janela anunciada pelo servidor", lambda: self.rwnd)
+        registry.gauge("bytes_in_flight", "Bytes enviados e não confirmados", self.bytes_in_flight)
+        registry.gauge("srtt_seconds", "RTT suavizado", lambda: self.rtt.srtt)
+        registry.gauge("rto_seconds", "Timeout de retransmissão atual", lambda: self.rtt.rto)
+        self.rtt_histogram = registry.histogram("rtt_seconds", "Amostras de RTT (Karn)")
+        self.ack_latency_histogram = registry.histogram(
+            "ack_latency_seconds", "Latência do primeiro envio até o ACK cumulativo")
+    
     def close(self):
-        """Fecha socket."""
-        self.sock.close()
+        """Fecha o transporte (e o pool de criptografia, se houver)."""
+        if self.crypto_pipeline is not None:
+            self.crypto_pipeline.close()
+        self.transport.close()
 
 
-def run_client(use_encryption=False, benchmark=False):
-    """Função principal do cliente."""
+def run_client(use_encryption=False, benchmark=False, pipelined=False, cc_algorithm="reno",
+               pacing=False, pacing_gain=PACING_GAIN, crypto_workers=0, crypto_processes=False,
+               log_json=None, trace_path=None, metrics_port=None,
+               profile_path=None, memory_path=None, sample_every=1):
+    """Função principal do cliente.
+    
+    log_json: eventos também em JSON, um por linha.
+    trace_path: grava o rastro binário por pacote (ver rastro.py).
+    metrics_port: expõe as métricas no formato Prometheus (0 = porta livre).
+    profile_path / memory_path: cProfile / tracemalloc do laço de envio,
+    amostrando 1 a cada sample_every pacotes (ver perfil.py).
+    """
     print("""
     ╔══════════════════════════════════════════════════════════════════╗
     ║          TRABALHO FINAL - REDES DE COMPUTADORES (UFJF)          ║
@@ -590,9 +1033,21 @@ def run_client(use_encryption=False, benchmark=False):
     ╚══════════════════════════════════════════════════════════════════╝
     """)
     
-    # Timeout ajustado no modo benchmark: rápido mas permite fast retransmit
+    # RTO inicial (antes da primeira amostra de RTT); depois ele se adapta
     timeout = 0.2 if benchmark else 2.0
-    sender = Sender(timeout=timeout, use_encryption=use_encryption, verbose=not benchmark)
+    sender = Sender(timeout=timeout, use_encryption=use_encryption, verbose=not benchmark,
+                    pipelined=pipelined, cc_algorithm=cc_algorithm,
+                    pacing=pacing, pacing_gain=pacing_gain,
+                    crypto_workers=crypto_workers, crypto_processes=crypto_processes,
+                    log=EventLogger("cliente", level=INFO if benchmark else DEBUG,
+                                    json_path=log_json),
+                    trace=rastro.PacketTrace(path=trace_path) if trace_path else None,
+                    profiler=perfil.make_profiler("cliente", profile_path, memory_path, sample_every))
+    if metrics_port is not None:
+        registry = MetricsRegistry(prefix="client_")
+        sender.register_metrics(registry)
+        http = start_http_server(registry, metrics_port)
+        print(f"📡 Métricas: http://{http.server_address[0]}:{http.server_address[1]}/metrics")
     
     # Questão 6: Modo benchmark com 10.000+ pacotes
     if benchmark:
@@ -609,6 +1064,9 @@ def run_client(use_encryption=False, benchmark=False):
         print("\n[SENDER] Transmissao interrompida")
     finally:
         sender.close()
+        if sender.trace is not None:
+            sender.trace.close()
+            print(f"\n📼 Rastro salvo: {trace_path} ({sender.trace.count} registros)")
 
 
 if __name__ == "__main__":
@@ -617,6 +1075,44 @@ if __name__ == "__main__":
     # Opções via linha de comando
     use_crypto = "--crypto" in sys.argv or "-c" in sys.argv
     benchmark = "--benchmark" in sys.argv or "--eval" in sys.argv or "-b" in sys.argv
+    pipelined = "--pipeline" in sys.argv or "-p" in sys.argv
+    pacing = "--pacing" in sys.argv
+    pacing_gain = PACING_GAIN
+    crypto_processes = "--crypto-processes" in sys.argv
+    crypto_workers = 2 if crypto_processes else 0
+    cc_algorithm = "reno"
+    log_json = None
+    trace_path = None
+    metrics_port = None
+    profile_path = None
+    memory_path = None
+    sample_every = 1
+    for arg in sys.argv[1:]:
+        if arg.startswith("--cc="):
+            cc_algorithm = arg.split("=", 1)[1]
+        elif arg.startswith("--pacing-gain="):
+            pacing = True
+            pacing_gain = float(arg.split("=", 1)[1])
+        elif arg.startswith("--crypto-workers="):
+            crypto_workers = int(arg.split("=", 1)[1])
+        elif arg.startswith("--log-json="):
+            log_json = arg.split("=", 1)[1]      # Eventos também em JSON (uma linha cada)
+        elif arg.startswith("--rastro="):
+            trace_path = arg.split("=", 1)[1]    # Rastro binário por pacote (rastro.py)
+        elif arg.startswith("--metricas="):
+            metrics_port = int(arg.split("=", 1)[1])   # Endpoint Prometheus (0 = porta livre)
+        elif arg == "--profile" or arg.startswith("--profile="):
+            profile_path = arg.split("=", 1)[1] if "=" in arg else "cliente.pstats"
+        elif arg == "--trace-memory" or arg.startswith("--trace-memory="):
+            memory_path = arg.split("=", 1)[1] if "=" in arg else "cliente.memoria"
+        elif arg.startswith("--amostra="):
+            sample_every = int(arg.split("=", 1)[1])   # Perfila 1 a cada N pacotes
+    if pacing and not pipelined:
+        print("ℹ️  --pacing só tem efeito com --pipeline (-p)")
+    if cc_algorithm not in CONGESTION_CONTROLS:
+        print(f"❌ Algoritmo desconhecido: {cc_algorithm} "
+              f"(disponíveis: {', '.join(sorted(CONGESTION_CONTROLS))})")
+        sys.exit(1)
     
     if benchmark:
         print("\n🔬 Modo: BENCHMARK/AVALIAÇÃO (10.000 pacotes - Questão 6)\n")
@@ -624,6 +1120,11 @@ if __name__ == "__main__":
         print("\n🔐 Modo: COM CRIPTOGRAFIA\n")
     else:
         print("\n📝 Modo: SEM CRIPTOGRAFIA (use --crypto ou -c para habilitar)")
-        print("📊 Use --benchmark ou -b para modo avaliação (10.000 pacotes)\n")
+        print("📊 Use --benchmark ou -b para modo avaliação (10.000 pacotes)")
+        print("📈 Use --cc=cubic para trocar o controle de congestionamento\n")
     
-    run_client(use_encryption=use_crypto, benchmark=benchmark)
+    run_client(use_encryption=use_crypto, benchmark=benchmark, pipelined=pipelined,
+               cc_algorithm=cc_algorithm, pacing=pacing, pacing_gain=pacing_gain,
+               crypto_workers=crypto_workers, crypto_processes=crypto_processes,
+               log_json=log_json, trace_path=trace_path, metrics_port=metrics_port,
+               profile_path=profile_path, memory_path=memory_path, sample_every=sample_every)
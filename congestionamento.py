@@ -0,0 +1,374 @@
+"""
+Controle de Congestionamento - Trabalho Final Redes de Computadores (UFJF)
+
+Algoritmos de controle de congestionamento intercambiáveis (padrão Strategy).
+
+Todo algoritmo implementa a mesma interface:
+- on_ack(ack_num)     : ACK recebido (novo ou duplicado)
+- on_dup_ack(ack_num) : ACK duplicado; retorna True no 3º (Fast Retransmit)
+- on_loss()           : perda leve detectada por 3 ACKs duplicados
+- on_timeout()        : perda severa (estouro do temporizador)
+- pacing_rate(srtt, gain, rwnd) : taxa de envio sugerida (bytes/s)
+
+Os algoritmos ficam registrados em CONGESTION_CONTROLS e são criados pelo
+nome com create_congestion_control("reno" | "cubic").
+"""
+
+import time
+from abc import ABC, abstractmethod
+from utils import MSS
+
+
+CONGESTION_CONTROLS = {}
+
+DEFAULT_SSTHRESH = 64000     # Slow Start Threshold inicial (64KB)
+
+
+def register_congestion_control(name):
+    """Decorator que registra um algoritmo sob o nome dado."""
+    def decorator(cls):
+        cls.name = name
+        CONGESTION_CONTROLS[name] = cls
+        return cls
+    return decorator
+
+
+def create_congestion_control(name="reno", **kwargs):
+    """Cria uma instância do algoritmo registrado com esse nome."""
+    try:
+        cls = CONGESTION_CONTROLS[name]
+    except KeyError:
+        available = ", ".join(sorted(CONGESTION_CONTROLS))
+        raise ValueError(f"Algoritmo de controle de congestionamento desconhecido: "
+                         f"{name!r} (disponíveis: {available})") from None
+    return cls(**kwargs)
+
+
+class CongestionControlStrategy(ABC):
+    """Interface comum dos algoritmos de controle de congestionamento.
+
+    Cuida da contabilidade compartilhada (ACKs duplicados, fase, janela
+    efetiva); as subclasses definem como cwnd cresce e como reage a perdas.
+    Métodos abstratos: um algoritmo incompleto falha já ao ser criado.
+    """
+
+    name = "base"
+
+    def __init__(self, initial_cwnd=MSS, ssthresh=DEFAULT_SSTHRESH, verbose=True,
+                 clock=time.time):
+        self.clock = clock           # Relógio injetável (simulações usam tempo virtual)
+        
+        # Variáveis de estado
+        self.cwnd = initial_cwnd     # Janela de congestionamento
+        self.ssthresh = ssthresh     # Slow Start Threshold
+        self.dup_ack_count = 0       # Contador de ACKs duplicados
+        self.last_ack_received = 0   # Último ACK para detectar duplicatas
+        self.state = "slow_start"
+
+        if verbose:
+            print(f"[Q4-CONGESTION] Algoritmo: {self.name.upper()}")
+            print(f"[Q4-CONGESTION] Inicializado: cwnd={self.cwnd}b, ssthresh={self.ssthresh}b")
+            print(f"[Q4-CONGESTION] Estado inicial: {self.state.upper()}")
+
+    def get_phase(self):
+        """Retorna fase atual: slow_start ou congestion_avoidance."""
+        return "slow_start" if self.cwnd < self.ssthresh else "congestion_avoidance"
+
+    # ────── Interface ──────
+
+    def on_ack(self, ack_num, verbose=True):
+        """Processa ACK: novo ACK faz cwnd crescer, repetido conta como duplicado."""
+        if ack_num <= self.last_ack_received:
+            self.on_dup_ack(ack_num, verbose)
+            return
+
+        self.dup_ack_count = 0
+        self.last_ack_received = ack_num
+        old_cwnd = self.cwnd
+        old_phase = self.get_phase()
+
+        if verbose:
+            print(f"\n  ┌─ [Q4] Processando ACK #{ack_num} ─────────────────")
+            print(f"  │ Estado ANTES:")
+            print(f"  │   • cwnd = {old_cwnd:.0f}b")
+            print(f"  │   • ssthresh = {self.ssthresh:.0f}b")
+            print(f"  │   • Fase = {old_phase.upper()}")
+
+        self._increase_cwnd(old_phase, verbose)
+
+        if verbose:
+            print(f"  │")
+            print(f"  │ Estado DEPOIS:")
+            print(f"  │   • cwnd = {self.cwnd:.0f}b")
+            print(f"  │   • ssthresh = {self.ssthresh:.0f}b")
+            print(f"  │   • Fase = {self.get_phase().upper()}")
+
+        # Detecta transição de fase
+        if old_phase == "slow_start" and self.get_phase() == "congestion_avoidance":
+            if verbose:
+                print(f"  │")
+                print(f"  │ ⚡ TRANSIÇÃO DE FASE DETECTADA!")
+                print(f"  │    Slow Start → Congestion Avoidance")
+                print(f"  │    Motivo: cwnd ({self.cwnd:.0f}b) >= ssthresh ({self.ssthresh}b)")
+
+        if verbose:
+            print(f"  └────────────────────────────────────────────────")
+
+    def on_dup_ack(self, ack_num, verbose=True):
+        """Processa ACK duplicado - detecta necessidade de Fast Retransmit."""
+        self.dup_ack_count += 1
+        if verbose:
+            print(f"[DUP ACK] ACK={ack_num} duplicado ({self.dup_ack_count}/3)")
+
+        if self.dup_ack_count >= 3:
+            if verbose:
+                print(f"[DUP ACK] ⚠️  3 ACKs duplicados! Iniciando Fast Retransmit...")
+            return True
+        return False
+
+    @abstractmethod
+    def on_loss(self, verbose=True):
+        """Perda leve (3 ACKs duplicados)."""
+
+    @abstractmethod
+    def on_timeout(self, verbose=True):
+        """Perda severa (timeout)."""
+
+    def on_rtt_sample(self, srtt, min_rtt):
+        """Nova estimativa de RTT (algoritmos que dependem do RTT a usam)."""
+
+    def pacing_rate(self, srtt, gain=1.0, rwnd=None):
+        """Taxa de envio sugerida em bytes/s: gain × min(cwnd, rwnd) / SRTT.
+
+        O envio é limitado pela janela efetiva; com rwnd pequeno, usar só
+        cwnd daria uma taxa muito acima da alcançável e o pacing não atuaria.
+        """
+        if not srtt:
+            return None
+        window = self.cwnd if rwnd is None else min(self.cwnd, rwnd)
+        return gain * window / srtt
+
+    def can_send(self, bytes_in_flight, rwnd):
+        """Verifica se pode enviar: bytes_in_flight <= min(cwnd, rwnd)."""
+        effective_window = min(self.cwnd, rwnd)
+        available = effective_window - bytes_in_flight
+        return (available > 0, int(available))
+
+    def get_status(self):
+        """Status atual para log."""
+        return f"cwnd={self.cwnd:.0f}b | ssthresh={self.ssthresh:.0f}b | phase={self.get_phase()} | dup_acks={self.dup_ack_count}"
+
+    @abstractmethod
+    def _increase_cwnd(self, phase, verbose):
+        """Crescimento de cwnd a cada novo ACK (definido por cada algoritmo)."""
+
+    # ────── Nomes antigos (mantidos para testes.py e código existente) ──────
+
+    def on_new_ack(self, ack_num, verbose=True):
+        return self.on_ack(ack_num, verbose)
+
+    def on_duplicate_ack(self, ack_num, verbose=True):
+        return self.on_dup_ack(ack_num, verbose)
+
+    def on_triple_dup_ack(self, verbose=True):
+        return self.on_loss(verbose)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# QUESTÃO 4: CONTROLE DE CONGESTIONAMENTO (TCP Reno - AIMD)
+# ═══════════════════════════════════════════════════════════════════════════
+# Implementa:
+#   - Slow Start: crescimento exponencial (cwnd += MSS)
+#   - Congestion Avoidance: crescimento linear (cwnd += MSS²/cwnd)
+#   - Timeout: perda severa (ssthresh = cwnd/2, cwnd = 1*MSS)
+#   - Fast Retransmit: 3 ACKs dup (ssthresh = cwnd/2, cwnd = ssthresh)
+# ═══════════════════════════════════════════════════════════════════════════
+
+@register_congestion_control("reno")
+class CongestionControl(CongestionControlStrategy):
+    """Controle de congestionamento baseado no TCP Reno (AIMD)."""
+
+    def _increase_cwnd(self, phase, verbose):
+        old_cwnd = self.cwnd
+        if phase == "slow_start":
+            # Slow Start: cwnd += MSS (crescimento exponencial)
+            self.cwnd += MSS
+            self.state = "slow_start"
+            if verbose:
+                print(f"  │")
+                print(f"  │ Aplicando SLOW START:")
+                print(f"  │   Equação: cwnd = cwnd + MSS")
+                print(f"  │   Cálculo: {old_cwnd} + {MSS} = {self.cwnd}b")
+        else:
+            self._congestion_avoidance(verbose)
+
+    def _congestion_avoidance(self, verbose):
+        # Congestion Avoidance: cwnd += MSS²/cwnd (crescimento linear)
+        old_cwnd = self.cwnd
+        increment = (MSS * MSS) / self.cwnd
+        self.cwnd += increment
+        self.state = "congestion_avoidance"
+        if verbose:
+            print(f"  │")
+            print(f"  │ Aplicando CONGESTION AVOIDANCE:")
+            print(f"  │   Equação: cwnd = cwnd + (MSS² / cwnd)")
+            print(f"  │   Cálculo: {old_cwnd:.0f} + ({MSS}² / {old_cwnd:.0f}) = {self.cwnd:.0f}b")
+            print(f"  │   Incremento: +{increment:.1f}b")
+
+    def on_loss(self, verbose=True):
+        """Fast Recovery (TCP Reno): ssthresh = cwnd/2, cwnd = ssthresh."""
+        old_cwnd = self.cwnd
+        old_ssthresh = self.ssthresh
+
+        # Diminuição multiplicativa
+        self.ssthresh = max(self.cwnd / 2, 2 * MSS)
+        self.cwnd = self.ssthresh
+        self.dup_ack_count = 0
+        self.state = "congestion_avoidance"
+
+        if verbose:
+            print(f"[FAST RECOVERY] ════════════════════════════════")
+            print(f"[FAST RECOVERY] 3 ACKs Duplicados - Perda Leve Detectada")
+            print(f"[FAST RECOVERY] ssthresh: {old_ssthresh}b → {self.ssthresh:.0f}b (cwnd/2)")
+            print(f"[FAST RECOVERY] cwnd: {old_cwnd:.0f}b → {self.cwnd:.0f}b (= ssthresh)")
+            print(f"[FAST RECOVERY] Estado: CONGESTION AVOIDANCE (pula Slow Start)")
+            print(f"[FAST RECOVERY] ════════════════════════════════")
+
+    def on_timeout(self, verbose=True):
+        """Timeout (perda severa): ssthresh = cwnd/2, cwnd = 1*MSS."""
+        old_cwnd = self.cwnd
+        old_ssthresh = self.ssthresh
+
+        # Diminuição multiplicativa + retorno ao Slow Start
+        self.ssthresh = max(self.cwnd / 2, 2 * MSS)
+        self.cwnd = 1 * MSS
+        self.dup_ack_count = 0
+        self.state = "slow_start"
+
+        if verbose:
+            print(f"[TIMEOUT] ═════════════════════════════════════════════")
+            print(f"[TIMEOUT] ⛔ TIMEOUT - Perda Severa Detectada!")
+            print(f"[TIMEOUT] ssthresh: {old_ssthresh}b → {self.ssthresh:.0f}b (cwnd/2)")
+            print(f"[TIMEOUT] cwnd: {old_cwnd:.0f}b → {self.cwnd}b (= 1*MSS)")
+            print(f"[TIMEOUT] Estado: SLOW START (reinício completo)")
+            print(f"[TIMEOUT] ═════════════════════════════════════════════")
+
+
+RenoCongestionControl = CongestionControl
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# CUBIC (RFC 9438)
+# ═══════════════════════════════════════════════════════════════════════════
+# Implementa:
+#   - Slow Start: igual ao Reno (cwnd += MSS)
+#   - Congestion Avoidance: W(t) = C·(t - K)³ + W_max   (em MSS)
+#       K = ∛(W_max·(1 - β) / C),  t = tempo desde a última redução
+#   - Região TCP-friendly: nunca cresce mais devagar que um Reno equivalente
+#   - Perda: ssthresh = β·cwnd (β = 0.7), com fast convergence de W_max
+# ═══════════════════════════════════════════════════════════════════════════
+
+@register_congestion_control("cubic")
+class CubicCongestionControl(CongestionControl):
+    """Controle de congestionamento CUBIC: crescimento cúbico em função do tempo.
+
+    Depois de uma perda, cwnd volta rapidamente para perto de W_max (a janela
+    em que a perda ocorreu), fica estável perto dele e só então sonda acima,
+    em vez de crescer 1 MSS por RTT como o Reno.
+    """
+
+    C = 0.4
+    BETA = 0.7
+
+    def __init__(self, initial_cwnd=MSS, ssthresh=DEFAULT_SSTHRESH, verbose=True,
+                 clock=time.time):
+        self.w_max = 0.0             # Janela no momento da última perda (bytes)
+        self.w_last_max = 0.0        # W_max anterior (fast convergence)
+        self.epoch_start = None      # Início da época de crescimento atual
+        self.k = 0.0                 # Tempo até voltar a W_max (s)
+        self.origin = 0.0            # Ponto de platô da curva cúbica (bytes)
+        self.w_est = 0.0             # Estimativa da janela de um Reno (TCP-friendly)
+        self.min_rtt = 0.0
+        super().__init__(initial_cwnd=initial_cwnd, ssthresh=ssthresh, verbose=verbose,
+                         clock=clock)
+
+    def on_rtt_sample(self, srtt, min_rtt):
+        self.min_rtt = min_rtt or 0.0
+
+    def _congestion_avoidance(self, verbose):
+        now = self.clock()
+        old_cwnd = self.cwnd
+
+        if self.epoch_start is None:
+            self.epoch_start = now
+            if self.cwnd < self.w_max:
+                self.k = ((self.w_max - self.cwnd) / MSS / self.C) ** (1 / 3)
+                self.origin = self.w_max
+            else:
+                self.k = 0.0
+                self.origin = self.cwnd
+            self.w_est = self.cwnd
+
+        # Alvo da curva cúbica um RTT à frente
+        t = now - self.epoch_start + self.min_rtt
+        target = self.origin + self.C * ((t - self.k) ** 3) * MSS
+
+        if target > self.cwnd:
+            increment = (target - self.cwnd) / self.cwnd * MSS
+        else:
+            increment = 0.01 * MSS * MSS / self.cwnd   # Platô: cresce bem devagar
+
+        # Região TCP-friendly: acompanha um Reno com o mesmo β
+        alpha = 3 * (1 - self.BETA) / (1 + self.BETA)
+        self.w_est += alpha * MSS * MSS / self.cwnd
+        self.cwnd = max(self.cwnd + increment, self.w_est)
+        self.state = "congestion_avoidance"
+
+        if verbose:
+            print(f"  │")
+            print(f"  │ Aplicando CUBIC (Congestion Avoidance):")
+            print(f"  │   Equação: W(t) = C·(t - K)³ + W_max")
+            print(f"  │   t = {t*1000:.2f}ms, K = {self.k*1000:.2f}ms, W_max = {self.origin:.0f}b")
+            print(f"  │   Alvo: {target:.0f}b | Reno equivalente: {self.w_est:.0f}b")
+            print(f"  │   cwnd: {old_cwnd:.0f}b → {self.cwnd:.0f}b")
+
+    def _reduce(self):
+        """Redução multiplicativa comum a perda leve e timeout."""
+        # Fast convergence: libera banda se a perda ocorreu abaixo do W_max anterior
+        if self.cwnd < self.w_last_max:
+            self.w_last_max = self.cwnd
+            self.w_max = self.cwnd * (1 + self.BETA) / 2
+        else:
+            self.w_last_max = self.cwnd
+            self.w_max = self.cwnd
+        self.epoch_start = None
+        self.ssthresh = max(self.cwnd * self.BETA, 2 * MSS)
+        self.dup_ack_count = 0
+
+    def on_loss(self, verbose=True):
+        """Perda leve: ssthresh = β·cwnd, cwnd = ssthresh."""
+        old_cwnd = self.cwnd
+        self._reduce()
+        self.cwnd = self.ssthresh
+        self.state = "congestion_avoidance"
+
+        if verbose:
+            print(f"[CUBIC] ════════════════════════════════════════")
+            print(f"[CUBIC] 3 ACKs Duplicados - Perda Leve Detectada")
+            print(f"[CUBIC] W_max = {self.w_max:.0f}b")
+            print(f"[CUBIC] cwnd: {old_cwnd:.0f}b → {self.cwnd:.0f}b (β = {self.BETA})")
+            print(f"[CUBIC] ════════════════════════════════════════")
+
+    def on_timeout(self, verbose=True):
+        """Timeout: ssthresh = β·cwnd, cwnd = 1*MSS."""
+        old_cwnd = self.cwnd
+        self._reduce()
+        self.cwnd = 1 * MSS
+        self.state = "slow_start"
+
+        if verbose:
+            print(f"[CUBIC] ════════════════════════════════════════")
+            print(f"[CUBIC] ⛔ TIMEOUT - Perda Severa Detectada!")
+            print(f"[CUBIC] W_max = {self.w_max:.0f}b, ssthresh = {self.ssthresh:.0f}b")
+            print(f"[CUBIC] cwnd: {old_cwnd:.0f}b → {self.cwnd}b (= 1*MSS)")
+            print(f"[CUBIC] ════════════════════════════════════════")
@@ -11,17 +11,36 @@ Uso:
     python3 graficos.py --loss             # Teste com perda de pacotes (5%)
     python3 graficos.py --no-congestion    # Sem controle de congestionamento
     python3 graficos.py --congestion       # Com controle de congestionamento
+    python3 graficos.py --cc=cubic         # Algoritmo de congestionamento (reno, cubic);
+                                           # vale também para --all, --lote e --varredura
+    python3 graficos.py --motor=janela     # Motor: eventos (padrão), janela (por RTT) ou tempo_real
+    python3 graficos.py --all --motor=janela --replicacoes=2000   # Média/p5/p95 (Monte Carlo, NumPy)
+    python3 graficos.py --varredura -n10000        # Grade perda × RTT × ssthresh × rwnd × CC
+    python3 graficos.py --all --workers=4 --sem-cache   # Paralelismo / desativa o cache
     python3 graficos.py --simulacao        # Modo simulação (sem servidor real)
+    python3 graficos.py --lote --metricas=m.json --metricas=m.csv --saida=out
+                                           # Sem interação: todos os grupos, métricas + gráficos
+    python3 graficos.py --cenarios=perda --sem-graficos --metricas=m.json
+                                           # Só o grupo "perda", sem importar matplotlib
 """
 
+import os
+import io
+import csv
+import json
 import time
 import random
 import socket
-import matplotlib.pyplot as plt
-import numpy as np
-from dataclasses import dataclass, field
-from typing import List, Dict, Tuple
+import hashlib
+import itertools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from array import array
+from dataclasses import dataclass, field, fields, asdict, replace
+from typing import List, Dict, Tuple, Optional
 from utils import MSS, BUFFER_SIZE
+from congestionamento import create_congestion_control, CONGESTION_CONTROLS
+from simulador import EventLoop
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -40,6 +59,10 @@ class SimulationConfig:
     initial_cwnd: int = MSS               # Janela inicial
     ssthresh: int = 64000                 # Slow Start Threshold
     rwnd: int = BUFFER_SIZE               # Janela do receptor
+    cc_algorithm: str = "reno"            # Algoritmo (ver congestionamento.py)
+    engine: str = "eventos"               # Motor: "eventos", "janela" (por RTT) ou "tempo_real"
+    seed: Optional[int] = None            # Semente do gerador aleatório (reprodutibilidade)
+    history_points: int = 1000            # Pontos guardados no histórico (0 = todas as amostras)
 
 
 @dataclass
@@ -53,10 +76,157 @@ class SimulationResult:
     retransmissions: int = 0
     throughput_bps: float = 0.0           # bytes/segundo
     throughput_kbps: float = 0.0          # KB/segundo
-    cwnd_history: List[float] = field(default_factory=list)
-    throughput_history: List[float] = field(default_factory=list)
-    time_history: List[float] = field(default_factory=list)
-    phase_history: List[str] = field(default_factory=list)
+    replications: int = 0                 # Monte Carlo: nº de replicações (0 = não executado)
+    throughput_mean_kbps: float = 0.0     # Monte Carlo: média
+    throughput_p5_kbps: float = 0.0       # Monte Carlo: percentil 5
+    throughput_p95_kbps: float = 0.0      # Monte Carlo: percentil 95
+    # Séries temporais em arrays tipados (8 bytes por amostra, sem objetos float)
+    cwnd_history: array = field(default_factory=lambda: array('d'))
+    throughput_history: array = field(default_factory=lambda: array('d'))
+    time_history: array = field(default_factory=lambda: array('d'))
+    progress_history: array = field(default_factory=lambda: array('d'))   # % de pacotes confirmados
+    phase_history: array = field(default_factory=lambda: array('b'))      # Códigos de PHASES
+    
+    def phases(self) -> List[str]:
+        """Fases por amostra, por extenso."""
+        return [PHASES[code] for code in self.phase_history]
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# SÉRIES TEMPORAIS COMPACTAS
+# ═══════════════════════════════════════════════════════════════════════════
+# As amostras (progresso, tempo, cwnd, throughput, fase) passam por um
+# downsampling em fluxo que guarda, de cada balde de amostras consecutivas,
+# a de menor e a de maior cwnd: a memória fica limitada e as quedas de cwnd
+# (perdas) nunca somem do gráfico. Resultados podem ser salvos em .npz.
+# ═══════════════════════════════════════════════════════════════════════════
+
+PHASES = ("slow_start", "congestion_avoidance", "no_control")
+PHASE_CODES = {name: code for code, name in enumerate(PHASES)}
+
+PLOT_MAX_POINTS = 2000                    # Pontos desenhados por série (mín/máx por balde)
+
+_HISTORY_FIELDS = {                       # Campo -> typecode do array
+    'cwnd_history': 'd', 'throughput_history': 'd', 'time_history': 'd',
+    'progress_history': 'd', 'phase_history': 'b',
+}
+
+
+class MinMaxDownsampler:
+    """Downsampling em fluxo que preserva mínimos e máximos de cwnd.
+    
+    Agrupa `stride` amostras consecutivas por balde e guarda a de menor e a
+    de maior cwnd. Quando os baldes passam de capacity/2, vizinhos são
+    fundidos dois a dois e stride dobra: a memória fica em ~capacity pontos,
+    qualquer que seja o tamanho da execução.
+    """
+    
+    def __init__(self, capacity: int = 1000):
+        self.capacity = max(2, capacity)
+        self.stride = 1
+        self._buckets = []                # [(menor, maior)] por balde completo
+        self._count = 0
+        self._low = self._high = self._last = None
+    
+    def add(self, sample: tuple) -> None:
+        """Amostra = (progresso, tempo, cwnd, throughput, código da fase)."""
+        self._last = sample
+        if self._count == 0:
+            self._low = self._high = sample
+        elif sample[2] < self._low[2]:
+            self._low = sample
+        elif sample[2] > self._high[2]:
+            self._high = sample
+        self._count += 1
+        if self._count >= self.stride:
+            self._buckets.append((self._low, self._high))
+            self._count = 0
+            if len(self._buckets) > self.capacity // 2:
+                self._merge()
+    
+    def _merge(self) -> None:
+        buckets = self._buckets
+        merged = []
+        for i in range(0, len(buckets) - 1, 2):
+            (low1, high1), (low2, high2) = buckets[i], buckets[i + 1]
+            merged.append((low1 if low1[2] <= low2[2] else low2,
+                           high1 if high1[2] >= high2[2] else high2))
+        if len(buckets) % 2:
+            merged.append(buckets[-1])
+        self._buckets = merged
+        self.stride *= 2
+    
+    def samples(self) -> List[tuple]:
+        """Amostras guardadas, em ordem temporal (inclui sempre a última)."""
+        buckets = self._buckets + ([(self._low, self._high)] if self._count else [])
+        out = []
+        for low, high in buckets:
+            first, second = (low, high) if (low[1], low[0]) <= (high[1], high[0]) else (high, low)
+            out.append(first)
+            if second is not first:
+                out.append(second)
+        if self._last is not None and (not out or out[-1] is not self._last):
+            out.append(self._last)
+        return out
+
+
+def downsample_minmax(y, max_points: int = PLOT_MAX_POINTS) -> 'np.ndarray':
+    """Índices de y a desenhar: mínimo e máximo de cada balde (vetorizado)."""
+    import numpy as np
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    y = np.asarray(y)
+    width = -(-n // (max_points // 2))    # Teto de n / nº de baldes
+    rows = n // width
+    body = y[:rows * width].reshape(rows, width)
+    base = np.arange(rows) * width
+    tail = np.arange(rows * width, n)
+    idx = np.concatenate([base + body.argmin(axis=1), base + body.argmax(axis=1), tail, [n - 1]])
+    return np.unique(idx)
+
+
+def _series_xy(result: SimulationResult, series: array, scale: float = 1.0):
+    """(x, y) prontos para plotar: x = progresso (%), com downsampling mín/máx."""
+    import numpy as np
+    y = np.frombuffer(series, dtype=np.float64) if isinstance(series, array) else np.asarray(series, float)
+    if len(result.progress_history) == len(y):
+        x = np.frombuffer(result.progress_history, dtype=np.float64)
+    else:
+        x = np.linspace(0, 100, len(y))
+    idx = downsample_minmax(y)
+    return x[idx], y[idx] * scale
+
+
+def save_result(result: SimulationResult, path: str) -> None:
+    """Salva o resultado (escalares + séries) em um arquivo .npz compactado."""
+    import numpy as np
+    data = {}
+    for f in fields(SimulationResult):
+        value = getattr(result, f.name)
+        if f.name in _HISTORY_FIELDS:
+            data[f.name] = np.frombuffer(value, dtype=value.typecode) if len(value) else \
+                np.zeros(0, dtype=_HISTORY_FIELDS[f.name])
+        else:
+            data[f.name] = np.array(value)
+    np.savez_compressed(path, **data)
+
+
+def load_result(path: str) -> SimulationResult:
+    """Carrega um resultado salvo com save_result."""
+    import numpy as np
+    result = SimulationResult()
+    with np.load(path) as data:
+        for f in fields(SimulationResult):
+            if f.name not in data:
+                continue
+            if f.name in _HISTORY_FIELDS:
+                series = array(_HISTORY_FIELDS[f.name])
+                series.frombytes(data[f.name].astype(_HISTORY_FIELDS[f.name]).tobytes())
+                setattr(result, f.name, series)
+            else:
+                setattr(result, f.name, data[f.name].item())
+    return result
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -64,46 +234,56 @@ class SimulationResult:
 # ═══════════════════════════════════════════════════════════════════════════
 
 class CongestionControlSimulator:
-    """Simulador do controle de congestionamento TCP Reno."""
+    """Simulador do controle de congestionamento.
+    
+    Delega as regras de cwnd/ssthresh ao mesmo algoritmo usado pelo cliente
+    (congestionamento.py), escolhido por config.cc_algorithm.
+    """
     
     def __init__(self, config: SimulationConfig):
         self.config = config
-        self.cwnd = config.initial_cwnd if config.use_congestion_control else float('inf')
-        self.ssthresh = config.ssthresh
+        self.algorithm = create_congestion_control(
+            config.cc_algorithm, initial_cwnd=config.initial_cwnd,
+            ssthresh=config.ssthresh, verbose=False, clock=lambda: self.now)
+        self.now = 0.0               # Relógio da simulação (virtual), atualizado pelo motor
+        self.ack_num = 0
         self.dup_ack_count = 0
         self.bytes_sent = 0
         self.bytes_acked = 0
-        self.packets_lost = 0
-        self.retransmissions = 0
+        self.packets_lost = 0           # Contado pelos motores (on_loss só ajusta a janela)
+    
+    @property
+    def cwnd(self) -> float:
+        if not self.config.use_congestion_control:
+            return float('inf')
+        return self.algorithm.cwnd
+    
+    @property
+    def ssthresh(self) -> float:
+        return self.algorithm.ssthresh
         
     def get_phase(self) -> str:
         """Retorna fase atual."""
         if not self.config.use_congestion_control:
             return "no_control"
-        return "slow_start" if self.cwnd < self.ssthresh else "congestion_avoidance"
+        return self.algorithm.get_phase()
     
     def on_ack(self) -> None:
         """Processa ACK recebido."""
         if not self.config.use_congestion_control:
             return
-            
-        if self.get_phase() == "slow_start":
-            # Slow Start: cwnd += MSS
-            self.cwnd += MSS
-        else:
-            # Congestion Avoidance: cwnd += MSS²/cwnd
-            self.cwnd += (MSS * MSS) / self.cwnd
+        
+        # Cada ACK confirma um pacote novo (ACK cumulativo sempre avança)
+        self.ack_num += self.config.packet_size
+        self.algorithm.on_ack(self.ack_num, verbose=False)
     
     def on_loss(self) -> None:
-        """Processa perda de pacote (timeout ou 3 dup ACKs)."""
+        """Reage a uma perda (tratada como timeout); a contagem fica com o motor."""
         if not self.config.use_congestion_control:
             return
-            
-        # TCP Reno: ssthresh = cwnd/2, cwnd = 1*MSS
-        self.ssthresh = max(self.cwnd / 2, 2 * MSS)
-        self.cwnd = MSS
-        self.packets_lost += 1
-        self.retransmissions += 1
+        
+        # Reno: ssthresh = cwnd/2, cwnd = 1*MSS (CUBIC usa β = 0.7)
+        self.algorithm.on_timeout(verbose=False)
     
     def get_effective_window(self) -> float:
         """Retorna janela efetiva: min(cwnd, rwnd)."""
@@ -116,28 +296,192 @@ class CongestionControlSimulator:
 # FUNÇÃO DE SIMULAÇÃO
 # ═══════════════════════════════════════════════════════════════════════════
 
-def run_simulation(config: SimulationConfig, name: str = "") -> SimulationResult:
-    """Executa uma simulação com a configuração dada."""
+class _SimulationRecorder:
+    """Histórico (para os gráficos) e progresso, comum a todos os motores."""
     
-    result = SimulationResult(config_name=name)
-    cc = CongestionControlSimulator(config)
+    def __init__(self, config: SimulationConfig, cc: CongestionControlSimulator,
+                 result: SimulationResult):
+        self.config = config
+        self.cc = cc
+        self.result = result
+        self.downsampler = MinMaxDownsampler(config.history_points) if config.history_points else None
+        self.next_progress = 0
+        self.last_progress = -1
+    
+    def on_ack(self, packets_acked: int, elapsed: float) -> None:
+        """Um pacote confirmado; throughput acumulado desde o início."""
+        throughput = self.result.total_bytes / elapsed / 1024 if elapsed > 0 else 0  # KB/s
+        self._sample(packets_acked, elapsed, throughput)
+    
+    def on_round(self, packets_acked: int, elapsed: float, round_throughput: float) -> None:
+        """Fim de uma rodada (RTT) no motor de janela; throughput da rodada em KB/s."""
+        self._sample(packets_acked, elapsed, round_throughput)
+    
+    def _sample(self, packets_acked: int, elapsed: float, throughput: float) -> None:
+        """Registra uma amostra do histórico (todas passam pelo downsampling)."""
+        config, cc = self.config, self.cc
+        sample = (packets_acked * 100 / config.num_packets, elapsed,
+                  cc.cwnd if config.use_congestion_control else config.rwnd,
+                  throughput, PHASE_CODES[cc.get_phase()])
+        if self.downsampler is not None:
+            self.downsampler.add(sample)
+        else:
+            self._append(sample)
+        if packets_acked >= self.next_progress:
+            self._progress(packets_acked)
+    
+    def _append(self, sample: tuple) -> None:
+        result = self.result
+        result.progress_history.append(sample[0])
+        result.time_history.append(sample[1])
+        result.cwnd_history.append(sample[2])
+        result.throughput_history.append(sample[3])
+        result.phase_history.append(sample[4])
+    
+    def finish(self) -> None:
+        """Grava no resultado as amostras mantidas pelo downsampling."""
+        if self.downsampler is not None:
+            for sample in self.downsampler.samples():
+                self._append(sample)
+    
+    def _progress(self, packets_acked: int) -> None:
+        """Progresso (a cada 10%)."""
+        config, cc = self.config, self.cc
+        current_progress = (packets_acked * 10) // config.num_packets
+        self.next_progress = -(-(current_progress + 1) * config.num_packets // 10)
+        if current_progress > self.last_progress:
+            self.last_progress = current_progress
+            progress = (packets_acked / config.num_packets) * 100
+            print(f"  Progresso: {progress:.0f}% ({packets_acked}/{config.num_packets}) | "
+                  f"cwnd={cc.cwnd:.0f}b | fase={cc.get_phase()}")
+
+
+def _simulate_events(config: SimulationConfig, cc: CongestionControlSimulator,
+                     result: SimulationResult, rng: random.Random) -> float:
+    """Motor de eventos discretos: relógio virtual, sem sleep.
+    
+    Mantém até min(cwnd, rwnd) bytes em voo (ao menos um pacote). Cada
+    pacote gera um evento de ACK após um RTT sorteado ou, se perdido, um
+    evento de timeout após o RTO, que reduz a janela e o retransmite.
+    Retorna o tempo virtual total.
+    """
+    loop = EventLoop()
+    recorder = _SimulationRecorder(config, cc, result)
+    size = config.packet_size
+    rto = 2 * (config.rtt_base + config.rtt_variance)
+    max_attempts = config.num_packets * 3   # Limite para evitar loop infinito
+    
+    in_flight = 0          # Bytes em voo
+    to_send = config.num_packets
+    packets_acked = 0
     
-    start_time = time.time()
+    def transmit():
+        result.packets_sent += 1
+        if rng.random() < config.loss_probability:
+            loop.schedule(rto, on_timeout)
+        else:
+            rtt = config.rtt_base + rng.uniform(-config.rtt_variance, config.rtt_variance)
+            loop.schedule(rtt, on_ack)
+    
+    def fill_window():
+        nonlocal in_flight, to_send
+        window = cc.get_effective_window()
+        while to_send > 0 and result.packets_sent < max_attempts and \
+                (in_flight == 0 or in_flight + size <= window):
+            in_flight += size
+            to_send -= 1
+            transmit()
+    
+    def on_ack():
+        nonlocal in_flight, packets_acked
+        in_flight -= size
+        cc.now = loop.now
+        cc.on_ack()
+        cc.bytes_acked += size
+        packets_acked += 1
+        result.total_bytes += size
+        recorder.on_ack(packets_acked, loop.now)
+        fill_window()
+    
+    def on_timeout():
+        nonlocal in_flight
+        cc.now = loop.now
+        cc.on_loss()
+        cc.packets_lost += 1
+        result.retransmissions += 1
+        if result.packets_sent < max_attempts:
+            transmit()                 # Retransmissão: continua em voo
+        else:
+            in_flight -= size
+        fill_window()
+    
+    fill_window()
+    elapsed = loop.run()
+    recorder.finish()
+    return elapsed
+
+
+def _simulate_window(config: SimulationConfig, cc: CongestionControlSimulator,
+                     result: SimulationResult, rng: random.Random) -> float:
+    """Motor por janela: cada rodada (um RTT virtual) leva uma janela inteira.
+    
+    A rodada envia min(cwnd, rwnd) / packet_size pacotes (ao menos um),
+    cada um com sua própria chance de perda. Os confirmados fazem cwnd
+    crescer ACK a ACK; se houve perda, a janela é reduzida uma única vez
+    (como o Reno, uma reação por janela), a rodada espera o RTO e os
+    perdidos voltam para a fila. O throughput de cada rodada é
+    bytes confirmados / duração da rodada.
+    """
+    recorder = _SimulationRecorder(config, cc, result)
+    size = config.packet_size
+    rto = 2 * (config.rtt_base + config.rtt_variance)
+    max_attempts = config.num_packets * 3   # Limite para evitar loop infinito
+    
+    clock = 0.0
+    remaining = config.num_packets
     packets_acked = 0
-    packets_attempted = 0
     
-    # Histórico para gráficos
-    sample_interval = max(1, config.num_packets // 100)  # 100 pontos no gráfico
-    last_progress = -1
+    while remaining > 0 and result.packets_sent < max_attempts:
+        window = cc.get_effective_window()
+        burst = min(remaining, max(1, int(window // size)), max_attempts - result.packets_sent)
+        result.packets_sent += burst
+        
+        lost = 0
+        for _ in range(burst):
+            if rng.random() < config.loss_probability:
+                lost += 1
+        acked = burst - lost
+        
+        # Os ACKs chegam ao fim do RTT da rodada
+        round_time = config.rtt_base + rng.uniform(-config.rtt_variance, config.rtt_variance)
+        cc.now = clock + round_time
+        for _ in range(acked):
+            cc.on_ack()
+        cc.bytes_acked += acked * size
+        packets_acked += acked
+        remaining -= acked
+        result.total_bytes += acked * size
+        
+        if lost:
+            cc.on_loss()
+            cc.packets_lost += lost
+            result.retransmissions += lost
+            round_time += rto
+        clock += round_time
+        
+        recorder.on_round(packets_acked, clock, acked * size / round_time / 1024)
     
-    print(f"\n{'─'*60}")
-    print(f"🔬 Simulação: {name}")
-    print(f"{'─'*60}")
-    print(f"  • Pacotes: {config.num_packets}")
-    print(f"  • Tamanho: {config.packet_size}b cada")
-    print(f"  • Perda: {config.loss_probability*100:.1f}%")
-    print(f"  • Controle de Congestionamento: {'SIM' if config.use_congestion_control else 'NÃO'}")
-    print(f"{'─'*60}")
+    recorder.finish()
+    return clock
+
+
+def _simulate_realtime(config: SimulationConfig, cc: CongestionControlSimulator,
+                       result: SimulationResult, rng: random.Random) -> float:
+    """Motor original: um pacote por vez, dormindo o RTT de cada um."""
+    recorder = _SimulationRecorder(config, cc, result)
+    start_time = time.time()
+    packets_acked = 0
+    packets_attempted = 0
     
     # Limite de tentativas para evitar loop infinito
     max_attempts = config.num_packets * 3
@@ -145,19 +489,18 @@ def run_simulation(config: SimulationConfig, name: str = "") -> SimulationResult
     while packets_acked < config.num_packets and packets_attempted < max_attempts:
         packets_attempted += 1
         
-        # Calcula quantos pacotes podem ser enviados (janela)
-        effective_window = cc.get_effective_window()
-        
         # Envia pacote
         result.packets_sent += 1
         
         # Simula RTT variável (reduzido para não demorar)
-        rtt = config.rtt_base + random.uniform(-config.rtt_variance, config.rtt_variance)
+        rtt = config.rtt_base + rng.uniform(-config.rtt_variance, config.rtt_variance)
         time.sleep(rtt)
+        cc.now = time.time() - start_time
         
         # Simula perda de pacote
-        if random.random() < config.loss_probability:
+        if rng.random() < config.loss_probability:
             cc.on_loss()
+            cc.packets_lost += 1
             result.retransmissions += 1
         else:
             # ACK recebido com sucesso
@@ -165,35 +508,48 @@ def run_simulation(config: SimulationConfig, name: str = "") -> SimulationResult
             cc.bytes_acked += config.packet_size
             packets_acked += 1
             result.total_bytes += config.packet_size
-        
-        # Registra histórico para gráficos
-        if packets_acked % sample_interval == 0 or packets_acked == config.num_packets:
-            elapsed = time.time() - start_time
-            if elapsed > 0:
-                instantaneous_throughput = result.total_bytes / elapsed / 1024  # KB/s
-            else:
-                instantaneous_throughput = 0
-                
-            result.cwnd_history.append(cc.cwnd if config.use_congestion_control else config.rwnd)
-            result.throughput_history.append(instantaneous_throughput)
-            result.time_history.append(elapsed)
-            result.phase_history.append(cc.get_phase())
-        
-        # Progresso (a cada 10%)
-        current_progress = int((packets_acked / config.num_packets) * 10)
-        if current_progress > last_progress and packets_acked > 0:
-            last_progress = current_progress
-            progress = (packets_acked / config.num_packets) * 100
-            print(f"  Progresso: {progress:.0f}% ({packets_acked}/{config.num_packets}) | "
-                  f"cwnd={cc.cwnd:.0f}b | fase={cc.get_phase()}")
+            recorder.on_ack(packets_acked, time.time() - start_time)
+    
+    recorder.finish()
+    return time.time() - start_time
+
+
+SIMULATION_ENGINES = {
+    "eventos": _simulate_events,
+    "janela": _simulate_window,
+    "tempo_real": _simulate_realtime,
+}
+
+
+def run_simulation(config: SimulationConfig, name: str = "") -> SimulationResult:
+    """Executa uma simulação com a configuração dada."""
+    
+    result = SimulationResult(config_name=name)
+    cc = CongestionControlSimulator(config)
+    rng = random.Random(config.seed)
+    simulate = SIMULATION_ENGINES[config.engine]
+    
+    print(f"\n{'─'*60}")
+    print(f"🔬 Simulação: {name}")
+    print(f"{'─'*60}")
+    print(f"  • Pacotes: {config.num_packets}")
+    print(f"  • Tamanho: {config.packet_size}b cada")
+    print(f"  • Perda: {config.loss_probability*100:.1f}%")
+    print(f"  • Controle de Congestionamento: "
+          f"{config.cc_algorithm.upper() if config.use_congestion_control else 'NÃO'}")
+    print(f"  • Motor: {config.engine}")
+    print(f"{'─'*60}")
+    
+    wall_start = time.time()
+    result.total_time = simulate(config, cc, result, rng)
     
     # Calcula resultados finais
-    result.total_time = time.time() - start_time
     result.packets_lost = cc.packets_lost
     result.throughput_bps = result.total_bytes / result.total_time if result.total_time > 0 else 0
     result.throughput_kbps = result.throughput_bps / 1024
     
-    print(f"\n  ✅ Concluído em {result.total_time:.2f}s")
+    print(f"\n  ✅ Concluído em {result.total_time:.2f}s"
+          f"{'' if config.engine == 'tempo_real' else f' (virtuais; {time.time() - wall_start:.2f}s reais)'}")
     print(f"  📊 Throughput: {result.throughput_kbps:.2f} KB/s")
     print(f"  🔄 Retransmissões: {result.retransmissions}")
     print(f"{'─'*60}\n")
@@ -201,12 +557,240 @@ def run_simulation(config: SimulationConfig, name: str = "") -> SimulationResult
     return result
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# SIMULAÇÃO MONTE CARLO (NumPy)
+# ═══════════════════════════════════════════════════════════════════════════
+# Mesmo modelo do motor "janela", mas avançando N fluxos Reno independentes
+# em paralelo (arrays de cwnd, ssthresh, pacotes restantes e relógio), uma
+# rodada por iteração. As perdas de cada rodada são sorteadas de uma vez
+# com binomial(burst, p); o crescimento de cwnd por `k` ACKs é calculado
+# em forma fechada:
+#   - Slow Start: +MSS por ACK até atingir ssthresh
+#   - Congestion Avoidance: cwnd² += 2·MSS²·k (soma contínua de MSS²/cwnd)
+# ═══════════════════════════════════════════════════════════════════════════
+
+BATCH_ENGINE = "janela"          # Motor cujo modelo o lote reproduz
+
+
+def simulate_batch(config: SimulationConfig, replications: int = 1000,
+                   loss_rates: Optional[List[float]] = None,
+                   seed: Optional[int] = None) -> 'np.ndarray':
+    """Simula `replications` fluxos por taxa de perda; retorna throughput (KB/s).
+    
+    O resultado tem forma (len(loss_rates), replications). Sem loss_rates,
+    usa config.loss_probability. Apenas Reno (ou sem controle).
+    """
+    import numpy as np
+    use_cc = config.use_congestion_control
+    if use_cc and config.cc_algorithm != "reno":
+        raise ValueError(f"Simulação em lote implementa apenas Reno (recebido {config.cc_algorithm!r})")
+    
+    rates = np.asarray([config.loss_probability] if loss_rates is None else loss_rates, dtype=float)
+    rng = np.random.default_rng(config.seed if seed is None else seed)
+    p = np.repeat(rates, replications)
+    n = p.size
+    size = config.packet_size
+    rto = 2 * (config.rtt_base + config.rtt_variance)
+    max_attempts = config.num_packets * 3   # Limite para evitar loop infinito
+    
+    cwnd = np.full(n, float(config.initial_cwnd) if use_cc else np.inf)
+    ssthresh = np.full(n, float(config.ssthresh))
+    remaining = np.full(n, config.num_packets, dtype=np.int64)
+    sent = np.zeros(n, dtype=np.int64)
+    clock = np.zeros(n)
+    active = remaining > 0
+    
+    while active.any():
+        idx = np.flatnonzero(active)
+        window = np.minimum(cwnd[idx], config.rwnd)
+        burst = np.maximum(1, window // size).astype(np.int64)
+        burst = np.minimum(np.minimum(burst, remaining[idx]), max_attempts - sent[idx])
+        sent[idx] += burst
+        
+        lost = rng.binomial(burst, p[idx])
+        acked = burst - lost
+        remaining[idx] -= acked
+        
+        if use_cc:
+            c = cwnd[idx]
+            st = ssthresh[idx]
+            ss_acks = np.where(c < st, np.minimum(acked, np.ceil((st - c) / MSS)), 0)
+            c = c + ss_acks * MSS
+            c = np.sqrt(c * c + 2.0 * MSS * MSS * (acked - ss_acks))
+            # Perda (tratada como timeout): ssthresh = cwnd/2, cwnd = 1*MSS
+            has_loss = lost > 0
+            ssthresh[idx] = np.where(has_loss, np.maximum(c / 2, 2 * MSS), st)
+            cwnd[idx] = np.where(has_loss, MSS, c)
+        
+        rtt = config.rtt_base + rng.uniform(-config.rtt_variance, config.rtt_variance, idx.size)
+        clock[idx] += rtt + np.where(lost > 0, rto, 0.0)
+        active = (remaining > 0) & (sent < max_attempts)
+    
+    delivered = (config.num_packets - remaining) * size
+    return (delivered / clock / 1024).reshape(rates.size, replications)
+
+
+def summarize_batch(throughputs: 'np.ndarray') -> Tuple[float, float, float]:
+    """(média, p5, p95) de um vetor de throughputs."""
+    import numpy as np
+    p5, p95 = np.percentile(throughputs, [5, 95])
+    return float(np.mean(throughputs)), float(p5), float(p95)
+
+
+def _batch_applies(engine: str, cc_algorithm: str = "reno") -> bool:
+    """O lote modela só o motor "janela" com Reno: não serve de intervalo para outro caso."""
+    if engine != BATCH_ENGINE:
+        print(f"  ℹ️  Monte Carlo ignorado: o lote modela o motor '{BATCH_ENGINE}', não '{engine}' "
+              f"(use --motor={BATCH_ENGINE})")
+        return False
+    if cc_algorithm != "reno":
+        print(f"  ℹ️  Monte Carlo ignorado: o lote modela só Reno, não '{cc_algorithm}'")
+        return False
+    return True
+
+
+def _attach_batch_stats(result: SimulationResult, throughputs: 'np.ndarray') -> None:
+    """Anexa média/p5/p95 do lote ao resultado da simulação individual."""
+    mean, p5, p95 = summarize_batch(throughputs)
+    result.replications = throughputs.size
+    result.throughput_mean_kbps = mean
+    result.throughput_p5_kbps = p5
+    result.throughput_p95_kbps = p95
+    print(f"  🎲 Monte Carlo ({throughputs.size} replicações): média={mean:.2f} KB/s | "
+          f"p5={p5:.2f} | p95={p95:.2f}")
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# VARREDURA PARALELA DE CENÁRIOS (com cache em disco)
+# ═══════════════════════════════════════════════════════════════════════════
+# Cada ponto da grade é uma SimulationConfig. Os pontos são distribuídos
+# entre processos (ProcessPoolExecutor) e cada resultado é gravado em
+# CACHE_DIR/<hash>.npz (save_result), onde o hash cobre a configuração inteira (inclusive
+# a semente). Rodar de novo só recalcula os pontos que mudaram.
+# ═══════════════════════════════════════════════════════════════════════════
+
+CACHE_DIR = ".cache_simulacoes"
+CACHE_VERSION = 2                         # Incrementar quando o modelo de simulação mudar
+
+
+def build_grid(base: Optional[SimulationConfig] = None, **axes) -> List[SimulationConfig]:
+    """Produto cartesiano dos eixos dados sobre uma configuração base.
+    
+    Ex.: build_grid(loss_probability=[0, 0.05], rwnd=[1024, 64000],
+                    cc_algorithm=["reno", "cubic"])  ->  8 configurações
+    """
+    base = base or SimulationConfig()
+    names = list(axes)
+    return [replace(base, **dict(zip(names, values)))
+            for values in itertools.product(*(axes[name] for name in names))]
+
+
+def config_key(config: SimulationConfig) -> str:
+    """Hash estável da configuração (inclui semente e versão do modelo)."""
+    payload = json.dumps({"version": CACHE_VERSION, **asdict(config)}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def _run_quiet(config: SimulationConfig, name: str) -> SimulationResult:
+    """Executa a simulação sem imprimir (saída de vários processos se misturaria)."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return run_simulation(config, name)
+
+
+def run_sweep(configs: List[SimulationConfig], names: Optional[List[str]] = None,
+              workers: Optional[int] = None, cache_dir: Optional[str] = CACHE_DIR,
+              seed: int = 0) -> List[SimulationResult]:
+    """Executa as configurações em paralelo, reaproveitando o cache em disco.
+    
+    Configurações sem semente recebem `seed` (o cache exige reprodutibilidade).
+    workers=None usa todos os núcleos; workers=1 executa no próprio processo.
+    Retorna os resultados na mesma ordem de `configs`.
+    """
+    configs = [c if c.seed is not None else replace(c, seed=seed) for c in configs]
+    names = names or [""] * len(configs)
+    results: List[Optional[SimulationResult]] = [None] * len(configs)
+    
+    # ────── Pontos já calculados ──────
+    paths = [None] * len(configs)
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        for i, config in enumerate(configs):
+            paths[i] = os.path.join(cache_dir, config_key(config) + ".npz")
+            if os.path.exists(paths[i]):
+                results[i] = load_result(paths[i])
+                results[i].config_name = names[i]
+    
+    pending = [i for i, r in enumerate(results) if r is None]
+    print(f"  🗂️  Varredura: {len(configs)} pontos | {len(configs) - len(pending)} do cache | "
+          f"{len(pending)} a calcular")
+    
+    # ────── Pontos novos, em paralelo ──────
+    if pending:
+        if workers == 1 or len(pending) == 1:
+            computed = [_run_quiet(configs[i], names[i]) for i in pending]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                computed = list(pool.map(_run_quiet, [configs[i] for i in pending],
+                                         [names[i] for i in pending]))
+        for i, result in zip(pending, computed):
+            results[i] = result
+            if paths[i]:
+                save_result(result, paths[i])
+    
+    return results
+
+
+def _print_sweep_table(configs: List[SimulationConfig], results: List[SimulationResult]) -> None:
+    """Tabela resumida de uma varredura."""
+    print(f"\n  {'Perda':>6} | {'RTT':>8} | {'ssthresh':>8} | {'rwnd':>7} | {'CC':>6} | "
+          f"{'Throughput':>14} | {'Retrans.':>8}")
+    print(f"  {'─'*6}─┼─{'─'*8}─┼─{'─'*8}─┼─{'─'*7}─┼─{'─'*6}─┼─{'─'*14}─┼─{'─'*8}")
+    for c, r in zip(configs, results):
+        cc = c.cc_algorithm if c.use_congestion_control else "—"
+        print(f"  {c.loss_probability*100:>5.1f}% | {c.rtt_base*1000:>6.2f}ms | {c.ssthresh:>8} | "
+              f"{c.rwnd:>7} | {cc:>6} | {r.throughput_kbps:>9.1f} KB/s | {r.retransmissions:>8}")
+
+
+def run_default_sweep(num_packets: int = 10000, engine: str = "eventos",
+                      workers: Optional[int] = None, cache_dir: Optional[str] = CACHE_DIR,
+                      cc_algorithms: Optional[List[str]] = None):
+    """Varredura padrão: perda × RTT × ssthresh × rwnd × algoritmo.
+    
+    cc_algorithms=None varre todos os algoritmos registrados.
+    """
+    print("\n" + "═"*70)
+    print("🧮 VARREDURA DE CENÁRIOS (perda × RTT × ssthresh × rwnd × CC)")
+    print("═"*70)
+    configs = build_grid(SimulationConfig(num_packets=num_packets, engine=engine),
+                         loss_probability=[0.0, 0.01, 0.05],
+                         rtt_base=[0.0002, 0.002],
+                         ssthresh=[16000, 64000],
+                         rwnd=[BUFFER_SIZE, 64000],
+                         cc_algorithm=cc_algorithms or sorted(CONGESTION_CONTROLS))
+    start = time.time()
+    results = run_sweep(configs, workers=workers, cache_dir=cache_dir)
+    _print_sweep_table(configs, results)
+    print(f"\n  ✅ Varredura concluída em {time.time() - start:.2f}s")
+    return configs, results
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # FUNÇÕES DE GERAÇÃO DE GRÁFICOS
 # ═══════════════════════════════════════════════════════════════════════════
+# matplotlib só é importado quando um gráfico é de fato gerado, sempre com o
+# backend Agg (apenas arquivos): rodadas sem gráficos não pagam a importação.
+
+def _pyplot():
+    """matplotlib.pyplot com backend Agg, importado sob demanda."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    return plt
+
 
 def plot_throughput_comparison(results: List[SimulationResult], title: str, filename: str):
     """Gera gráfico de barras comparando throughput."""
+    plt = _pyplot()
     
     plt.figure(figsize=(12, 6))
     
@@ -216,6 +800,15 @@ def plot_throughput_comparison(results: List[SimulationResult], title: str, file
     
     bars = plt.bar(names, throughputs, color=colors[:len(results)], edgecolor='black', linewidth=1.2)
     
+    # Intervalo p5–p95 do Monte Carlo (se executado)
+    if all(r.replications for r in results):
+        means = [r.throughput_mean_kbps for r in results]
+        lower = [r.throughput_mean_kbps - r.throughput_p5_kbps for r in results]
+        upper = [r.throughput_p95_kbps - r.throughput_mean_kbps for r in results]
+        plt.errorbar(names, means, yerr=[lower, upper], fmt='D', color='black',
+                     capsize=6, linewidth=1.5, label='Média e p5–p95 (Monte Carlo)')
+        plt.legend(loc='best', fontsize=10)
+    
     # Adiciona valores nas barras
     for bar, value in zip(bars, throughputs):
         plt.text(bar.get_x() + bar.get_width()/2, bar.get_height() + 0.5, 
@@ -234,6 +827,7 @@ def plot_throughput_comparison(results: List[SimulationResult], title: str, file
 
 def plot_cwnd_evolution(results: List[SimulationResult], title: str, filename: str):
     """Gera gráfico da evolução da janela de congestionamento."""
+    plt = _pyplot()
     
     plt.figure(figsize=(14, 6))
     
@@ -241,9 +835,8 @@ def plot_cwnd_evolution(results: List[SimulationResult], title: str, filename: s
     
     for i, result in enumerate(results):
         if result.cwnd_history:
-            # Normaliza o eixo X para porcentagem de progresso
-            x = np.linspace(0, 100, len(result.cwnd_history))
-            y = [c / 1024 for c in result.cwnd_history]  # Converte para KB
+            # Eixo X em porcentagem de progresso; cwnd convertido para KB
+            x, y = _series_xy(result, result.cwnd_history, 1 / 1024)
             plt.plot(x, y, label=result.config_name, color=colors[i % len(colors)], 
                      linewidth=2, marker='o', markersize=2)
     
@@ -261,6 +854,7 @@ def plot_cwnd_evolution(results: List[SimulationResult], title: str, filename: s
 
 def plot_throughput_over_time(results: List[SimulationResult], title: str, filename: str):
     """Gera gráfico de throughput ao longo do tempo."""
+    plt = _pyplot()
     
     plt.figure(figsize=(14, 6))
     
@@ -268,8 +862,8 @@ def plot_throughput_over_time(results: List[SimulationResult], title: str, filen
     
     for i, result in enumerate(results):
         if result.throughput_history:
-            x = np.linspace(0, 100, len(result.throughput_history))
-            plt.plot(x, result.throughput_history, label=result.config_name, 
+            x, y = _series_xy(result, result.throughput_history)
+            plt.plot(x, y, label=result.config_name, 
                      color=colors[i % len(colors)], linewidth=2)
     
     plt.xlabel('Progresso da Transmissão (%)', fontsize=12)
@@ -286,6 +880,7 @@ def plot_throughput_over_time(results: List[SimulationResult], title: str, filen
 
 def plot_loss_impact(results: List[SimulationResult], filename: str):
     """Gera gráfico mostrando impacto das perdas."""
+    plt = _pyplot()
     
     fig, axes = plt.subplots(1, 2, figsize=(14, 5))
     
@@ -329,6 +924,7 @@ def plot_loss_impact(results: List[SimulationResult], filename: str):
 
 def plot_combined_analysis(results: List[SimulationResult], filename: str):
     """Gera gráfico combinado com múltiplas métricas."""
+    plt = _pyplot()
     
     fig, axes = plt.subplots(2, 2, figsize=(15, 10))
     colors = ['#2ecc71', '#e74c3c', '#3498db', '#9b59b6']
@@ -347,8 +943,7 @@ def plot_combined_analysis(results: List[SimulationResult], filename: str):
     ax2 = axes[0, 1]
     for i, result in enumerate(results):
         if result.cwnd_history:
-            x = np.linspace(0, 100, len(result.cwnd_history))
-            y = [c / 1024 for c in result.cwnd_history]
+            x, y = _series_xy(result, result.cwnd_history, 1 / 1024)
             ax2.plot(x, y, label=result.config_name.split('\n')[0], 
                      color=colors[i % len(colors)], linewidth=2)
     ax2.set_xlabel('Progresso (%)', fontsize=10)
@@ -361,8 +956,8 @@ def plot_combined_analysis(results: List[SimulationResult], filename: str):
     ax3 = axes[1, 0]
     for i, result in enumerate(results):
         if result.throughput_history:
-            x = np.linspace(0, 100, len(result.throughput_history))
-            ax3.plot(x, result.throughput_history, label=result.config_name.split('\n')[0],
+            x, y = _series_xy(result, result.throughput_history)
+            ax3.plot(x, y, label=result.config_name.split('\n')[0],
                      color=colors[i % len(colors)], linewidth=2)
     ax3.set_xlabel('Progresso (%)', fontsize=10)
     ax3.set_ylabel('Throughput (KB/s)', fontsize=10)
@@ -402,92 +997,154 @@ def plot_combined_analysis(results: List[SimulationResult], filename: str):
     print(f"  📈 Gráfico salvo: {filename}")
 
 
+# ────── Figuras como tarefas (função, argumentos) ──────
+# Cada figura é independente: render_figures distribui as tarefas entre
+# processos, cada um com seu próprio matplotlib.
+
+def loss_figures(results: List[SimulationResult], out_dir: str = ".") -> List[Tuple]:
+    """Figuras da comparação com e sem perda."""
+    path = lambda name: os.path.join(out_dir, name)
+    return [
+        (plot_throughput_comparison, results, 'Impacto da Perda de Pacotes no Throughput',
+         path('grafico_perda_throughput.png')),
+        (plot_cwnd_evolution, results, 'Evolução do cwnd com Diferentes Taxas de Perda',
+         path('grafico_perda_cwnd.png')),
+        (plot_throughput_over_time, results, 'Throughput ao Longo do Tempo (Diferentes Perdas)',
+         path('grafico_perda_tempo.png')),
+    ]
+
+
+def congestion_figures(results: List[SimulationResult], out_dir: str = ".") -> List[Tuple]:
+    """Figuras da comparação com e sem controle de congestionamento."""
+    path = lambda name: os.path.join(out_dir, name)
+    return [
+        (plot_throughput_comparison, results, 'Comparação: Com vs Sem Controle de Congestionamento',
+         path('grafico_congestionamento_throughput.png')),
+        (plot_cwnd_evolution, results, 'Evolução do cwnd: Com vs Sem Controle',
+         path('grafico_congestionamento_cwnd.png')),
+        (plot_loss_impact, results, path('grafico_congestionamento_impacto.png')),
+        (plot_combined_analysis, results, path('grafico_analise_completa.png')),
+    ]
+
+
+def _render_figure(job: Tuple) -> str:
+    """Executa uma tarefa (função, *args); o último argumento é o arquivo."""
+    func, *args = job
+    func(*args)
+    return args[-1]
+
+
+def render_figures(jobs: List[Tuple], workers: Optional[int] = None) -> List[str]:
+    """Gera as figuras em paralelo (workers=1: no próprio processo).
+    
+    Retorna os arquivos gerados, na ordem das tarefas.
+    """
+    if workers == 1 or len(jobs) <= 1:
+        return [_render_figure(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_render_figure, jobs))
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # CENÁRIOS DE TESTE
 # ═══════════════════════════════════════════════════════════════════════════
 
-def run_loss_comparison(num_packets: int = 500) -> List[SimulationResult]:
-    """Compara cenários com e sem perda de pacotes."""
+def _run_scenarios(scenarios: List[Tuple[str, SimulationConfig]], workers: Optional[int] = 1,
+                   cache_dir: Optional[str] = None) -> List[SimulationResult]:
+    """Executa cenários (nome, config): em série e detalhado, ou pela varredura."""
+    if workers == 1 and not cache_dir:
+        return [run_simulation(config, name) for name, config in scenarios]
+    
+    results = run_sweep([config for _, config in scenarios], [name for name, _ in scenarios],
+                        workers=workers, cache_dir=cache_dir)
+    for result in results:
+        print(f"  • {result.config_name.replace(chr(10), ' '):<32} {result.throughput_kbps:>10.2f} KB/s | "
+              f"retransmissões={result.retransmissions}")
+    return results
+
+
+def loss_scenarios(num_packets: int = 500, engine: str = "eventos",
+                   cc_algorithm: str = "reno") -> List[Tuple[str, SimulationConfig]]:
+    """Cenários (nome, config) da comparação com e sem perda."""
+    base = SimulationConfig(num_packets=num_packets, engine=engine, use_congestion_control=True,
+                            cc_algorithm=cc_algorithm)
+    return [
+        ("Sem Perda\n(0%)", replace(base, loss_probability=0.0)),        # Cenário 1: Sem perda
+        ("Com Perda\n(5%)", replace(base, loss_probability=0.05)),       # Cenário 2: Com 5% de perda
+        ("Com Perda\n(10%)", replace(base, loss_probability=0.10)),      # Cenário 3: Com 10% de perda
+    ]
+
+
+def congestion_scenarios(num_packets: int = 500, engine: str = "eventos",
+                         cc_algorithm: str = "reno") -> List[Tuple[str, SimulationConfig]]:
+    """Cenários (nome, config) da comparação com e sem controle de congestionamento."""
+    base = SimulationConfig(num_packets=num_packets, engine=engine, cc_algorithm=cc_algorithm)
+    return [
+        ("Com Controle\nSem Perda", replace(base, loss_probability=0.0, use_congestion_control=True)),
+        ("Sem Controle\nSem Perda", replace(base, loss_probability=0.0, use_congestion_control=False)),
+        ("Com Controle\nCom Perda (5%)", replace(base, loss_probability=0.05, use_congestion_control=True)),
+        ("Sem Controle\nCom Perda (5%)", replace(base, loss_probability=0.05, use_congestion_control=False)),
+    ]
+
+
+def run_loss_comparison(num_packets: int = 500, engine: str = "eventos", replications: int = 0,
+                        workers: Optional[int] = 1, cache_dir: Optional[str] = None,
+                        cc_algorithm: str = "reno") -> List[SimulationResult]:
+    """Compara cenários com e sem perda de pacotes.
+    
+    Com replications > 0 e engine="janela", cada cenário também recebe
+    média/p5/p95 de um lote Monte Carlo (simulate_batch), vetorizado sobre
+    as três perdas.
+    """
     
     print("\n" + "═"*70)
     print("📊 COMPARAÇÃO: COM PERDA vs SEM PERDA")
     print("═"*70)
     
-    results = []
+    scenarios = loss_scenarios(num_packets, engine, cc_algorithm)
+    results = _run_scenarios(scenarios, workers, cache_dir)
     
-    # Cenário 1: Sem perda
-    config1 = SimulationConfig(
-        num_packets=num_packets,
-        loss_probability=0.0,
-        use_congestion_control=True
-    )
-    results.append(run_simulation(config1, "Sem Perda\n(0%)"))
-    
-    # Cenário 2: Com 5% de perda
-    config2 = SimulationConfig(
-        num_packets=num_packets,
-        loss_probability=0.05,
-        use_congestion_control=True
-    )
-    results.append(run_simulation(config2, "Com Perda\n(5%)"))
-    
-    # Cenário 3: Com 10% de perda
-    config3 = SimulationConfig(
-        num_packets=num_packets,
-        loss_probability=0.10,
-        use_congestion_control=True
-    )
-    results.append(run_simulation(config3, "Com Perda\n(10%)"))
+    if replications > 0 and _batch_applies(engine, cc_algorithm):
+        base = replace(scenarios[0][1], loss_probability=0.0)
+        batch = simulate_batch(base, replications, loss_rates=[0.0, 0.05, 0.10])
+        for result, throughputs in zip(results, batch):
+            _attach_batch_stats(result, throughputs)
     
     return results
 
 
-def run_congestion_control_comparison(num_packets: int = 500) -> List[SimulationResult]:
-    """Compara cenários com e sem controle de congestionamento."""
+def run_congestion_control_comparison(num_packets: int = 500, engine: str = "eventos",
+                                      replications: int = 0, workers: Optional[int] = 1,
+                                      cache_dir: Optional[str] = None,
+                                      cc_algorithm: str = "reno") -> List[SimulationResult]:
+    """Compara cenários com e sem controle de congestionamento.
+    
+    Com replications > 0 e engine="janela", anexa média/p5/p95 de um lote
+    Monte Carlo.
+    """
     
     print("\n" + "═"*70)
     print("📊 COMPARAÇÃO: COM vs SEM CONTROLE DE CONGESTIONAMENTO")
     print("═"*70)
     
-    results = []
-    
-    # Cenário 1: Com controle de congestionamento, sem perda
-    config1 = SimulationConfig(
-        num_packets=num_packets,
-        loss_probability=0.0,
-        use_congestion_control=True
-    )
-    results.append(run_simulation(config1, "Com Controle\nSem Perda"))
-    
-    # Cenário 2: Sem controle de congestionamento, sem perda
-    config2 = SimulationConfig(
-        num_packets=num_packets,
-        loss_probability=0.0,
-        use_congestion_control=False
-    )
-    results.append(run_simulation(config2, "Sem Controle\nSem Perda"))
-    
-    # Cenário 3: Com controle de congestionamento, com perda
-    config3 = SimulationConfig(
-        num_packets=num_packets,
-        loss_probability=0.05,
-        use_congestion_control=True
-    )
-    results.append(run_simulation(config3, "Com Controle\nCom Perda (5%)"))
+    scenarios = congestion_scenarios(num_packets, engine, cc_algorithm)
+    results = _run_scenarios(scenarios, workers, cache_dir)
     
-    # Cenário 4: Sem controle de congestionamento, com perda
-    config4 = SimulationConfig(
-        num_packets=num_packets,
-        loss_probability=0.05,
-        use_congestion_control=False
-    )
-    results.append(run_simulation(config4, "Sem Controle\nCom Perda (5%)"))
+    if replications > 0 and _batch_applies(engine, cc_algorithm):
+        for result, (_, config) in zip(results, scenarios):
+            _attach_batch_stats(result, simulate_batch(config, replications)[0])
     
     return results
 
 
-def run_all_scenarios(num_packets: int = 500):
-    """Executa todos os cenários e gera todos os gráficos."""
+def run_all_scenarios(num_packets: int = 500, engine: str = "eventos", replications: int = 0,
+                      workers: Optional[int] = None, cache_dir: Optional[str] = CACHE_DIR,
+                      cc_algorithm: str = "reno"):
+    """Executa todos os cenários e gera todos os gráficos.
+    
+    Os cenários rodam em paralelo (workers=None: todos os núcleos) e ficam
+    em cache em cache_dir; cache_dir=None desativa o cache.
+    """
     
     print("\n" + "═"*70)
     print("🚀 INICIANDO ANÁLISE COMPLETA DO PROTOCOLO")
@@ -497,6 +1154,10 @@ def run_all_scenarios(num_packets: int = 500):
     print(f"  • Tamanho do pacote: 500 bytes")
     print(f"  • MSS: {MSS} bytes")
     print(f"  • Buffer: {BUFFER_SIZE} bytes")
+    print(f"  • Motor de simulação: {engine}")
+    print(f"  • Controle de congestionamento: {cc_algorithm}")
+    if replications and engine == BATCH_ENGINE and cc_algorithm == "reno":
+        print(f"  • Monte Carlo: {replications} replicações por cenário (motor janela, NumPy)")
     print("═"*70)
     
     all_results = []
@@ -505,57 +1166,35 @@ def run_all_scenarios(num_packets: int = 500):
     print("\n\n" + "▓"*70)
     print("▓ TESTE 1: IMPACTO DA PERDA DE PACOTES")
     print("▓"*70)
-    loss_results = run_loss_comparison(num_packets)
+    loss_results = run_loss_comparison(num_packets, engine, replications, workers, cache_dir,
+                                       cc_algorithm)
     all_results.extend(loss_results)
     
-    print("\n📊 Gerando gráficos de perda...")
-    plot_throughput_comparison(loss_results, 
-                               'Impacto da Perda de Pacotes no Throughput',
-                               'grafico_perda_throughput.png')
-    plot_cwnd_evolution(loss_results,
-                        'Evolução do cwnd com Diferentes Taxas de Perda',
-                        'grafico_perda_cwnd.png')
-    plot_throughput_over_time(loss_results,
-                              'Throughput ao Longo do Tempo (Diferentes Perdas)',
-                              'grafico_perda_tempo.png')
-    
     # Teste 2: Comparação de controle de congestionamento
     print("\n\n" + "▓"*70)
     print("▓ TESTE 2: IMPACTO DO CONTROLE DE CONGESTIONAMENTO")
     print("▓"*70)
-    cc_results = run_congestion_control_comparison(num_packets)
-    
-    print("\n📊 Gerando gráficos de controle de congestionamento...")
-    plot_throughput_comparison(cc_results,
-                               'Comparação: Com vs Sem Controle de Congestionamento',
-                               'grafico_congestionamento_throughput.png')
-    plot_cwnd_evolution(cc_results,
-                        'Evolução do cwnd: Com vs Sem Controle',
-                        'grafico_congestionamento_cwnd.png')
-    plot_loss_impact(cc_results, 'grafico_congestionamento_impacto.png')
+    cc_results = run_congestion_control_comparison(num_packets, engine, replications,
+                                                   workers, cache_dir, cc_algorithm)
     
-    # Gráfico combinado final
-    print("\n\n📊 Gerando gráfico de análise combinada...")
-    plot_combined_analysis(cc_results, 'grafico_analise_completa.png')
+    # Gráficos em paralelo, um processo por figura
+    print("\n\n📊 Gerando gráficos...")
+    files = render_figures(loss_figures(loss_results) + congestion_figures(cc_results), workers)
     
     # Resumo final
     print("\n\n" + "═"*70)
     print("✅ ANÁLISE CONCLUÍDA COM SUCESSO!")
     print("═"*70)
     print("\n📁 Arquivos gerados:")
-    print("  • grafico_perda_throughput.png")
-    print("  • grafico_perda_cwnd.png")
-    print("  • grafico_perda_tempo.png")
-    print("  • grafico_congestionamento_throughput.png")
-    print("  • grafico_congestionamento_cwnd.png")
-    print("  • grafico_congestionamento_impacto.png")
-    print("  • grafico_analise_completa.png")
+    for filename in files:
+        print(f"  • {filename}")
     print("\n" + "═"*70)
     
     return loss_results, cc_results
 
 
-def run_single_test(loss: bool = False, congestion_control: bool = True, num_packets: int = 500):
+def run_single_test(loss: bool = False, congestion_control: bool = True, num_packets: int = 500,
+                    cc_algorithm: str = "reno", engine: str = "eventos"):
     """Executa um único teste com configurações específicas."""
     
     loss_prob = 0.05 if loss else 0.0
@@ -566,8 +1205,10 @@ def run_single_test(loss: bool = False, congestion_control: bool = True, num_pac
     
     config = SimulationConfig(
         num_packets=num_packets,
+        engine=engine,
         loss_probability=loss_prob,
-        use_congestion_control=congestion_control
+        use_congestion_control=congestion_control,
+        cc_algorithm=cc_algorithm
     )
     
     name = f"{'Com' if congestion_control else 'Sem'} Controle\n{'Com' if loss else 'Sem'} Perda"
@@ -577,13 +1218,13 @@ def run_single_test(loss: bool = False, congestion_control: bool = True, num_pac
     print("\n📊 Gerando gráfico...")
     suffix = f"{'loss' if loss else 'noloss'}_{'cc' if congestion_control else 'nocc'}"
     
+    plt = _pyplot()
     plt.figure(figsize=(12, 5))
     
     # Subplot 1: cwnd
     plt.subplot(1, 2, 1)
     if result.cwnd_history:
-        x = np.linspace(0, 100, len(result.cwnd_history))
-        y = [c / 1024 for c in result.cwnd_history]
+        x, y = _series_xy(result, result.cwnd_history, 1 / 1024)
         plt.plot(x, y, color='#3498db', linewidth=2)
     plt.xlabel('Progresso (%)')
     plt.ylabel('cwnd (KB)')
@@ -593,8 +1234,8 @@ def run_single_test(loss: bool = False, congestion_control: bool = True, num_pac
     # Subplot 2: Throughput
     plt.subplot(1, 2, 2)
     if result.throughput_history:
-        x = np.linspace(0, 100, len(result.throughput_history))
-        plt.plot(x, result.throughput_history, color='#2ecc71', linewidth=2)
+        x, y = _series_xy(result, result.throughput_history)
+        plt.plot(x, y, color='#2ecc71', linewidth=2)
     plt.xlabel('Progresso (%)')
     plt.ylabel('Throughput (KB/s)')
     plt.title('Throughput ao Longo do Tempo')
@@ -610,6 +1251,79 @@ def run_single_test(loss: bool = False, congestion_control: bool = True, num_pac
     return result
 
 
+# ═══════════════════════════════════════════════════════════════════════════
+# MODO EM LOTE (sem interação)
+# ═══════════════════════════════════════════════════════════════════════════
+# Para execuções automáticas (ex.: regressão noturna): roda os grupos de
+# cenários escolhidos, grava métricas em JSON e/ou CSV e só importa
+# matplotlib se houver gráficos a gerar.
+# ═══════════════════════════════════════════════════════════════════════════
+
+BATCH_GROUPS = {
+    # grupo: (cenários, execução, figuras)
+    "perda": (loss_scenarios, run_loss_comparison, loss_figures),
+    "congestionamento": (congestion_scenarios, run_congestion_control_comparison, congestion_figures),
+}
+
+
+def result_metrics(group: str, name: str, config: SimulationConfig,
+                   result: SimulationResult) -> Dict:
+    """Linha de métricas: grupo, cenário, configuração e escalares do resultado."""
+    row = {"grupo": group, "cenario": name.replace("\n", " ")}
+    row.update(asdict(config))
+    for f in fields(SimulationResult):
+        if f.name != "config_name" and f.name not in _HISTORY_FIELDS:
+            row[f.name] = getattr(result, f.name)
+    return row
+
+
+def write_metrics(rows: List[Dict], path: str) -> None:
+    """Grava as métricas em JSON ou CSV, conforme a extensão de path."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.endswith(".csv"):
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, "w") as f:
+            json.dump(rows, f, indent=2, ensure_ascii=False)
+
+
+def run_batch(groups: List[str], num_packets: int = 500, engine: str = "eventos",
+              replications: int = 0, workers: Optional[int] = None,
+              cache_dir: Optional[str] = CACHE_DIR, metrics_paths: List[str] = (),
+              plots: bool = True, out_dir: str = ".", cc_algorithm: str = "reno") -> List[Dict]:
+    """Executa os grupos de cenários sem interação e retorna as métricas."""
+    start = time.time()
+    rows, jobs = [], []
+    for group in groups:
+        build_scenarios, run_group, figures = BATCH_GROUPS[group]
+        results = run_group(num_packets, engine, replications, workers, cache_dir, cc_algorithm)
+        for (name, config), result in zip(build_scenarios(num_packets, engine, cc_algorithm),
+                                          results):
+            if config.seed is None and (workers != 1 or cache_dir):
+                config = replace(config, seed=0)        # Semente aplicada por run_sweep
+            rows.append(result_metrics(group, name, config, result))
+        if plots:
+            jobs.extend(figures(results, out_dir))
+    
+    for path in metrics_paths:
+        write_metrics(rows, path)
+        print(f"  📝 Métricas salvas: {path}")
+    
+    if jobs:
+        os.makedirs(out_dir, exist_ok=True)
+        print("\n📊 Gerando gráficos...")
+        render_figures(jobs, workers)
+    
+    print(f"\n  ✅ Lote concluído em {time.time() - start:.2f}s "
+          f"({len(rows)} cenários, {len(jobs)} gráficos)")
+    return rows
+
+
 # ═══════════════════════════════════════════════════════════════════════════
 # MENU INTERATIVO
 # ═══════════════════════════════════════════════════════════════════════════
@@ -725,6 +1439,16 @@ if __name__ == "__main__":
         loss = False
         congestion = True
         all_tests = False
+        cc_algorithm = None             # None: Reno (varredura: todos os algoritmos)
+        engine = "eventos"
+        replications = 0
+        sweep = False
+        workers = None
+        cache_dir = CACHE_DIR
+        batch_groups = None
+        metrics_paths = []
+        plots = True
+        out_dir = "."
         
         for arg in args:
             if arg in ['--all', '-a']:
@@ -737,6 +1461,41 @@ if __name__ == "__main__":
                 congestion = True
             elif arg in ['--no-congestion', '-nc']:
                 congestion = False
+            elif arg.startswith('--cc='):
+                cc_algorithm = arg.split('=')[1]
+                if cc_algorithm not in CONGESTION_CONTROLS:
+                    print(f"❌ Algoritmo desconhecido: {cc_algorithm} "
+                          f"(disponíveis: {', '.join(sorted(CONGESTION_CONTROLS))})")
+                    sys.exit(1)
+            elif arg.startswith('--motor='):
+                engine = arg.split('=')[1]
+                if engine not in SIMULATION_ENGINES:
+                    print(f"❌ Motor desconhecido: {engine} "
+                          f"(disponíveis: {', '.join(SIMULATION_ENGINES)})")
+                    sys.exit(1)
+            elif arg.startswith('--replicacoes='):
+                replications = int(arg.split('=')[1])
+            elif arg in ['--varredura', '--sweep']:
+                sweep = True
+            elif arg.startswith('--workers='):
+                workers = int(arg.split('=')[1])
+            elif arg == '--sem-cache':
+                cache_dir = None
+            elif arg in ['--lote', '--batch']:
+                batch_groups = batch_groups or list(BATCH_GROUPS)
+            elif arg.startswith('--cenarios='):
+                batch_groups = [g for g in arg.split('=')[1].split(',') if g]
+                unknown = [g for g in batch_groups if g not in BATCH_GROUPS]
+                if unknown:
+                    print(f"❌ Grupo desconhecido: {', '.join(unknown)} "
+                          f"(disponíveis: {', '.join(BATCH_GROUPS)})")
+                    sys.exit(1)
+            elif arg.startswith('--metricas='):
+                metrics_paths.append(arg.split('=', 1)[1])
+            elif arg == '--sem-graficos':
+                plots = False
+            elif arg.startswith('--saida='):
+                out_dir = arg.split('=', 1)[1]
             elif arg.startswith('--packets='):
                 num_packets = int(arg.split('=')[1])
             elif arg.startswith('-n'):
@@ -745,7 +1504,15 @@ if __name__ == "__main__":
                 print(__doc__)
                 sys.exit(0)
         
-        if all_tests:
-            run_all_scenarios(num_packets)
+        if batch_groups:
+            run_batch(batch_groups, num_packets, engine, replications, workers, cache_dir,
+                      metrics_paths, plots, out_dir, cc_algorithm or "reno")
+        elif sweep:
+            run_default_sweep(num_packets, engine, workers, cache_dir,
+                              [cc_algorithm] if cc_algorithm else None)
+        elif all_tests:
+            run_all_scenarios(num_packets, engine, replications, workers, cache_dir,
+                              cc_algorithm or "reno")
         else:
-            run_single_test(loss=loss, congestion_control=congestion, num_packets=num_packets)
+            run_single_test(loss=loss, congestion_control=congestion, num_packets=num_packets,
+                            cc_algorithm=cc_algorithm or "reno", engine=engine)
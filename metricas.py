@@ -0,0 +1,167 @@
+"""
+Métricas ao Vivo - Trabalho Final Redes de Computadores (UFJF)
+
+Registro de métricas (contadores, medidores e histogramas com baldes
+logarítmicos) exposto no formato texto do Prometheus por um servidor HTTP
+local, em uma thread daemon:
+
+    python3 servidor.py -b --metricas=9100
+    python3 cliente.py -b -p --metricas=9101
+    curl http://127.0.0.1:9101/metrics
+
+Custo no caminho quente:
+    - Contadores e medidores podem ler o estado existente (ex.: Sender.stats)
+      por uma função chamada só na coleta: nenhum custo por pacote
+    - Histogramas custam um math.frexp e um incremento de lista por amostra,
+      e só existem quando as métricas estão habilitadas
+"""
+
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_HOST = "127.0.0.1"
+
+
+class Counter:
+    """Contador monotônico (inc) ou lido de fn() na coleta."""
+
+    kind = "counter"
+
+    def __init__(self, name, help_text, fn=None):
+        self.name = name
+        self.help = help_text
+        self.fn = fn
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self):
+        yield self.name, self.fn() if self.fn is not None else self.value
+
+
+class Gauge(Counter):
+    """Valor instantâneo (set) ou lido de fn() na coleta; None vira NaN."""
+
+    kind = "gauge"
+
+    def set(self, value):
+        self.value = value
+
+
+class Histogram:
+    """Histograma com baldes logarítmicos de base 2.
+
+    O balde i conta as amostras <= start·2^i (i = 0..buckets-1), e o último
+    conta o resto (+Inf). O índice sai do expoente de math.frexp, sem busca.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, help_text, start=1e-6, buckets=24):
+        self.name = name
+        self.help = help_text
+        self.start = start
+        self.bounds = [start * 2 ** i for i in range(buckets)]
+        self.counts = [0] * (buckets + 1)
+        self.sum = 0.0
+        self._scale = 1.0 / start
+        self._last = buckets
+
+    def observe(self, value):
+        mantissa, exponent = math.frexp(value * self._scale)
+        if mantissa == 0.5:
+            exponent -= 1                       # Potência exata de 2: limite inclusivo
+        if exponent < 0:
+            exponent = 0
+        elif exponent > self._last:
+            exponent = self._last
+        self.counts[exponent] += 1
+        self.sum += value
+
+    def samples(self):
+        counts = list(self.counts)              # Cópia: a coleta roda em outra thread
+        cumulative = 0
+        for bound, count in zip(self.bounds, counts):
+            cumulative += count
+            yield f'{self.name}_bucket{{le="{_format_value(bound)}"}}', cumulative
+        cumulative += counts[-1]
+        yield f'{self.name}_bucket{{le="+Inf"}}', cumulative
+        yield f"{self.name}_sum", self.sum
+        yield f"{self.name}_count", cumulative
+
+
+class MetricsRegistry:
+    """Conjunto de métricas, renderizado no formato texto do Prometheus."""
+
+    def __init__(self, prefix=""):
+        self.prefix = prefix
+        self.metrics = {}
+
+    def _add(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f"Métrica duplicada: {metric.name}")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, help_text, fn=None):
+        return self._add(Counter(self.prefix + name, help_text, fn))
+
+    def gauge(self, name, help_text, fn=None):
+        return self._add(Gauge(self.prefix + name, help_text, fn))
+
+    def histogram(self, name, help_text, start=1e-6, buckets=24):
+        return self._add(Histogram(self.prefix + name, help_text, start, buckets))
+
+    def render(self):
+        lines = []
+        for metric in list(self.metrics.values()):
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            for name, value in metric.samples():
+                lines.append(f"{name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _format_value(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return "NaN" if math.isnan(value) else repr(value)
+    return str(value)
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ENDPOINT HTTP
+# ═══════════════════════════════════════════════════════════════════════════
+
+def start_http_server(registry, port=0, host=DEFAULT_HOST):
+    """Serve GET /metrics em uma thread daemon; retorna o servidor HTTP.
+
+    port=0 escolhe uma porta livre (veja server.server_address).
+    """
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                self.send_error(404)
+                return
+            body = registry.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass                                # Sem log por requisição no console
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="metricas-http", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,254 @@
+"""
+Microbenchmarks - Trabalho Final Redes de Computadores (UFJF)
+
+Mede o custo dos caminhos quentes do protocolo isoladamente (sem rede).
+
+Uso:
+    python3 microbench.py                  # Cifra XOR: byte a byte vs. vetorizada
+    python3 microbench.py --seconds=0.5    # Tempo de medição por caso
+    python3 microbench.py --primitivas     # ns/op e bytes alocados/op das primitivas,
+                                           # comparados com microbench_baseline.json
+    python3 microbench.py --primitivas --salvar-baseline   # Regrava o baseline
+    python3 microbench.py --primitivas --tolerancia=0.5    # Piora tolerada (padrão 30%)
+"""
+
+import os
+import json
+import time
+import tracemalloc
+from utils import Security, Packet, MSS
+
+
+def xor_bytewise(data, key):
+    """Implementação original de Security.encrypt (referência 'antes')."""
+    output = bytearray()
+    key_len = len(key)
+    for i, byte in enumerate(data):
+        output.append(byte ^ key[i % key_len])
+    return bytes(output)
+
+
+def measure(func, seconds=0.3):
+    """Executa func repetidamente por ~seconds; retorna (chamadas, tempo)."""
+    calls = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        for _ in range(10):
+            func()
+        calls += 10
+        now = time.perf_counter()
+        if now >= deadline:
+            return calls, now - start
+
+
+def bench_xor(sizes=(64, 500, MSS, 64 * 1024), seconds=0.3):
+    """Vazão (MB/s) da cifra XOR antes e depois da versão vetorizada."""
+    security = Security()
+    security.set_key(security.generate_key())
+    key = security.key
+
+    print("\n" + "═"*70)
+    print("🔐 CIFRA XOR: byte a byte (antes) vs. inteiro grande (depois)")
+    print("═"*70)
+    print(f"  {'Tamanho':>10} | {'Antes (MB/s)':>14} | {'Depois (MB/s)':>14} | {'Ganho':>8}")
+    print(f"  {'─'*10}─┼─{'─'*14}─┼─{'─'*14}─┼─{'─'*8}")
+
+    results = []
+    for size in sizes:
+        data = os.urandom(size)
+        assert security.encrypt(data) == xor_bytewise(data, key), "Cifra incompatível!"
+
+        calls, elapsed = measure(lambda: xor_bytewise(data, key), seconds)
+        before = calls * size / elapsed / 1e6
+        calls, elapsed = measure(lambda: security.encrypt(data), seconds)
+        after = calls * size / elapsed / 1e6
+
+        results.append((size, before, after))
+        print(f"  {size:>9}b | {before:>14.1f} | {after:>14.1f} | {after/before:>7.1f}x")
+
+    print("═"*70)
+    return results
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# PRIMITIVAS DO TRANSPORTE
+# ═══════════════════════════════════════════════════════════════════════════
+# Cada caso é (nome, op, setup). Sem setup, op() é repetida em rajadas; com
+# setup, setup() prepara fora da medição o estado que op(estado) consome
+# (ex.: uma janela de N segmentos a drenar) e só op é cronometrada.
+# Alocação = pico de memória rastreada (tracemalloc) durante uma op.
+# ═══════════════════════════════════════════════════════════════════════════
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "microbench_baseline.json")
+DEFAULT_TOLERANCE = 0.30        # Piora relativa tolerada (ns/op e bytes/op)
+ALLOC_SLACK = 64                # Bytes de folga na comparação de alocações
+WINDOWS = (10, 100, 1000, 10000)
+
+
+def time_op(op, setup=None, seconds=0.3):
+    """Tempo médio por operação, em ns."""
+    if setup is None:
+        calls, elapsed = measure(op, seconds)
+        return elapsed / calls * 1e9
+    total = 0
+    calls = 0
+    deadline = time.perf_counter() + seconds
+    while calls < 3 or time.perf_counter() < deadline:
+        state = setup()
+        start = time.perf_counter_ns()
+        op(state)
+        total += time.perf_counter_ns() - start
+        calls += 1
+    return total / calls
+
+
+def alloc_op(op, setup=None, repeats=5):
+    """Bytes alocados (pico acima do estado inicial) por operação; mediana."""
+    samples = []
+    tracemalloc.start()
+    try:
+        for _ in range(repeats):
+            args = (setup(),) if setup is not None else ()
+            current = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            op(*args)
+            samples.append(tracemalloc.get_traced_memory()[1] - current)
+    finally:
+        tracemalloc.stop()
+    return sorted(samples)[len(samples) // 2]
+
+
+def primitive_cases(windows=WINDOWS):
+    """Casos (nome, op, setup) com tamanhos realistas (payload MSS, janelas de N segmentos)."""
+    from congestionamento import CongestionControl
+    from servidor import ReorderBuffer
+    from cliente import Sender
+    from transporte import MemoryNetwork
+
+    payload = os.urandom(MSS)
+    pkt = Packet(seq_num=100, ack_num=0, flags=0, window=0, payload=payload)
+    datagram = pkt.to_bytes()
+    security = Security()
+    security.set_key(security.generate_key())
+    security.encryption_enabled = True
+
+    cc = CongestionControl(verbose=False)
+    next_ack = [100]
+
+    def new_ack():
+        next_ack[0] += MSS
+        cc.on_new_ack(next_ack[0], verbose=False)
+
+    cases = [
+        ("Packet.to_bytes", pkt.to_bytes, None),
+        ("Packet.from_bytes", lambda: Packet.from_bytes(datagram), None),
+        ("Security.encrypt", lambda: security.encrypt(payload), None),
+        ("CongestionControl.on_new_ack", new_ack, None),
+    ]
+
+    for window in windows:
+        def fill_reorder(window=window):
+            buffer = ReorderBuffer()
+            for i in reversed(range(window)):        # Chegada fora de ordem
+                buffer.insert(100 + i * MSS, payload)
+            return buffer
+
+        def drain(buffer):
+            for _ in buffer.drain(100):
+                pass
+
+        cases.append((f"ReorderBuffer.drain[w={window}]", drain, fill_reorder))
+
+    # Sender sobre a rede em memória: sem socket, relógio virtual
+    sender = Sender(timeout=0.2, verbose=False, transport=MemoryNetwork().endpoint())
+    for window in windows:
+        def fill_unacked(window=window):
+            seq = sender.next_seq
+            for _ in range(window):
+                sender.unacked_packets.append(seq, {
+                    'packet': pkt, 'timestamp': 0.0, 'first_sent': 0.0,
+                    'payload': payload, 'retransmitted': False})
+                seq += MSS
+            sender.next_seq = seq
+            return seq
+
+        cases.append((f"Sender._remove_acked_packets[w={window}]",
+                      sender._remove_acked_packets, fill_unacked))
+    return cases
+
+
+def bench_primitives(seconds=0.3, baseline=None, tolerance=DEFAULT_TOLERANCE):
+    """Mede cada primitiva; com baseline, marca as que pioraram além da tolerância.
+
+    Retorna ({nome: {"ns_per_op", "alloc_bytes"}}, [nomes que regrediram]).
+    """
+    print("\n" + "═"*88)
+    print("⏱️  PRIMITIVAS DO TRANSPORTE: ns/op e bytes alocados/op (tracemalloc)")
+    print("═"*88)
+    print(f"  {'Primitiva':<40} | {'ns/op':>11} | {'B/op':>8} | {'Baseline ns':>11} | {'Δ':>6}")
+    print(f"  {'─'*40}─┼─{'─'*11}─┼─{'─'*8}─┼─{'─'*11}─┼─{'─'*6}")
+
+    results = {}
+    regressions = []
+    for name, op, setup in primitive_cases():
+        ns = time_op(op, setup, seconds)
+        alloc = alloc_op(op, setup)
+        results[name] = {"ns_per_op": round(ns, 1), "alloc_bytes": alloc}
+
+        reference = (baseline or {}).get(name)
+        if reference:
+            delta = ns / reference["ns_per_op"] - 1
+            worse = (delta > tolerance or
+                     alloc > reference["alloc_bytes"] * (1 + tolerance) + ALLOC_SLACK)
+            if worse:
+                regressions.append(name)
+            print(f"  {name:<40} | {ns:>11,.0f} | {alloc:>8,} | {reference['ns_per_op']:>11,.0f} | "
+                  f"{delta*100:>+5.0f}%{'  ⚠️' if worse else ''}")
+        else:
+            print(f"  {name:<40} | {ns:>11,.0f} | {alloc:>8,} | {'-':>11} | {'-':>6}")
+
+    print("═"*88)
+    if baseline is not None:
+        if regressions:
+            print(f"⚠️  {len(regressions)} primitiva(s) piorou(aram) mais de {tolerance*100:.0f}% "
+                  f"em relação ao baseline")
+        else:
+            print(f"✅ Nenhuma piora acima de {tolerance*100:.0f}% em relação ao baseline")
+    return results, regressions
+
+
+if __name__ == "__main__":
+    import sys
+
+    seconds = 0.3
+    primitives = False
+    save = False
+    tolerance = DEFAULT_TOLERANCE
+    for arg in sys.argv[1:]:
+        if arg.startswith("--seconds="):
+            seconds = float(arg.split("=", 1)[1])
+        elif arg == "--primitivas":
+            primitives = True
+        elif arg == "--salvar-baseline":
+            save = True
+        elif arg.startswith("--tolerancia="):
+            tolerance = float(arg.split("=", 1)[1])
+        elif arg in ("--help", "-h"):
+            print(__doc__)
+            sys.exit(0)
+
+    if not primitives:
+        bench_xor(seconds=seconds)
+        sys.exit(0)
+
+    baseline = None
+    if not save and os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baseline = json.load(f)
+    results, regressions = bench_primitives(seconds, baseline, tolerance)
+    if save:
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"📌 Baseline salvo: {BASELINE_FILE}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,189 @@
+"""
+Perfilamento - Trabalho Final Redes de Computadores (UFJF)
+
+cProfile e tracemalloc restritos ao laço de transferência (sem banners nem
+configuração), ligados pela linha de comando do cliente e do servidor:
+
+    python3 servidor.py -b --profile                     # servidor.pstats
+    python3 cliente.py -b -p --profile=cliente.pstats --trace-memory
+    python3 cliente.py -b -p --profile --amostra=10      # 1 pacote a cada 10
+    kill -USR1 <pid>                                     # Relatório parcial
+    python3 -m pstats servidor.pstats                    # Exploração interativa
+
+Relatórios:
+    - Na saída (fim da transferência, Ctrl+C, SIGTERM) e a cada SIGUSR1,
+      sem interromper a execução; o arquivo é regravado a cada relatório
+    - cProfile: arquivo pstats + funções com maior tempo próprio
+    - tracemalloc: snapshot (tracemalloc.Snapshot.load) + linhas que mais
+      alocaram desde o início do laço
+
+Amostragem (--amostra=N): o cProfile fica ligado só em 1 de cada N pacotes
+(do início do tratamento desse pacote até o próximo), o que reduz a
+distorção em execuções de 10k+ pacotes. O tracemalloc não pode ser
+desligado sem perder os rastros: segue contínuo e anota a memória
+atual/pico a cada N pacotes.
+"""
+
+import sys
+import signal
+import pstats
+import cProfile
+import threading
+import contextlib
+import tracemalloc
+from array import array
+
+PROFILE_TOP = 20                # Funções listadas no relatório do cProfile
+MEMORY_TOP = 15                 # Linhas listadas no relatório do tracemalloc
+MEMORY_FRAMES = 1               # Quadros guardados por alocação (estatística por linha)
+MEMORY_SAMPLES_SHOWN = 10       # Amostras de memória exibidas (espaçadas)
+
+
+class Profiler:
+    """cProfile e/ou tracemalloc em torno do laço de transferência."""
+
+    def __init__(self, name, profile_path=None, memory_path=None, every=1):
+        self.name = name
+        self.profile_path = profile_path
+        self.memory_path = memory_path
+        self.every = max(1, every)
+        self.profile = cProfile.Profile() if profile_path else None
+        self.boundary = None            # Método que marca a fronteira de pacote
+        self.packets = 0
+        self.sampled = 0
+        self.memory_samples = array('q')    # Triplas achatadas: pacotes, bytes atuais, pico
+        self.reports = 0
+        self._running = False
+        self._active = False            # cProfile ligado neste instante
+
+    # ────── Amostragem por pacote ──────
+
+    def attach(self, obj, method_name):
+        """Marca cada chamada de obj.method_name como fronteira de pacote.
+
+        Só instala o invólucro com --amostra=N (N > 1); sem amostragem o
+        caminho do pacote não muda.
+        """
+        if self.every == 1:
+            return
+        self.boundary = method_name
+        method = getattr(obj, method_name)
+        tick = self.tick
+
+        def sampled(*args, **kwargs):
+            tick()
+            return method(*args, **kwargs)
+
+        setattr(obj, method_name, sampled)
+
+    def tick(self):
+        self.packets += 1
+        if self.packets % self.every:
+            if self._active:
+                self._disable()
+            return
+        if self.profile is not None and self._running:
+            self.sampled += 1
+            self._enable()
+        if self.memory_path is not None and self._running:
+            self.memory_samples.append(self.packets)
+            self.memory_samples.extend(tracemalloc.get_traced_memory())
+
+    def _enable(self):
+        if not self._active:
+            self.profile.enable()
+            self._active = True
+
+    def _disable(self):
+        if self._active:
+            self.profile.disable()
+            self._active = False
+
+    # ────── Ciclo de vida ──────
+
+    @contextlib.contextmanager
+    def running(self):
+        """Perfila o trecho; relatório na saída e a cada SIGUSR1."""
+        previous = self._install_signal()
+        if self.memory_path is not None:
+            tracemalloc.start(MEMORY_FRAMES)     # Só rastreia o que o laço alocar
+        self._running = True
+        if self.profile is not None and self.every == 1:
+            self._enable()
+        try:
+            yield self
+        finally:
+            self._disable()
+            self._running = False
+            self.report("saída")
+            if self.memory_path is not None:
+                tracemalloc.stop()
+            if previous is not None:
+                signal.signal(signal.SIGUSR1, previous)
+
+    def _install_signal(self):
+        # Sinais só podem ser tratados na thread principal (e não no Windows)
+        if not hasattr(signal, "SIGUSR1") or threading.current_thread() is not threading.main_thread():
+            return None
+        return signal.signal(signal.SIGUSR1, lambda signum, frame: self.report("SIGUSR1"))
+
+    # ────── Relatórios ──────
+
+    def report(self, reason):
+        """Grava os arquivos e imprime o resumo (perfil segue ativo depois)."""
+        self.reports += 1
+        print("\n" + "═"*70)
+        print(f"🔎 PERFIL DO {self.name.upper()} ({reason}, relatório #{self.reports})")
+        print("═"*70)
+        if self.profile is not None:
+            self._report_profile()
+        if self.memory_path is not None and tracemalloc.is_tracing():
+            self._report_memory()
+        print("═"*70 + "\n")
+
+    def _report_profile(self):
+        was_active = self._active
+        self._disable()
+        self.profile.dump_stats(self.profile_path)
+        if self.every > 1:
+            print(f"  • Amostras: {self.sampled} de {self.packets} chamadas de {self.boundary} "
+                  f"(1 a cada {self.every})")
+        print(f"  📄 pstats: {self.profile_path} (python3 -m pstats {self.profile_path})")
+        print(f"\n  ⏱️  {PROFILE_TOP} funções com maior tempo próprio:")
+        stats = pstats.Stats(self.profile_path, stream=sys.stdout)
+        stats.strip_dirs().sort_stats("tottime").print_stats(PROFILE_TOP)
+        if was_active:
+            self._enable()
+
+    def _report_memory(self):
+        # Sem as alocações do próprio perfilamento (amostras, cProfile, pstats)
+        snapshot = tracemalloc.take_snapshot().filter_traces(tuple(
+            tracemalloc.Filter(False, module.__file__)
+            for module in (sys.modules[__name__], tracemalloc, cProfile, pstats)
+        ) + (tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),))
+        snapshot.dump(self.memory_path)
+        current, peak = tracemalloc.get_traced_memory()
+        print(f"  📄 Snapshot: {self.memory_path} (tracemalloc.Snapshot.load)")
+        print(f"  • Memória rastreada: {current/1024:.1f} KiB (pico {peak/1024:.1f} KiB)")
+        samples = list(zip(*[iter(self.memory_samples)] * 3))
+        if samples:
+            step = max(1, len(samples) // MEMORY_SAMPLES_SHOWN)
+            print(f"\n  📈 Memória a cada {self.every} pacotes:")
+            for packets, sample_current, sample_peak in samples[::step]:
+                print(f"     pacote {packets:>7}: {sample_current/1024:>9.1f} KiB "
+                      f"(pico {sample_peak/1024:.1f} KiB)")
+        print(f"\n  🧮 {MEMORY_TOP} linhas que mais alocaram desde o início do laço:")
+        for stat in snapshot.statistics("lineno")[:MEMORY_TOP]:
+            print(f"     {stat}")
+
+
+def make_profiler(name, profile_path=None, memory_path=None, every=1):
+    """Profiler se --profile ou --trace-memory foram pedidos; senão None."""
+    if profile_path is None and memory_path is None:
+        return None
+    return Profiler(name, profile_path, memory_path, every)
+
+
+def profiling(profiler):
+    """Contexto do laço de transferência (nulo sem profiler)."""
+    return profiler.running() if profiler is not None else contextlib.nullcontext()
@@ -0,0 +1,413 @@
+"""
+Rastro de Pacotes - Trabalho Final Redes de Computadores (UFJF)
+
+Gravador binário de eventos por pacote (cliente e servidor) e analisador
+offline que transforma o rastro de uma execução real nas mesmas séries das
+simulações, para os gráficos de graficos.py.
+
+Gravação (caminho quente):
+    - Registros de tamanho fixo (RECORD_SIZE bytes): instante, seq, ack,
+      janela, cwnd, tipo do evento e flags, escritos com um único
+      struct.pack_into em um buffer circular pré-alocado
+    - Com path, o buffer é um arquivo mapeado em memória (mmap): os
+      registros chegam ao disco mesmo se o processo for encerrado
+    - Quando o buffer enche, os registros mais antigos são sobrescritos
+
+Nos registros do servidor, a coluna cwnd guarda os bytes no buffer de
+reordenação e a coluna window a janela anunciada (rwnd).
+
+Uso:
+    python3 cliente.py -b -p --rastro=cliente.rastro
+    python3 servidor.py -b --rastro=servidor.rastro
+    python3 rastro.py cliente.rastro servidor.rastro --saida=graficos/
+"""
+
+import os
+import sys
+import mmap
+import struct
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+TRACE_MAGIC = b"RSTR"
+TRACE_VERSION = 1
+TRACE_CAPACITY = 1 << 19        # Registros no buffer circular (~14 MB)
+
+# Cabeçalho: magic, versão, tamanho do registro, capacidade, registros escritos
+_HEADER = struct.Struct("<4sHHIQ")
+HEADER_SIZE = 32
+# Registro: instante, seq, ack, janela, cwnd, evento, flags (+2 de alinhamento)
+_RECORD = struct.Struct("<dIIIfBBxx")
+RECORD_SIZE = _RECORD.size
+
+# ────── Tipos de evento ──────
+# Cliente
+SEND = 1                        # Segmento novo enviado
+RETRANSMIT = 2                  # Retransmissão (timeout, fast retransmit ou SACK)
+ACK = 3                         # ACK novo (cwnd já atualizada)
+DUP_ACK = 4                     # ACK duplicado
+TIMEOUT = 5                     # Estouro do temporizador (cwnd já reduzida)
+# Servidor
+DELIVER = 10                    # Segmento em ordem entregue (ack = próximo esperado)
+BUFFERED = 11                   # Segmento adiantado guardado no buffer
+DUPLICATE = 12                  # Segmento duplicado/atrasado descartado
+DROP = 13                       # Datagrama descartado pela simulação de perda
+HANDSHAKE = 14                  # Handshake de criptografia
+
+EVENT_NAMES = {
+    SEND: "envio", RETRANSMIT: "retransmissao", ACK: "ack", DUP_ACK: "ack_duplicado",
+    TIMEOUT: "timeout", DELIVER: "entrega", BUFFERED: "fora_de_ordem",
+    DUPLICATE: "duplicado", DROP: "perda", HANDSHAKE: "handshake",
+}
+
+
+class PacketTrace:
+    """Buffer circular de registros binários de tamanho fixo.
+
+    record() é o único método do caminho quente: um pack_into na posição
+    atual e o avanço do deslocamento, sem alocar objetos.
+    """
+
+    def __init__(self, capacity: int = TRACE_CAPACITY, path: Optional[str] = None):
+        self.capacity = capacity
+        self.path = path
+        self.count = 0
+        size = HEADER_SIZE + capacity * RECORD_SIZE
+        if path is None:
+            self._file = None
+            self._buf = bytearray(size)
+        else:
+            self._file = open(path, "w+b")
+            self._file.truncate(size)
+            self._buf = mmap.mmap(self._file.fileno(), size)
+        self._offset = HEADER_SIZE
+        self._end = size
+        self._pack_into = _RECORD.pack_into
+        self._write_header()
+
+    def record(self, now, event, seq, ack, flags, window, cwnd):
+        """Grava um registro (cwnd em bytes, pode ser float)."""
+        offset = self._offset
+        self._pack_into(self._buf, offset, now, seq, ack, window, cwnd, event, flags)
+        offset += RECORD_SIZE
+        self._offset = offset if offset < self._end else HEADER_SIZE
+        self.count += 1
+
+    def _write_header(self):
+        _HEADER.pack_into(self._buf, 0, TRACE_MAGIC, TRACE_VERSION, RECORD_SIZE,
+                          self.capacity, self.count)
+
+    def records(self):
+        """Registros em ordem cronológica (array estruturado NumPy)."""
+        self._write_header()
+        return _parse(bytes(self._buf))
+
+    def save(self, path: str) -> None:
+        """Grava o rastro em arquivo (mesmo formato do modo mmap)."""
+        self._write_header()
+        with open(path, "wb") as f:
+            f.write(self._buf)
+
+    def close(self) -> None:
+        """Atualiza o cabeçalho e, no modo mmap, descarrega e fecha o arquivo."""
+        if self._buf is None:
+            return
+        self._write_header()
+        if self._file is not None:
+            self._buf.flush()
+            self._buf.close()
+            self._file.close()
+        self._buf = None
+
+
+def _dtype():
+    import numpy as np
+    return np.dtype({
+        'names': ['t', 'seq', 'ack', 'window', 'cwnd', 'event', 'flags'],
+        'formats': ['<f8', '<u4', '<u4', '<u4', '<f4', 'u1', 'u1'],
+        'offsets': [0, 8, 12, 16, 20, 24, 25],
+        'itemsize': RECORD_SIZE,
+    })
+
+
+def _parse(data: bytes):
+    """Decodifica cabeçalho + registros; devolve os válidos em ordem."""
+    import numpy as np
+    magic, version, record_size, capacity, count = _HEADER.unpack_from(data, 0)
+    if magic != TRACE_MAGIC or record_size != RECORD_SIZE:
+        raise ValueError("Arquivo não é um rastro válido (versão ou formato diferente)")
+    records = np.frombuffer(data, dtype=_dtype(), count=capacity, offset=HEADER_SIZE)
+    if count:
+        if count <= capacity:
+            return records[:count].copy()
+        start = count % capacity              # Posição do registro mais antigo
+        return np.concatenate([records[start:], records[:start]])
+    # Cabeçalho não atualizado (processo encerrado sem close): ordena pelo instante
+    valid = records[records['event'] != 0]
+    return valid[np.argsort(valid['t'], kind='stable')]
+
+
+def load_trace(path: str):
+    """Lê um arquivo de rastro; registros em ordem cronológica."""
+    with open(path, "rb") as f:
+        return _parse(f.read())
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# ANÁLISE OFFLINE
+# ═══════════════════════════════════════════════════════════════════════════
+# O rastro do cliente vira cwnd, throughput e progresso por ACK (as mesmas
+# séries de SimulationResult, com downsampling mín/máx), amostras de RTT
+# (algoritmo de Karn: segmentos retransmitidos não geram amostra) e os
+# instantes de retransmissões e timeouts. O do servidor vira o goodput
+# entregue à aplicação e a ocupação do buffer de reordenação.
+# ═══════════════════════════════════════════════════════════════════════════
+
+@dataclass
+class TraceAnalysis:
+    """Linhas do tempo reconstruídas de um rastro."""
+    result: object                                     # graficos.SimulationResult
+    side: str = "cliente"                              # "cliente" ou "servidor"
+    events: Dict[str, int] = field(default_factory=dict)
+    rtt_time: array = field(default_factory=lambda: array('d'))
+    rtt: array = field(default_factory=lambda: array('d'))          # segundos
+    retrans_time: array = field(default_factory=lambda: array('d'))
+    retrans_seq: array = field(default_factory=lambda: array('d'))
+    timeout_time: array = field(default_factory=lambda: array('d'))
+    buffer_time: array = field(default_factory=lambda: array('d'))  # Servidor
+    buffer_bytes: array = field(default_factory=lambda: array('d'))
+
+
+def analyze_trace(records, name: str = "", history_points: int = 1000) -> TraceAnalysis:
+    """Reconstrói as linhas do tempo de um rastro (cliente ou servidor)."""
+    import numpy as np
+    from graficos import SimulationResult
+
+    events = records['event']
+    counts = {EVENT_NAMES.get(int(code), str(code)): int(n)
+              for code, n in zip(*np.unique(events, return_counts=True))}
+    is_client = bool(np.isin(events, (SEND, ACK)).any())
+    result = SimulationResult(config_name=name or ("cliente" if is_client else "servidor"))
+    analysis = TraceAnalysis(result=result, side="cliente" if is_client else "servidor",
+                             events=counts)
+    if len(records) == 0:
+        return analysis
+
+    t0 = records['t'][0]
+    if is_client:
+        _analyze_client(records, t0, analysis)
+        progress_events = records[events == ACK]
+    else:
+        _analyze_server(records, t0, analysis)
+        progress_events = records[events == DELIVER]
+    if len(progress_events) == 0:
+        return analysis
+
+    # ────── Séries por ACK (cliente) ou por entrega (servidor) ──────
+    base = _first_seq(records, is_client)
+    elapsed = progress_events['t'] - t0
+    acked = progress_events['ack'].astype(np.float64) - base
+    total = acked[-1]
+    result.total_time = float(elapsed[-1])
+    result.total_bytes = int(total)
+    if result.total_time > 0:
+        result.throughput_bps = total / result.total_time
+        result.throughput_kbps = result.throughput_bps / 1024
+    with np.errstate(divide='ignore', invalid='ignore'):
+        throughput = np.where(elapsed > 0, acked / elapsed / 1024, 0.0)
+    progress = acked * 100 / total if total > 0 else np.zeros(len(acked))
+    cwnd = progress_events['cwnd'].astype(np.float64)
+
+    reference = cwnd if is_client else throughput     # Mín/máx preservados nesta série
+    idx = np.arange(len(reference)) if not history_points else _downsample(reference, history_points)
+    result.progress_history.frombytes(progress[idx].tobytes())
+    result.time_history.frombytes(elapsed[idx].astype(np.float64).tobytes())
+    result.throughput_history.frombytes(throughput[idx].tobytes())
+    if is_client:
+        result.cwnd_history.frombytes(cwnd[idx].tobytes())
+    return analysis
+
+
+def _downsample(y, max_points: int):
+    from graficos import downsample_minmax
+    return downsample_minmax(y, max_points)
+
+
+def _first_seq(records, is_client: bool) -> int:
+    """Primeiro byte da transferência (base do progresso)."""
+    if is_client:
+        sends = records[records['event'] == SEND]
+        return int(sends['seq'][0]) if len(sends) else int(records['ack'][0])
+    delivered = records[records['event'] == DELIVER]
+    return int(delivered['seq'][0])
+
+
+def _analyze_client(records, t0: float, analysis: TraceAnalysis) -> None:
+    """RTT (Karn), retransmissões e timeouts a partir dos eventos do cliente."""
+    result = analysis.result
+    sent = {}                   # seq -> (instante do último envio, retransmitido?)
+    pending = []                # seqs em voo, em ordem de envio
+    head = 0
+    for t, seq, ack, window, cwnd, event, flags in records.tolist():
+        if event == SEND:
+            sent[seq] = (t, False)
+            pending.append(seq)
+            result.packets_sent += 1
+        elif event == RETRANSMIT:
+            if seq in sent:
+                sent[seq] = (t, True)
+            result.retransmissions += 1
+            analysis.retrans_time.append(t - t0)
+            analysis.retrans_seq.append(seq)
+        elif event == TIMEOUT:
+            analysis.timeout_time.append(t - t0)
+        elif event == ACK:
+            newest = None
+            ambiguous = False
+            while head < len(pending) and pending[head] < ack:
+                entry = sent.pop(pending[head], None)
+                if entry is not None:
+                    newest = entry
+                    ambiguous = ambiguous or entry[1]
+                head += 1
+            if newest is not None and not ambiguous:
+                analysis.rtt_time.append(t - t0)
+                analysis.rtt.append(t - newest[0])
+
+
+def _analyze_server(records, t0: float, analysis: TraceAnalysis) -> None:
+    """Perdas simuladas e ocupação do buffer de reordenação (servidor)."""
+    import numpy as np
+    result = analysis.result
+    events = records['event']
+    result.packets_sent = int(np.isin(events, (DELIVER, BUFFERED, DUPLICATE, DROP)).sum())
+    result.packets_lost = int((events == DROP).sum())
+    result.retransmissions = int((events == DUPLICATE).sum())
+    decoded = records[events != DROP]
+    analysis.buffer_time.frombytes((decoded['t'] - t0).astype(np.float64).tobytes())
+    analysis.buffer_bytes.frombytes(decoded['cwnd'].astype(np.float64).tobytes())
+
+
+def print_analysis(analysis: TraceAnalysis, path: str = "") -> None:
+    """Resumo de um rastro analisado."""
+    result = analysis.result
+    print(f"\n📼 {path or result.config_name} ({analysis.side})")
+    print("  • Eventos: " + ", ".join(f"{name}={n}" for name, n in sorted(analysis.events.items())))
+    print(f"  • Duração: {result.total_time:.3f}s | {result.total_bytes:,} bytes | "
+          f"{result.throughput_kbps:.1f} KB/s")
+    if analysis.side == "cliente":
+        print(f"  • Retransmissões: {result.retransmissions} | timeouts: {len(analysis.timeout_time)}")
+        if analysis.rtt:
+            ordered = sorted(analysis.rtt)
+            p50 = ordered[len(ordered) // 2]
+            p99 = ordered[min(len(ordered) - 1, int(0.99 * len(ordered)))]
+            print(f"  • RTT: {len(ordered)} amostras | p50={p50*1000:.3f}ms | p99={p99*1000:.3f}ms")
+    else:
+        print(f"  • Perdas simuladas: {result.packets_lost} | duplicados: {result.retransmissions}")
+        if analysis.buffer_bytes:
+            print(f"  • Buffer de reordenação: máx {max(analysis.buffer_bytes):.0f}b")
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# GRÁFICOS
+# ═══════════════════════════════════════════════════════════════════════════
+
+def plot_trace_timelines(analysis: TraceAnalysis, filename: str):
+    """cwnd (ou buffer), RTT e retransmissões no tempo real da execução."""
+    import numpy as np
+    from graficos import _pyplot, downsample_minmax
+    plt = _pyplot()
+    result = analysis.result
+
+    fig, axes = plt.subplots(3, 1, figsize=(14, 10), sharex=True)
+
+    ax1 = axes[0]
+    if analysis.side == "cliente" and result.cwnd_history:
+        ax1.plot(np.frombuffer(result.time_history), np.frombuffer(result.cwnd_history) / 1024,
+                 color='#3498db', linewidth=1.5)
+        ax1.set_ylabel('cwnd (KB)', fontsize=10)
+        ax1.set_title(f'Janela de Congestionamento - {result.config_name}', fontsize=11, fontweight='bold')
+    elif analysis.buffer_bytes:
+        x, y = np.frombuffer(analysis.buffer_time), np.frombuffer(analysis.buffer_bytes)
+        idx = downsample_minmax(y)
+        ax1.plot(x[idx], y[idx], color='#9b59b6', linewidth=1.5)
+        ax1.set_ylabel('Buffer (bytes)', fontsize=10)
+        ax1.set_title(f'Buffer de Reordenação - {result.config_name}', fontsize=11, fontweight='bold')
+    ax1.grid(True, alpha=0.3)
+
+    ax2 = axes[1]
+    if analysis.rtt:
+        x, y = np.frombuffer(analysis.rtt_time), np.frombuffer(analysis.rtt) * 1000
+        idx = downsample_minmax(y)
+        ax2.plot(x[idx], y[idx], color='#2ecc71', linewidth=1, marker='.', markersize=2)
+    ax2.set_ylabel('RTT (ms)', fontsize=10)
+    ax2.set_title('Amostras de RTT (Karn)', fontsize=11, fontweight='bold')
+    ax2.grid(True, alpha=0.3)
+
+    ax3 = axes[2]
+    if analysis.retrans_time:
+        ax3.plot(np.frombuffer(analysis.retrans_time), np.frombuffer(analysis.retrans_seq),
+                 'x', color='#e74c3c', markersize=4, label='Retransmissão')
+    if analysis.timeout_time:
+        ax3.vlines(np.frombuffer(analysis.timeout_time), 0, 1, transform=ax3.get_xaxis_transform(),
+                   color='#e67e22', alpha=0.4, linewidth=1, label='Timeout')
+    if analysis.retrans_time or analysis.timeout_time:
+        ax3.legend(loc='best', fontsize=9)
+    ax3.set_xlabel('Tempo (s)', fontsize=10)
+    ax3.set_ylabel('seq', fontsize=10)
+    ax3.set_title('Retransmissões', fontsize=11, fontweight='bold')
+    ax3.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(filename, dpi=150, bbox_inches='tight')
+    plt.close()
+
+    print(f"  📈 Gráfico salvo: {filename}")
+
+
+def trace_figures(analyses: List[TraceAnalysis], out_dir: str = ".") -> List[Tuple]:
+    """Figuras (função, *args) dos rastros: as de graficos.py + linhas do tempo."""
+    from graficos import plot_cwnd_evolution, plot_throughput_over_time, plot_combined_analysis
+    path = lambda name: os.path.join(out_dir, name)
+    results = [a.result for a in analyses]
+    jobs = [
+        (plot_throughput_over_time, results, 'Throughput ao Longo da Transmissão (Rastro Real)',
+         path('rastro_throughput.png')),
+        (plot_combined_analysis, results, path('rastro_analise.png')),
+    ]
+    if any(a.side == "cliente" for a in analyses):
+        jobs.insert(0, (plot_cwnd_evolution, [a.result for a in analyses if a.side == "cliente"],
+                        'Evolução do cwnd (Rastro Real)', path('rastro_cwnd.png')))
+    for i, analysis in enumerate(analyses):
+        jobs.append((plot_trace_timelines, analysis, path(f'rastro_linhas_{i+1}_{analysis.side}.png')))
+    return jobs
+
+
+if __name__ == "__main__":
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith("-")]
+    out_dir = "."
+    plots = True
+    for arg in sys.argv[1:]:
+        if arg.startswith("--saida="):
+            out_dir = arg.split("=", 1)[1]
+        elif arg == "--sem-graficos":
+            plots = False
+        elif arg in ("--help", "-h"):
+            print(__doc__)
+            sys.exit(0)
+    if not paths:
+        print(__doc__)
+        sys.exit(1)
+
+    analyses = []
+    for path in paths:
+        analysis = analyze_trace(load_trace(path), name=os.path.basename(path))
+        print_analysis(analysis, path)
+        analyses.append(analysis)
+
+    if plots:
+        from graficos import render_figures
+        os.makedirs(out_dir, exist_ok=True)
+        print("\n📊 Gerando gráficos...")
+        render_figures(trace_figures(analyses, out_dir))
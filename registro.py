@@ -0,0 +1,182 @@
+"""
+Registro de Eventos - Trabalho Final Redes de Computadores (UFJF)
+
+Logger por níveis, estruturado e assíncrono, para os caminhos quentes de
+cliente e servidor:
+    - Nível desligado custa uma verificação de atributo:
+          if log.debug_on:
+              log.debug("ack", TEMPLATE_ACK, ack_num=..., window=...)
+    - Formatação preguiçosa: o registro guarda (evento, template, campos) e o
+      texto só é montado na thread de escrita (memoryview vira bytes lá).
+    - Escrita em segundo plano: os registros vão para um buffer circular
+      (deque com capacidade fixa; se encher, os mais antigos são descartados
+      e contados em `dropped`) drenado por uma thread daemon.
+    - Saída estruturada opcional: cada evento também vira uma linha JSON.
+
+capture_stdout() redireciona os print() do trecho para a mesma fila, então
+mensagens diretas (ex.: congestionamento.py) e eventos saem na ordem certa.
+"""
+
+import io
+import sys
+import json
+import time
+import atexit
+import threading
+import contextlib
+from collections import deque
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+LEVEL_NAMES = {DEBUG: "DEBUG", INFO: "INFO", WARNING: "WARNING", ERROR: "ERROR"}
+
+LOG_CAPACITY = 65536            # Registros pendentes no buffer circular
+WRITER_IDLE_WAIT = 0.05         # Espera máxima da thread de escrita sem registros
+
+_RAW = -1                       # Texto cru (print redirecionado): sem template
+
+
+class EventLogger(io.TextIOBase):
+    """Logger de eventos com níveis, formatação preguiçosa e escrita em thread.
+
+    Também é um arquivo de texto (write/flush), para servir de destino do
+    print() dentro de capture_stdout().
+    """
+
+    def __init__(self, name, level=INFO, stream=None, json_path=None, capacity=LOG_CAPACITY):
+        self.name = name
+        self.stream = stream            # None: sys.stdout do momento da escrita
+        self.capacity = capacity
+        self.dropped = 0
+        self._records = deque(maxlen=capacity)
+        self._wakeup = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._writer = None
+        self._closed = False
+        self._json = open(json_path, "a") if json_path else None
+        self.set_level(level)
+
+    def set_level(self, level):
+        """Atualiza o nível e os atributos consultados nos caminhos quentes."""
+        self.level = level
+        self.debug_on = level <= DEBUG
+        self.info_on = level <= INFO
+        self.warning_on = level <= WARNING
+
+    # ────── Produção de registros (thread do protocolo) ──────
+
+    def event(self, level, event, template="", **fields):
+        """Enfileira um evento; o texto só é formatado pela thread de escrita."""
+        if level < self.level:
+            return
+        self._push((time.time(), level, event, template, fields))
+
+    def debug(self, event, template="", **fields):
+        self._push((time.time(), DEBUG, event, template, fields))
+
+    def info(self, event, template="", **fields):
+        self._push((time.time(), INFO, event, template, fields))
+
+    def warning(self, event, template="", **fields):
+        self._push((time.time(), WARNING, event, template, fields))
+
+    def error(self, event, template="", **fields):
+        self._push((time.time(), ERROR, event, template, fields))
+
+    def write(self, text):
+        """Texto cru (print redirecionado) entra na mesma fila, em ordem."""
+        if text:
+            self._push((0.0, _RAW, None, text, None))
+        return len(text)
+
+    def _push(self, record):
+        records = self._records
+        if len(records) == self.capacity:
+            self.dropped += 1           # deque(maxlen) descarta o mais antigo
+        records.append(record)
+        if self._writer is None:
+            self._start_writer()
+        elif self._idle.is_set():
+            self._wakeup.set()
+
+    # ────── Escrita (thread daemon) ──────
+
+    def _start_writer(self):
+        self._writer = threading.Thread(target=self._run, name=f"log-{self.name}", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    def _run(self):
+        records = self._records
+        while True:
+            if not records:
+                self._idle.set()
+                self._wakeup.wait(WRITER_IDLE_WAIT)
+                self._wakeup.clear()
+                if self._closed and not records:
+                    return
+                continue
+            self._idle.clear()
+            stream = self.stream or sys.stdout
+            chunks = []
+            while records:
+                timestamp, level, event, template, fields = records.popleft()
+                if level == _RAW:
+                    chunks.append(template)
+                    continue
+                chunks.append(self._render(event, template, fields) + "\n")
+                if self._json is not None:
+                    self._write_json(timestamp, level, event, fields)
+            stream.write("".join(chunks))
+            stream.flush()
+            if self._json is not None:
+                self._json.flush()
+
+    @staticmethod
+    def _render(event, template, fields):
+        for key, value in fields.items():
+            if isinstance(value, memoryview):
+                fields[key] = bytes(value)
+        if template:
+            return template.format(**fields)
+        return f"{event} " + " ".join(f"{k}={v}" for k, v in fields.items())
+
+    def _write_json(self, timestamp, level, event, fields):
+        record = {"t": timestamp, "nivel": LEVEL_NAMES.get(level, level),
+                  "origem": self.name, "evento": event}
+        record.update(fields)
+        self._json.write(json.dumps(record, default=str, ensure_ascii=False) + "\n")
+
+    # ────── Controle ──────
+
+    def flush(self):
+        """Espera a thread de escrita esvaziar o buffer."""
+        if self._writer is None:
+            return
+        while self._records or not self._idle.is_set():
+            self._wakeup.set()
+            time.sleep(0.001)
+
+    def close(self):
+        self.flush()
+        self._closed = True
+        self._wakeup.set()
+        if self._json is not None:
+            self._json.close()
+            self._json = None
+
+    @contextlib.contextmanager
+    def capture_stdout(self):
+        """Desvia o print() do trecho para o logger (mesma fila, mesma ordem)."""
+        previous = self.stream
+        self.stream = previous or sys.stdout
+        try:
+            with contextlib.redirect_stdout(self):
+                yield self
+        finally:
+            self.flush()
+            self.stream = previous
@@ -11,9 +11,496 @@ Implementa:
 
 import socket
 import random
+import time
+import heapq
+import asyncio
+import contextlib
 from utils import *
+from transporte import UDPTransport
+from registro import EventLogger, DEBUG, INFO
+import rastro
+from metricas import MetricsRegistry, start_http_server
+import perfil
 
-def run_server(verbose=True):
+# ────── Tabela de sessões (uma entrada por cliente) ──────
+INITIAL_SEQ = 100               # seq_num inicial esperado de cada cliente
+SESSION_IDLE_TIMEOUT = 30.0     # Segundos sem tráfego até descartar a sessão
+SESSION_SWEEP_INTERVAL = 1.0    # Intervalo entre varreduras de sessões ociosas
+LOSS_PROBABILITY = 0.05         # 5% de perda para simulação
+ACK_DELAY = 0.002               # Atraso máximo de um ACK retido (modo asyncio)
+CRYPTO_MAX_PENDING = 1024       # Segmentos aguardando o pool de descriptografia
+
+# ────── Mensagens de log (formatadas na thread de escrita do registro) ──────
+_RULE = "=" * 70
+_THIN = "─" * 70
+LOG_RECEIVED = (f"\n{_RULE}\n📥 PACOTE RECEBIDO #{{count}}\n{_RULE}\n"
+                f"  De: {{addr}}\n  Tamanho bruto: {{size}}b")
+LOG_RECEIVED_NEW = (f"\n{_RULE}\n📥 PACOTE RECEBIDO #{{count}}\n{_RULE}\n"
+                    f"  De: {{addr}}\n  🆕 Nova sessão ({{active}} ativa(s))\n  Tamanho bruto: {{size}}b")
+LOG_LOST = (f"\n❌ PACOTE PERDIDO (simulação {{loss_pct}}%)\n"
+            f"   Cliente detectará via timeout ou ACK duplicado\n{_RULE}\n")
+LOG_DECODED = ("\n📦 PACOTE DECODIFICADO:\n  • seq_num = {seq}\n  • ack_num = {ack}\n"
+               "  • flags = {flags} {flag_names}\n  • window = {window}b\n  • payload = {payload}b")
+LOG_HANDSHAKE = (f"\n{_THIN}\n🔐 [Q5] HANDSHAKE DE CRIPTOGRAFIA\n{_THIN}\n"
+                 f"  • Chave recebida: {{key}}\n  • Tamanho: {{key_len}} bytes\n"
+                 f"  • Algoritmo: XOR (simétrico)\n  ✅ Criptografia habilitada\n"
+                 f"  → ACK enviado confirmando criptografia\n{_THIN}\n")
+LOG_DECRYPT_POOL = "\n🔓 [Q5] Descriptografia delegada ao pool (na entrega, em ordem)"
+LOG_DECRYPTED = (f"\n{_THIN}\n🔓 [Q5] DESCRIPTOGRAFANDO PAYLOAD\n{_THIN}\n"
+                 f"  • Criptografado: {{encrypted}}...\n  • Descriptografado: {{decrypted}}...\n"
+                 f"  ✅ Descriptografia concluída\n{_THIN}\n")
+LOG_ORDERING = (f"{_THIN}\n[Q1] ORDENAÇÃO POR NÚMERO DE SEQUÊNCIA\n{_THIN}\n"
+                f"  • Esperado: seq={{expected}}\n  • Recebido: seq={{seq}}\n  • Payload: {{payload}}b")
+LOG_IN_ORDER = ("  ✅ ORDEM CORRETA!\n     Entregando para aplicação...\n"
+                "     Dados: {preview}\n     Próximo esperado: seq={next_seq}")
+LOG_FROM_BUFFER = "\n  ➡️  Recuperando do buffer: seq={seq}\n     Próximo esperado: seq={next_seq}"
+LOG_BUFFER_DRAINED = "  📦 {count} pacote(s) entregue(s) do buffer"
+LOG_OUT_OF_ORDER = ("  ⚠️  FORA DE ORDEM (adiantado)\n     Guardando no buffer...\n"
+                    "     Faltam {gap}b até este pacote\n     Buffer agora tem {buffered} pacote(s)")
+LOG_DUPLICATE = "  🔁 DUPLICADO/ATRASADO (descartando)\n     Este seq_num já foi processado"
+LOG_FLOW_CONTROL = (f"{_THIN}\n\n{_THIN}\n[Q3] CONTROLE DE FLUXO (JANELA DO RECEPTOR)\n{_THIN}\n"
+                    f"  • Buffer total: {BUFFER_SIZE}b\n"
+                    f"  • Bytes no buffer: {{buffered_bytes}}b ({{buffered}} pacotes)\n"
+                    f"  • Janela disponível (rwnd): {{rwnd}}b\n"
+                    f"  • Uso do buffer: {{percent:.1f}}%{{status}}\n{_THIN}\n")
+LOG_ACK = (f"{_THIN}\n[Q2] ENVIANDO ACK CUMULATIVO\n{_THIN}\n"
+           f"  • ack_num = {{ack}} (próximo byte que espero)\n"
+           f"  • window = {{rwnd}}b (quanto posso receber)\n"
+           f"  📝 Significado: 'Recebi tudo até byte {{last}}, envie a partir de {{ack}}'\n"
+           f"{_THIN}\n\n{{sack}}✅ ACK ENVIADO\n{_RULE}\n")
+LOG_PROGRESS = ("[{delivered:>6} pacotes] {buffered} no buffer | "
+                "perdidos={lost} ({loss_pct:.1f}%) | sessões={sessions}")
+LOG_APP_DELIVERY = "  📨 Aplicação recebeu seq={seq} ({size}b): {preview}"
+LOG_DECRYPT_DROPPED = ("⚠️  Pool de descriptografia cheio ({pending} pendentes): "
+                       "seq={seq} descartado ({dropped} no total)")
+LOG_SESSION_EXPIRED = "🧹 Sessão {addr} encerrada por ociosidade ({active} ativa(s))"
+
+
+class ReorderBuffer:
+    """Buffer de reordenação {seq_num: payload} com contabilidade O(1).
+    
+    Mantém contadores de bytes e pacotes armazenados, atualizados a cada
+    inserção/remoção, para que o cálculo da janela anunciada (rwnd) não
+    precise percorrer o buffer a cada datagrama.
+    
+    Também mantém os intervalos contíguos armazenados ([início, fim)),
+    fundidos incrementalmente a cada inserção, que viram os blocos SACK
+    enviados nos ACKs.
+    """
+    
+    def __init__(self):
+        self._segments = {}
+        self.buffered_bytes = 0
+        self._range_end = {}      # {início: fim} de cada intervalo contíguo
+        self._range_start = {}    # {fim: início} (para fundir pela esquerda)
+        self._last_range = None   # Início do intervalo com a inserção mais recente
+    
+    def insert(self, seq_num, payload):
+        """Armazena um segmento fora de ordem (substitui duplicatas)."""
+        old = self._segments.get(seq_num)
+        if old is not None:
+            self.buffered_bytes -= len(old)
+        self._segments[seq_num] = payload
+        self.buffered_bytes += len(payload)
+        if old is None:
+            self._add_range(seq_num, seq_num + len(payload))
+    
+    def _add_range(self, start, end):
+        """Registra [start, end) fundindo com intervalos vizinhos."""
+        right_end = self._range_end.pop(end, None)
+        if right_end is not None:
+            del self._range_start[right_end]
+            end = right_end
+        left_start = self._range_start.pop(start, None)
+        if left_start is not None:
+            del self._range_end[left_start]
+            start = left_start
+        self._range_end[start] = end
+        self._range_start[end] = start
+        self._last_range = start
+    
+    def pop(self, seq_num):
+        """Remove e retorna o segmento que começa em seq_num."""
+        payload = self._segments.pop(seq_num)
+        self.buffered_bytes -= len(payload)
+        return payload
+    
+    def drain(self, expected_seq):
+        """Entrega segmentos contíguos a partir de expected_seq.
+        
+        Gera (seq_num, payload) em ordem até encontrar um buraco.
+        """
+        # O intervalo que começa em expected_seq será entregue por inteiro
+        end = self._range_end.pop(expected_seq, None)
+        if end is not None:
+            del self._range_start[end]
+        while expected_seq in self._segments:
+            payload = self.pop(expected_seq)
+            yield expected_seq, payload
+            expected_seq += len(payload)
+    
+    def sack_blocks(self, max_blocks=MAX_SACK_BLOCKS):
+        """Blocos SACK: o mais recente primeiro (RFC 2018), depois os mais baixos."""
+        if not self._range_end:
+            return []
+        blocks = []
+        if self._last_range in self._range_end:
+            blocks.append((self._last_range, self._range_end[self._last_range]))
+        for start, end in heapq.nsmallest(max_blocks, self._range_end.items()):
+            if len(blocks) >= max_blocks:
+                break
+            if start != self._last_range:
+                blocks.append((start, end))
+        return blocks
+    
+    @property
+    def packet_count(self):
+        return len(self._segments)
+    
+    def __len__(self):
+        return len(self._segments)
+    
+    def __contains__(self, seq_num):
+        return seq_num in self._segments
+
+
+class ClientSession:
+    """Estado de recepção de um cliente, identificado pelo endereço (ip, porta)."""
+    
+    def __init__(self, addr, now=None):
+        self.addr = addr
+        
+        # ────── QUESTÃO 1: Buffer de Reordenação ──────
+        self.expected_seq = INITIAL_SEQ  # Próximo byte esperado
+        self.recv_buffer = ReorderBuffer()  # Pacotes fora de ordem {seq_num: payload}
+        
+        # ────── QUESTÃO 3: Janela anunciada ──────
+        self.rwnd = BUFFER_SIZE
+        
+        # ────── QUESTÃO 5: Criptografia ──────
+        self.security = Security()
+        self.encryption_negotiated = False
+        
+        self.packets_delivered = 0
+        self.last_activity = now if now is not None else time.time()
+    
+    def touch(self, now):
+        """Marca atividade recente (evita despejo por ociosidade)."""
+        self.last_activity = now
+
+
+class SessionTable:
+    """Tabela de conexões {addr: ClientSession} com despejo por ociosidade."""
+    
+    def __init__(self, idle_timeout=SESSION_IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.sessions = {}
+    
+    def get(self, addr, now):
+        """Retorna a sessão de addr, criando uma nova se necessário.
+        
+        Retorna (sessão, nova) onde nova indica se a sessão acabou de ser criada.
+        """
+        session = self.sessions.get(addr)
+        created = session is None
+        if created:
+            session = ClientSession(addr, now)
+            self.sessions[addr] = session
+        else:
+            session.touch(now)
+        return session, created
+    
+    def evict_idle(self, now):
+        """Remove sessões sem atividade há mais de idle_timeout segundos."""
+        expired = [addr for addr, session in self.sessions.items()
+                   if now - session.last_activity > self.idle_timeout]
+        for addr in expired:
+            del self.sessions[addr]
+        return expired
+    
+    def __len__(self):
+        return len(self.sessions)
+    
+    def __contains__(self, addr):
+        return addr in self.sessions
+
+
+class DeliverySink:
+    """Consumidor padrão da aplicação (on_deliver do servidor).
+    
+    Recebe os payloads já em claro e em ordem, direto do laço ou vindos do
+    pool de descriptografia, e conta o que cada cliente entregou; no nível
+    DEBUG mostra o início de cada mensagem.
+    """
+    
+    def __init__(self, log):
+        self.log = log
+        self.segments = 0
+        self.total_bytes = 0
+        self.bytes_by_addr = {}
+    
+    def __call__(self, addr, seq_num, payload):
+        size = len(payload)
+        self.segments += 1
+        self.total_bytes += size
+        self.bytes_by_addr[addr] = self.bytes_by_addr.get(addr, 0) + size
+        if self.log.debug_on:
+            self.log.debug("aplicacao", LOG_APP_DELIVERY, seq=seq_num, size=size,
+                           preview=bytes(payload[:50]))
+
+
+class ReliableServer:
+    """Lógica de recepção do servidor, independente do laço de I/O.
+    
+    Processa cada datagrama (perda simulada, handshake, descriptografia,
+    reordenação, controle de fluxo) e devolve o ACK a ser enviado. É usada
+    tanto pelo laço bloqueante de run_server quanto pelo ServerProtocol
+    (asyncio).
+    """
+    
+    def __init__(self, verbose=True, idle_timeout=SESSION_IDLE_TIMEOUT,
+                 loss_probability=LOSS_PROBABILITY, on_deliver=None, crypto_pipeline=None,
+                 log=None, trace=None):
+        self.verbose = verbose
+        # Detalhes por pacote no nível DEBUG; progresso do benchmark no INFO
+        self.log = log or EventLogger("servidor", level=DEBUG if verbose else INFO)
+        self.loss_probability = loss_probability
+        self.trace = trace             # rastro.PacketTrace: registro binário por datagrama (opcional)
+        self.reorder_histogram = None  # Profundidade do buffer fora de ordem (register_metrics)
+        self.on_deliver = on_deliver   # Callback(addr, seq_num, payload) para a aplicação (payload pode ser memoryview)
+        # Com pipeline, a descriptografia sai do caminho do ACK: os payloads
+        # são decifrados no pool na entrega e repassados em ordem (flush_deliveries)
+        self.crypto_pipeline = crypto_pipeline
+        
+        # ────── Tabela de conexões: estado independente por cliente ──────
+        self.sessions = SessionTable(idle_timeout=idle_timeout)
+        
+        self.packet_count = 0
+        self.packets_delivered = 0
+        self.packets_lost = 0
+        self.decrypt_dropped = 0       # Segmentos recusados pelo pool cheio (nunca esperamos o pool)
+        self.progress_interval = 500 if not verbose else 1
+    
+    def register_metrics(self, registry):
+        """Publica os contadores em um metricas.MetricsRegistry.
+        
+        Contadores e sessões são lidos só na coleta; o histograma de
+        reordenação recebe uma amostra por segmento guardado fora de ordem.
+        """
+        registry.counter("datagrams_received_total", "Datagramas recebidos",
+                         lambda: self.packet_count)
+        registry.counter("packets_delivered_total", "Segmentos entregues em ordem",
+                         lambda: self.packets_delivered)
+        registry.counter("packets_lost_total", "Datagramas descartados (perda simulada)",
+                         lambda: self.packets_lost)
+        registry.gauge("sessions", "Sessões ativas", lambda: len(self.sessions))
+        registry.counter("decrypt_dropped_total", "Segmentos recusados pelo pool de descriptografia cheio",
+                         lambda: self.decrypt_dropped)
+        if isinstance(self.on_deliver, DeliverySink):
+            sink = self.on_deliver
+            registry.counter("app_bytes_total", "Bytes em claro entregues à aplicação",
+                             lambda: sink.total_bytes)
+        self.reorder_histogram = registry.histogram(
+            "reorder_depth_segments", "Segmentos no buffer ao guardar um fora de ordem", start=1, buckets=12)
+    
+    def _deliver(self, session, seq_num, payload):
+        """Entrega um segmento, já em ordem, para a aplicação."""
+        pipeline = self.crypto_pipeline
+        if pipeline is not None and session.encryption_negotiated:
+            if pipeline.full():
+                self.flush_deliveries()          # Libera o que já ficou pronto, sem esperar
+            if not pipeline.submit(payload, session.security.key, tag=(session.addr, seq_num)):
+                self.decrypt_dropped += 1
+                self.log.warning("decifrar_descartado", LOG_DECRYPT_DROPPED, pending=len(pipeline),
+                                 seq=seq_num, dropped=self.decrypt_dropped)
+            return
+        if self.on_deliver is not None:
+            self.on_deliver(session.addr, seq_num, payload)
+    
+    def flush_deliveries(self, wait=False):
+        """Entrega os payloads já decifrados pelo pool, na ordem de chegada.
+        
+        wait=True espera também os pendentes (usado quando o socket está ocioso).
+        """
+        if self.crypto_pipeline is None:
+            return
+        pipeline = self.crypto_pipeline
+        for (addr, seq_num), plaintext in (pipeline.drain() if wait else pipeline.ready()):
+            if self.on_deliver is not None:
+                self.on_deliver(addr, seq_num, plaintext)
+    
+    def evict_idle(self, now):
+        """Despeja sessões ociosas; retorna os endereços removidos."""
+        expired = self.sessions.evict_idle(now)
+        if self.log.debug_on:
+            for expired_addr in expired:
+                self.log.debug("sessao_expirada", LOG_SESSION_EXPIRED,
+                               addr=expired_addr, active=len(self.sessions))
+        return expired
+    
+    def handle_datagram(self, data, addr, now):
+        """Processa um datagrama recebido de addr.
+        
+        Retorna (ack_pkt, imediato): o ACK a enviar (None se o pacote foi
+        descartado pela simulação de perda) e se ele deve sair sem atraso
+        (handshake, pacote fora de ordem ou duplicado).
+        """
+        log = self.log
+        self.packet_count += 1
+        session, created = self.sessions.get(addr, now)
+        
+        if log.debug_on:
+            log.debug("recebido", LOG_RECEIVED_NEW if created else LOG_RECEIVED,
+                      count=self.packet_count, addr=addr, size=len(data), active=len(self.sessions))
+        
+        # ────── SIMULAÇÃO DE PERDA ──────
+        if random.random() < self.loss_probability:
+            self.packets_lost += 1
+            if self.trace is not None:
+                self.trace.record(now, rastro.DROP, 0, session.expected_seq, 0, session.rwnd,
+                                  session.recv_buffer.buffered_bytes)
+            if log.debug_on:
+                log.debug("perdido", LOG_LOST, loss_pct=self.loss_probability*100)
+            return None, False
+        
+        pkt = Packet.from_bytes(data)
+        
+        if log.debug_on:
+            log.debug("decodificado", LOG_DECODED, seq=pkt.seq_num, ack=pkt.ack_num,
+                      flags=bin(pkt.flags), flag_names=_format_flags(pkt.flags),
+                      window=pkt.window, payload=len(pkt.payload))
+        
+        # ────── QUESTÃO 5: HANDSHAKE DE CRIPTOGRAFIA ──────
+        if pkt.flags & SYN and pkt.flags & ENC:
+            key = bytes(pkt.payload)   # A chave sobrevive ao datagrama
+            session.security.set_key(key)
+            session.encryption_negotiated = True
+            
+            if self.trace is not None:
+                self.trace.record(now, rastro.HANDSHAKE, pkt.seq_num, 0, pkt.flags, BUFFER_SIZE, 0)
+            if log.debug_on:
+                log.debug("handshake", LOG_HANDSHAKE, key=key.hex(), key_len=len(key))
+            
+            # Envia ACK confirmando
+            ack_pkt = Packet(seq_num=0, ack_num=0, flags=ACK|ENC, window=BUFFER_SIZE)
+            return ack_pkt, True
+        
+        # ────── QUESTÃO 5: DESCRIPTOGRAFIA ──────
+        if pkt.flags & ENC and session.encryption_negotiated and self.crypto_pipeline is not None:
+            if log.debug_on:
+                log.debug("decifrar_pool", LOG_DECRYPT_POOL)
+        elif pkt.flags & ENC and session.encryption_negotiated:
+            if log.debug_on:
+                encrypted = bytes(pkt.payload[:40])
+            pkt.payload = session.security.decrypt(pkt.payload)
+            
+            if log.debug_on:
+                log.debug("decifrado", LOG_DECRYPTED, encrypted=encrypted,
+                          decrypted=bytes(pkt.payload[:40]))
+        
+        # ────── QUESTÃO 1: ORDENAÇÃO POR SEQ_NUM ──────
+        if log.debug_on:
+            log.debug("ordenacao", LOG_ORDERING, expected=session.expected_seq,
+                      seq=pkt.seq_num, payload=len(pkt.payload))
+        
+        # Caso 1: Pacote na ordem correta
+        in_order = pkt.seq_num == session.expected_seq
+        if in_order:
+            self.packets_delivered += 1
+            session.packets_delivered += 1
+            
+            # "Entrega" para aplicação (no log, apenas mostramos o início)
+            if log.debug_on:
+                log.debug("entregue", LOG_IN_ORDER, preview=bytes(pkt.payload[:50]),
+                          next_seq=session.expected_seq + len(pkt.payload))
+            
+            self._deliver(session, pkt.seq_num, pkt.payload)
+            
+            # Avança esperado
+            session.expected_seq += len(pkt.payload)
+            
+            # Caso 2: Verifica se há pacotes no buffer que agora podem ser processados
+            delivered_count = 0
+            for buffered_seq, buffered_payload in session.recv_buffer.drain(session.expected_seq):
+                session.expected_seq = buffered_seq + len(buffered_payload)
+                self._deliver(session, buffered_seq, buffered_payload)
+                delivered_count += 1
+                self.packets_delivered += 1
+                session.packets_delivered += 1
+                if log.debug_on:
+                    log.debug("recuperado", LOG_FROM_BUFFER, seq=buffered_seq,
+                              next_seq=session.expected_seq)
+            
+            if delivered_count > 0 and log.debug_on:
+                log.debug("buffer_drenado", LOG_BUFFER_DRAINED, count=delivered_count)
+            
+            # Progresso em benchmark
+            if self.packets_delivered % self.progress_interval == 0 and log.info_on and not log.debug_on:
+                log.info("progresso", LOG_PROGRESS, delivered=self.packets_delivered,
+                         buffered=len(session.recv_buffer), lost=self.packets_lost,
+                         loss_pct=self.packets_lost / self.packet_count * 100,
+                         sessions=len(self.sessions))
+                
+        # Caso 3: Pacote fora de ordem (futuro) -> Armazena no buffer
+        elif pkt.seq_num > session.expected_seq:
+            session.recv_buffer.insert(pkt.seq_num, pkt.payload)
+            if self.reorder_histogram is not None:
+                self.reorder_histogram.observe(len(session.recv_buffer))
+            if log.debug_on:
+                log.debug("fora_de_ordem", LOG_OUT_OF_ORDER,
+                          gap=pkt.seq_num - session.expected_seq,
+                          buffered=len(session.recv_buffer))
+            
+        # Caso 4: Pacote duplicado ou atrasado
+        elif log.debug_on:
+            log.debug("duplicado", LOG_DUPLICATE, seq=pkt.seq_num)
+
+        # ────── QUESTÃO 3: CONTROLE DE FLUXO ──────
+        bytes_no_buffer = session.recv_buffer.buffered_bytes
+        janela_disponivel = max(0, BUFFER_SIZE - bytes_no_buffer)
+        session.rwnd = janela_disponivel
+        
+        if self.trace is not None:
+            event = (rastro.DELIVER if in_order else
+                     rastro.BUFFERED if pkt.seq_num > session.expected_seq else rastro.DUPLICATE)
+            self.trace.record(now, event, pkt.seq_num, session.expected_seq, pkt.flags,
+                              janela_disponivel, bytes_no_buffer)
+        
+        if log.debug_on:
+            if janela_disponivel < BUFFER_SIZE * 0.2:
+                status = "\n  ⚠️  Buffer ficando cheio!"
+            elif janela_disponivel == BUFFER_SIZE:
+                status = "\n  ✅ Buffer vazio (janela máxima)"
+            else:
+                status = ""
+            log.debug("janela", LOG_FLOW_CONTROL, buffered_bytes=bytes_no_buffer,
+                      buffered=session.recv_buffer.packet_count, rwnd=janela_disponivel,
+                      percent=bytes_no_buffer / BUFFER_SIZE * 100, status=status)
+
+        # ────── QUESTÃO 2: ACK CUMULATIVO ──────
+        ack_pkt = Packet(seq_num=0, 
+                         ack_num=session.expected_seq, 
+                         flags=ACK, 
+                         window=janela_disponivel)
+        
+        # ────── SACK: informa os intervalos fora de ordem já recebidos ──────
+        sack_blocks = session.recv_buffer.sack_blocks()
+        if sack_blocks:
+            ack_pkt.flags |= SACK
+            ack_pkt.payload = encode_sack_blocks(sack_blocks)
+        
+        if log.debug_on:
+            sack = ""
+            if sack_blocks:
+                sack = "  • SACK: " + ", ".join(f"[{start}, {end})" for start, end in sack_blocks) + "\n"
+            log.debug("ack", LOG_ACK, ack=session.expected_seq, last=session.expected_seq - 1,
+                      rwnd=janela_disponivel, sack=sack)
+        
+        return ack_pkt, not in_order
+
+
+def _print_banner(server, mode_label, address=(SERVER_IP, SERVER_PORT)):
+    """Imprime o cabeçalho e a configuração do servidor."""
     print("""
     ╔══════════════════════════════════════════════════════════════════╗
     ║          TRABALHO FINAL - REDES DE COMPUTADORES (UFJF)          ║
@@ -27,222 +514,283 @@ def run_server(verbose=True):
     ╚══════════════════════════════════════════════════════════════════╝
     """)
     
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-    sock.bind((SERVER_IP, SERVER_PORT))
-    
-    # ────── QUESTÃO 1: Buffer de Reordenação ──────
-    expected_seq = 100  # Próximo byte esperado
-    recv_buffer = {}    # Pacotes fora de ordem {seq_num: payload}
-    
-    # ────── QUESTÃO 5: Criptografia ──────
-    security = Security()
-    encryption_negotiated = False
-    
-    LOSS_PROBABILITY = 0.05  # 5% de perda para simulação
-    packet_count = 0
-    packets_delivered = 0
-    packets_lost = 0
-    progress_interval = 500 if not verbose else 1
-
     print(f"\n{'═'*70}")
-    print(f"🚀 SERVIDOR INICIADO")
+    print(f"🚀 SERVIDOR INICIADO ({mode_label})")
     print(f"{'═'*70}")
-    print(f"  • Endereço: {SERVER_IP}:{SERVER_PORT}")
+    print(f"  • Endereço: {address[0]}:{address[1]}")
     print(f"  • Buffer: {BUFFER_SIZE}b")
-    print(f"  • Esperando seq_num inicial: {expected_seq}")
-    print(f"  • Simulação de perda: {LOSS_PROBABILITY*100}%")
-    print(f"  • Modo: {'VERBOSE (detalhado)' if verbose else 'BENCHMARK (resumido)'}")
+    print(f"  • Esperando seq_num inicial: {INITIAL_SEQ} (por cliente)")
+    print(f"  • Sessões ociosas expiram em: {server.sessions.idle_timeout:.0f}s")
+    print(f"  • Simulação de perda: {server.loss_probability*100}%")
+    if server.crypto_pipeline is not None:
+        pool = 'processos' if server.crypto_pipeline.processes else 'threads'
+        print(f"  • Descriptografia: pool de {server.crypto_pipeline.workers} {pool}")
+    print(f"  • Modo: {'VERBOSE (detalhado)' if server.verbose else 'BENCHMARK (resumido)'}")
     print(f"{'═'*70}\n")
     print("⏳ Aguardando conexões...\n")
+
+
+@contextlib.contextmanager
+def _closing_trace(server):
+    """Fecha o rastro (cabeçalho atualizado) ao encerrar o servidor."""
+    try:
+        yield
+    finally:
+        if server.trace is not None:
+            server.trace.close()
+            print(f"\n📼 Rastro salvo: {server.trace.path} ({server.trace.count} registros)")
+
+
+@contextlib.contextmanager
+def _delivery_report(server):
+    """Resumo do que a aplicação recebeu, ao encerrar o servidor."""
+    try:
+        yield
+    finally:
+        server.flush_deliveries(wait=True)
+        sink = server.on_deliver
+        if isinstance(sink, DeliverySink):
+            print(f"\n📨 Aplicação: {sink.segments} segmentos, {sink.total_bytes} bytes em claro "
+                  f"de {len(sink.bytes_by_addr)} cliente(s)")
+        if server.decrypt_dropped:
+            print(f"⚠️  {server.decrypt_dropped} segmento(s) descartado(s) com o pool de "
+                  f"descriptografia cheio")
+
+
+def _make_logger(verbose, log_json=None):
+    return EventLogger("servidor", level=DEBUG if verbose else INFO, json_path=log_json)
+
+
+def _start_metrics(server, metrics_port):
+    """Sobe o endpoint Prometheus (metricas.py) se metrics_port foi dado."""
+    if metrics_port is None:
+        return
+    registry = MetricsRegistry(prefix="server_")
+    server.register_metrics(registry)
+    http = start_http_server(registry, metrics_port)
+    print(f"📡 Métricas: http://{http.server_address[0]}:{http.server_address[1]}/metrics\n")
+
+
+def _make_profiler(server, profile_path, memory_path, sample_every):
+    """perfil.Profiler do laço (None sem --profile/--trace-memory)."""
+    profiler = perfil.make_profiler("servidor", profile_path, memory_path, sample_every)
+    if profiler is not None:
+        profiler.attach(server, "handle_datagram")   # Fronteira de pacote para --amostra=N
+    return profiler
+
+
+def _make_crypto_pipeline(crypto_workers, crypto_processes):
+    if crypto_workers <= 0:
+        return None
+    return CryptoPipeline(workers=crypto_workers, max_pending=CRYPTO_MAX_PENDING,
+                          processes=crypto_processes)
+
+
+def _serve_datagram(server, transport, data, addr, now):
+    """Trata um datagrama e envia o ACK (comum ao laço e ao modo por callback)."""
+    ack_pkt, _ = server.handle_datagram(data, addr, now)
+    if ack_pkt is not None:
+        ack_pkt.send_to(transport, addr)
+    server.flush_deliveries()
+
+
+def attach_server(server, transport):
+    """Liga o servidor a um transporte por callback, sem laço próprio.
     
-    while True:
-        try:
-            data, addr = sock.recvfrom(BUFFER_SIZE)
-            packet_count += 1
-            
-            if verbose:
-                print(f"\n{'='*70}")
-                print(f"📥 PACOTE RECEBIDO #{packet_count}")
-                print(f"{'='*70}")
-                print(f"  De: {addr}")
-                print(f"  Tamanho bruto: {len(data)}b")
-            
-            # ────── SIMULAÇÃO DE PERDA ──────
-            if random.random() < LOSS_PROBABILITY:
-                packets_lost += 1
-                if verbose:
-                    print(f"\n❌ PACOTE PERDIDO (simulação {LOSS_PROBABILITY*100}%)")
-                    print(f"   Cliente detectará via timeout ou ACK duplicado")
-                    print(f"{'='*70}\n")
-                continue
-            
-            pkt = Packet.from_bytes(data)
-            
-            if verbose:
-                print(f"\n📦 PACOTE DECODIFICADO:")
-                print(f"  • seq_num = {pkt.seq_num}")
-                print(f"  • ack_num = {pkt.ack_num}")
-                print(f"  • flags = {bin(pkt.flags)} {_format_flags(pkt.flags)}")
-                print(f"  • window = {pkt.window}b")
-                print(f"  • payload = {len(pkt.payload)}b")
-            
-            # ────── QUESTÃO 5: HANDSHAKE DE CRIPTOGRAFIA ──────
-            if pkt.flags & SYN and pkt.flags & ENC:
-                if verbose:
-                    print(f"\n{'─'*70}")
-                    print(f"🔐 [Q5] HANDSHAKE DE CRIPTOGRAFIA")
-                    print(f"{'─'*70}")
-                
-                key = pkt.payload
-                security.set_key(key)
-                encryption_negotiated = True
-                
-                if verbose:
-                    print(f"  • Chave recebida: {key.hex()}")
-                    print(f"  • Tamanho: {len(key)} bytes")
-                    print(f"  • Algoritmo: XOR (simétrico)")
-                    print(f"  ✅ Criptografia habilitada")
-                
-                # Envia ACK confirmando
-                ack_pkt = Packet(seq_num=0, ack_num=0, flags=ACK|ENC, window=BUFFER_SIZE)
-                sock.sendto(ack_pkt.to_bytes(), addr)
-                if verbose:
-                    print(f"  → ACK enviado confirmando criptografia")
-                    print(f"{'─'*70}\n")
-                continue
-            
-            # ────── QUESTÃO 5: DESCRIPTOGRAFIA ──────
-            if pkt.flags & ENC and encryption_negotiated:
-                if verbose:
-                    print(f"\n{'─'*70}")
-                    print(f"🔓 [Q5] DESCRIPTOGRAFANDO PAYLOAD")
-                    print(f"{'─'*70}")
-                    
-                    encrypted = pkt.payload[:40] if len(pkt.payload) >= 40 else pkt.payload
-                pkt.payload = security.decrypt(pkt.payload)
-                
-                if verbose:
-                    print(f"  • Criptografado: {encrypted}...")
-                    print(f"  • Descriptografado: {pkt.payload[:40]}...")
-                    print(f"  ✅ Descriptografia concluída")
-                    print(f"{'─'*70}\n")
-            
-            # ────── QUESTÃO 1: ORDENAÇÃO POR SEQ_NUM ──────
-            if verbose:
-                print(f"{'─'*70}")
-                print(f"[Q1] ORDENAÇÃO POR NÚMERO DE SEQUÊNCIA")
-                print(f"{'─'*70}")
-                print(f"  • Esperado: seq={expected_seq}")
-                print(f"  • Recebido: seq={pkt.seq_num}")
-                print(f"  • Payload: {len(pkt.payload)}b")
-            
-            # Caso 1: Pacote na ordem correta
-            if pkt.seq_num == expected_seq:
-                packets_delivered += 1
-                
-                if verbose:
-                    print(f"  ✅ ORDEM CORRETA!")
-                    print(f"     Entregando para aplicação...")
-                    
-                    # "Entrega" para aplicação (aqui apenas mostramos)
-                    payload_preview = pkt.payload[:50] if len(pkt.payload) >= 50 else pkt.payload
-                    print(f"     Dados: {payload_preview}")
-                
-                # Avança esperado
-                expected_seq += len(pkt.payload)
-                
-                if verbose:
-                    print(f"     Próximo esperado: seq={expected_seq}")
-                
-                # Caso 2: Verifica se há pacotes no buffer que agora podem ser processados
-                delivered_count = 0
-                while expected_seq in recv_buffer:
-                    if verbose:
-                        print(f"\n  ➡️  Recuperando do buffer: seq={expected_seq}")
-                    buffered_payload = recv_buffer.pop(expected_seq)
-                    expected_seq += len(buffered_payload)
-                    delivered_count += 1
-                    packets_delivered += 1
-                    if verbose:
-                        print(f"     Próximo esperado: seq={expected_seq}")
-                
-                if delivered_count > 0 and verbose:
-                    print(f"  📦 {delivered_count} pacote(s) entregue(s) do buffer")
-                
-                # Progresso em benchmark
-                if not verbose and packets_delivered % progress_interval == 0:
-                    loss_pct = (packets_lost / packet_count * 100) if packet_count > 0 else 0
-                    print(f"[{packets_delivered:>6} pacotes] {len(recv_buffer)} no buffer | "
-                          f"perdidos={packets_lost} ({loss_pct:.1f}%)")
-                    
-            # Caso 3: Pacote fora de ordem (futuro) -> Armazena no buffer
-            elif pkt.seq_num > expected_seq:
-                if verbose:
-                    print(f"  ⚠️  FORA DE ORDEM (adiantado)")
-                    print(f"     Guardando no buffer...")
-                recv_buffer[pkt.seq_num] = pkt.payload
-                gap = pkt.seq_num - expected_seq
-                if verbose:
-                    print(f"     Faltam {gap}b até este pacote")
-                    print(f"     Buffer agora tem {len(recv_buffer)} pacote(s)")
-                
-            # Caso 4: Pacote duplicado ou atrasado
-            else:
-                if verbose:
-                    print(f"  🔁 DUPLICADO/ATRASADO (descartando)")
-                    print(f"     Este seq_num já foi processado")
-            
-            if verbose:
-                print(f"{'─'*70}\n")
+    Usado com a rede em memória (transporte.MemoryNetwork): cada datagrama
+    é tratado no instante virtual em que chega.
+    """
+    transport.on_datagram(
+        lambda data, addr: _serve_datagram(server, transport, data, addr, transport.time()))
+    return server
 
-            # ────── QUESTÃO 3: CONTROLE DE FLUXO ──────
-            bytes_no_buffer = sum(len(payload) for payload in recv_buffer.values())
-            janela_disponivel = max(0, BUFFER_SIZE - bytes_no_buffer)
-            
-            if verbose:
-                print(f"{'─'*70}")
-                print(f"[Q3] CONTROLE DE FLUXO (JANELA DO RECEPTOR)")
-                print(f"{'─'*70}")
-                
-                print(f"  • Buffer total: {BUFFER_SIZE}b")
-                print(f"  • Bytes no buffer: {bytes_no_buffer}b ({len(recv_buffer)} pacotes)")
-                print(f"  • Janela disponível (rwnd): {janela_disponivel}b")
-                
-                percent = (bytes_no_buffer / BUFFER_SIZE) * 100 if BUFFER_SIZE > 0 else 0
-                print(f"  • Uso do buffer: {percent:.1f}%")
+
+def run_server(verbose=True, idle_timeout=SESSION_IDLE_TIMEOUT, crypto_workers=0,
+               crypto_processes=False, transport=None, port=SERVER_PORT,
+               loss_probability=LOSS_PROBABILITY, log_json=None, trace_path=None,
+               metrics_port=None, profile_path=None, memory_path=None, sample_every=1):
+    """Laço bloqueante do servidor. port=0 escolhe uma porta efêmera (exibida no banner).
+    
+    log_json: arquivo que recebe também os eventos do registro, um JSON por linha.
+    trace_path: grava o rastro binário por datagrama (ver rastro.py).
+    metrics_port: expõe as métricas no formato Prometheus (0 = porta livre).
+    profile_path / memory_path: cProfile / tracemalloc do laço de recepção,
+    amostrando 1 a cada sample_every datagramas (ver perfil.py).
+    """
+    log = _make_logger(verbose, log_json)
+    server = ReliableServer(verbose=verbose, idle_timeout=idle_timeout,
+                            loss_probability=loss_probability, on_deliver=DeliverySink(log),
+                            crypto_pipeline=_make_crypto_pipeline(crypto_workers, crypto_processes),
+                            log=log,
+                            trace=rastro.PacketTrace(path=trace_path) if trace_path else None)
+    transport = transport or UDPTransport(bind_addr=(SERVER_IP, port))
+    _print_banner(server, "laço bloqueante", transport.address)
+    _start_metrics(server, metrics_port)
+    profiler = _make_profiler(server, profile_path, memory_path, sample_every)
+    
+    # Timeout curto para varrer sessões ociosas mesmo sem tráfego
+    transport.settimeout(SESSION_SWEEP_INTERVAL)
+    last_sweep = transport.time()
+    
+    # Prints diretos do laço passam pela fila do registro (ordem preservada)
+    with server.log.capture_stdout(), _closing_trace(server), _delivery_report(server), \
+        perfil.profiling(profiler):
+        while True:
+            try:
+                try:
+                    data, addr = transport.recvfrom(BUFFER_SIZE)
+                except socket.timeout:
+                    data = None
+                    server.flush_deliveries(wait=True)   # Ocioso: pode esperar o pool
                 
-                if janela_disponivel < BUFFER_SIZE * 0.2:
-                    print(f"  ⚠️  Buffer ficando cheio!")
-                elif janela_disponivel == BUFFER_SIZE:
-                    print(f"  ✅ Buffer vazio (janela máxima)")
+                # ────── Despejo de sessões ociosas ──────
+                now = transport.time()
+                if now - last_sweep >= SESSION_SWEEP_INTERVAL:
+                    last_sweep = now
+                    server.evict_idle(now)
+                if data is None:
+                    continue
                 
-                print(f"{'─'*70}\n")
-
-            # ────── QUESTÃO 2: ACK CUMULATIVO ──────
-            if verbose:
-                print(f"{'─'*70}")
-                print(f"[Q2] ENVIANDO ACK CUMULATIVO")
-                print(f"{'─'*70}")
-                print(f"  • ack_num = {expected_seq} (próximo byte que espero)")
-                print(f"  • window = {janela_disponivel}b (quanto posso receber)")
-                print(f"  📝 Significado: 'Recebi tudo até byte {expected_seq-1}, envie a partir de {expected_seq}'")
-                print(f"{'─'*70}\n")
-            
-            ack_pkt = Packet(seq_num=0, 
-                             ack_num=expected_seq, 
-                             flags=ACK, 
-                             window=janela_disponivel)
-            sock.sendto(ack_pkt.to_bytes(), addr)
-            
-            if verbose:
-                print(f"✅ ACK ENVIADO")
-                print(f"{'='*70}\n")
+                _serve_datagram(server, transport, data, addr, now)
+
+            except Exception as e:
+                server.log.flush()
+                print(f"\n❌ ERRO: {e}")
+                import traceback
+                traceback.print_exc()
+                print()
+
 
+# ═══════════════════════════════════════════════════════════════════════════
+# SERVIDOR ASSÍNCRONO (asyncio)
+# ═══════════════════════════════════════════════════════════════════════════
+# Mesma lógica do ReliableServer, mas dirigida por um event loop: cada
+# datagrama é tratado em datagram_received, e os temporizadores (despejo de
+# sessões ociosas, ACKs atrasados) são agendados com loop.call_later, sem
+# que um fluxo bloqueie os demais.
+# ═══════════════════════════════════════════════════════════════════════════
+
+class ServerProtocol(asyncio.DatagramProtocol):
+    """DatagramProtocol que envolve o ReliableServer.
+    
+    Com delayed_ack=True, ACKs de pacotes em ordem são retidos por até
+    ack_delay segundos ou até o segundo segmento (como no TCP); ACKs de
+    handshake, pacotes fora de ordem e duplicados saem imediatamente.
+    """
+    
+    def __init__(self, server, delayed_ack=False, ack_delay=ACK_DELAY):
+        self.server = server
+        self.delayed_ack = delayed_ack
+        self.ack_delay = ack_delay
+        self.transport = None
+        self._pending_acks = {}   # {addr: [ack_pkt, segmentos_retidos, TimerHandle]}
+        self._sweep_handle = None
+    
+    def connection_made(self, transport):
+        self.transport = transport
+        self._schedule_sweep()
+    
+    def connection_lost(self, exc):
+        if self._sweep_handle is not None:
+            self._sweep_handle.cancel()
+        for _, _, handle in self._pending_acks.values():
+            handle.cancel()
+        self._pending_acks.clear()
+    
+    def error_received(self, exc):
+        print(f"\n❌ ERRO DE SOCKET: {exc}")
+    
+    def datagram_received(self, data, addr):
+        try:
+            ack_pkt, immediate = self.server.handle_datagram(data, addr, time.time())
         except Exception as e:
             print(f"\n❌ ERRO: {e}")
             import traceback
             traceback.print_exc()
             print()
+            return
+        
+        self._send_ack(addr, ack_pkt, immediate)
+        self.server.flush_deliveries()
+    
+    def _send_ack(self, addr, ack_pkt, immediate):
+        if ack_pkt is None:
+            return
+        
+        if not self.delayed_ack or immediate:
+            # O novo ACK é cumulativo: substitui qualquer ACK retido
+            self._cancel_pending(addr)
+            self.transport.sendto(ack_pkt.to_bytes(), addr)
+            return
+        
+        pending = self._pending_acks.get(addr)
+        if pending is None:
+            handle = asyncio.get_running_loop().call_later(self.ack_delay, self._flush_ack, addr)
+            self._pending_acks[addr] = [ack_pkt, 1, handle]
+        else:
+            pending[0] = ack_pkt
+            pending[1] += 1
+            if pending[1] >= 2:
+                self._flush_ack(addr)
+    
+    def _cancel_pending(self, addr):
+        pending = self._pending_acks.pop(addr, None)
+        if pending is not None:
+            pending[2].cancel()
+    
+    def _flush_ack(self, addr):
+        """Envia o ACK retido de addr (temporizador ou segundo segmento)."""
+        pending = self._pending_acks.pop(addr, None)
+        if pending is None:
+            return
+        pending[2].cancel()
+        self.transport.sendto(pending[0].to_bytes(), addr)
+    
+    def _schedule_sweep(self):
+        loop = asyncio.get_running_loop()
+        self._sweep_handle = loop.call_later(SESSION_SWEEP_INTERVAL, self._sweep)
+    
+    def _sweep(self):
+        """Temporizador periódico de despejo de sessões ociosas."""
+        for addr in self.server.evict_idle(time.time()):
+            self._cancel_pending(addr)
+        self.server.flush_deliveries()
+        self._schedule_sweep()
+
+
+async def serve_async(server, delayed_ack=False, host=SERVER_IP, port=SERVER_PORT):
+    """Atende o servidor em um event loop asyncio até ser cancelado."""
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(
+        lambda: ServerProtocol(server, delayed_ack=delayed_ack),
+        local_addr=(host, port))
+    try:
+        await asyncio.Event().wait()
+    finally:
+        transport.close()
+
+
+def run_server_async(verbose=True, idle_timeout=SESSION_IDLE_TIMEOUT, delayed_ack=False,
+                     crypto_workers=0, crypto_processes=False, port=SERVER_PORT,
+                     loss_probability=LOSS_PROBABILITY, log_json=None, trace_path=None,
+                     metrics_port=None, profile_path=None, memory_path=None, sample_every=1):
+    """Equivalente a run_server, mas usando asyncio (ServerProtocol)."""
+    log = _make_logger(verbose, log_json)
+    server = ReliableServer(verbose=verbose, idle_timeout=idle_timeout,
+                            loss_probability=loss_probability, on_deliver=DeliverySink(log),
+                            crypto_pipeline=_make_crypto_pipeline(crypto_workers, crypto_processes),
+                            log=log,
+                            trace=rastro.PacketTrace(path=trace_path) if trace_path else None)
+    _print_banner(server, f"asyncio{', ACK atrasado' if delayed_ack else ''}", (SERVER_IP, port))
+    _start_metrics(server, metrics_port)
+    profiler = _make_profiler(server, profile_path, memory_path, sample_every)
+    try:
+        with server.log.capture_stdout(), _closing_trace(server), _delivery_report(server), \
+            perfil.profiling(profiler):
+            asyncio.run(serve_async(server, delayed_ack=delayed_ack, port=port))
+    except KeyboardInterrupt:
+        print("\n[SERVIDOR] Encerrado")
+
 
 def _format_flags(flags):
     """Formata flags para exibição."""
@@ -251,13 +799,49 @@ def _format_flags(flags):
     if flags & ACK: flag_str.append("ACK")
     if flags & FIN: flag_str.append("FIN")
     if flags & ENC: flag_str.append("ENC")
+    if flags & SACK: flag_str.append("SACK")
     return f"({'|'.join(flag_str) if flag_str else 'NONE'})"
 
 if __name__ == "__main__":
     import sys
+    import signal
+    
+    # SIGTERM (ex.: benchmark.py) encerra pelo caminho normal: fecha o rastro
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     
     # Opções via linha de comando
     benchmark = "--benchmark" in sys.argv or "--eval" in sys.argv or "-b" in sys.argv
+    use_async = "--async" in sys.argv
+    delayed_ack = "--delayed-ack" in sys.argv
+    crypto_processes = "--crypto-processes" in sys.argv
+    crypto_workers = 2 if crypto_processes else 0
+    port = SERVER_PORT
+    loss_probability = LOSS_PROBABILITY
+    log_json = None
+    trace_path = None
+    metrics_port = None
+    profile_path = None
+    memory_path = None
+    sample_every = 1
+    for arg in sys.argv[1:]:
+        if arg.startswith("--crypto-workers="):
+            crypto_workers = int(arg.split("=", 1)[1])
+        elif arg.startswith("--porta="):
+            port = int(arg.split("=", 1)[1])          # 0 = porta efêmera
+        elif arg.startswith("--perda="):
+            loss_probability = float(arg.split("=", 1)[1])
+        elif arg.startswith("--log-json="):
+            log_json = arg.split("=", 1)[1]      # Eventos também em JSON (uma linha cada)
+        elif arg.startswith("--rastro="):
+            trace_path = arg.split("=", 1)[1]    # Rastro binário por datagrama (rastro.py)
+        elif arg.startswith("--metricas="):
+            metrics_port = int(arg.split("=", 1)[1])   # Endpoint Prometheus (0 = porta livre)
+        elif arg == "--profile" or arg.startswith("--profile="):
+            profile_path = arg.split("=", 1)[1] if "=" in arg else "servidor.pstats"
+        elif arg == "--trace-memory" or arg.startswith("--trace-memory="):
+            memory_path = arg.split("=", 1)[1] if "=" in arg else "servidor.memoria"
+        elif arg.startswith("--amostra="):
+            sample_every = int(arg.split("=", 1)[1])   # Perfila 1 a cada N datagramas
     
     if benchmark:
         print("\n🔬 Modo: BENCHMARK/AVALIAÇÃO - 10.000 PACOTES (logs resumidos)\n")
@@ -265,4 +849,16 @@ if __name__ == "__main__":
         print("\n📝 Modo: DETALHADO (logs detalhados)")
         print("📊 Use --benchmark ou -b para modo avaliação (10.000 pacotes)\n")
     
-    run_server(verbose=not benchmark)
+    if use_async:
+        run_server_async(verbose=not benchmark, delayed_ack=delayed_ack,
+                         crypto_workers=crypto_workers, crypto_processes=crypto_processes,
+                         port=port, loss_probability=loss_probability, log_json=log_json,
+                         trace_path=trace_path, metrics_port=metrics_port,
+                         profile_path=profile_path, memory_path=memory_path,
+                         sample_every=sample_every)
+    else:
+        run_server(verbose=not benchmark, crypto_workers=crypto_workers,
+                   crypto_processes=crypto_processes, port=port,
+                   loss_probability=loss_probability, log_json=log_json,
+                   trace_path=trace_path, metrics_port=metrics_port,
+                   profile_path=profile_path, memory_path=memory_path, sample_every=sample_every)
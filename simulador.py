@@ -0,0 +1,49 @@
+"""
+Simulador de Eventos Discretos - Trabalho Final Redes de Computadores (UFJF)
+
+Relógio virtual + fila de eventos (heap). Nada dorme: o relógio salta
+direto para o instante do próximo evento, então simular 1 segundo ou
+1 hora de rede custa apenas o processamento dos eventos.
+"""
+
+import heapq
+import itertools
+
+
+class EventLoop:
+    """Laço de eventos com relógio virtual (segundos a partir de 0)."""
+
+    def __init__(self):
+        self.now = 0.0
+        self._queue = []                    # (instante, desempate, callback, args)
+        self._counter = itertools.count()   # Mantém a ordem FIFO entre empates
+        self._stopped = False
+
+    def schedule(self, delay, callback, *args):
+        """Agenda callback(*args) para daqui a `delay` segundos virtuais."""
+        heapq.heappush(self._queue, (self.now + delay, next(self._counter), callback, args))
+
+    def call_at(self, when, callback, *args):
+        """Agenda callback(*args) para o instante virtual `when`."""
+        heapq.heappush(self._queue, (max(when, self.now), next(self._counter), callback, args))
+
+    def stop(self):
+        """Faz run() retornar logo após o callback atual."""
+        self._stopped = True
+
+    def run(self, until=None):
+        """Processa eventos em ordem de tempo até a fila esvaziar, `until` ou stop()."""
+        queue = self._queue
+        self._stopped = False
+        while queue and not self._stopped:
+            when = queue[0][0]
+            if until is not None and when > until:
+                self.now = until
+                break
+            _, _, callback, args = heapq.heappop(queue)
+            self.now = when
+            callback(*args)
+        return self.now
+
+    def __len__(self):
+        return len(self._queue)
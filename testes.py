@@ -3,16 +3,19 @@ Testes do Trabalho Final - Redes de Computadores
 Arquivo para documentar e testar cada questão do trabalho
 """
 
+import io
 import socket
-import time
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from utils import *
+from transporte import UDPTransport, MemoryNetwork
 
 
 # =============================================================================
 # QUESTÃO 1: Entrega ordenada para aplicação (baseada no número de sequência)
 # =============================================================================
 
-def teste_questao_1():
+def teste_questao_1(transport=None, server_addr=(SERVER_IP, SERVER_PORT)):
     """
     Testa a entrega ordenada de pacotes com base no número de sequência.
     
@@ -25,7 +28,7 @@ def teste_questao_1():
     print("TESTE - QUESTÃO 1: Entrega Ordenada de Pacotes")
     print("="*70)
     
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock = transport or UDPTransport()
     sock.settimeout(2.0)
     
     # Teste 1.1: Envio de pacotes em ordem
@@ -45,7 +48,7 @@ def teste_questao_1():
             else:
                 print(f"  → Enviando seq={base_seq}: {msg.decode()}")
             
-            sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+            sock.sendto(pkt.to_bytes(), server_addr)
             
             try:
                 data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -59,7 +62,7 @@ def teste_questao_1():
                     print(f"  ✗ Timeout após {max_retries} tentativas!")
         
         base_seq += len(msg)
-        time.sleep(0.5)
+        sock.sleep(0.5)
     
     # Teste 1.2: Envio de pacotes fora de ordem (simulando rede)
     print("\n[Teste 1.2] Enviando pacotes FORA de ordem...")
@@ -109,7 +112,7 @@ def teste_questao_1():
             else:
                 print(f"  → Enviando seq={seq}: {pkt_info['descricao']}")
             
-            sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+            sock.sendto(pkt.to_bytes(), server_addr)
             
             try:
                 data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -122,7 +125,7 @@ def teste_questao_1():
                 else:
                     print(f"  ✗ Timeout após {max_retries} tentativas!")
         
-        time.sleep(0.5)
+        sock.sleep(0.5)
     
     # Atualiza base_seq para o próximo teste
     base_seq = seq_atual
@@ -136,7 +139,7 @@ def teste_questao_1():
     for i in range(3):
         pkt = Packet(seq_num=seq_dup, ack_num=0, flags=0, window=0, payload=msg_dup)
         print(f"  → Enviando duplicata {i+1} com seq={seq_dup}")
-        sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+        sock.sendto(pkt.to_bytes(), server_addr)
         
         try:
             data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -145,7 +148,7 @@ def teste_questao_1():
         except socket.timeout:
             print("  ✗ Timeout ao aguardar ACK")
         
-        time.sleep(0.3)
+        sock.sleep(0.3)
     
     sock.close()
     print("\n" + "="*70)
@@ -157,7 +160,7 @@ def teste_questao_1():
 # QUESTÃO 2: Confirmação acumulativa (ACK acumulativo)
 # =============================================================================
 
-def teste_questao_2():
+def teste_questao_2(transport=None, server_addr=(SERVER_IP, SERVER_PORT)):
     """
     Testa o ACK acumulativo do servidor.
     
@@ -170,7 +173,7 @@ def teste_questao_2():
     print("TESTE - QUESTÃO 2: Confirmação Acumulativa (ACK)")
     print("="*70)
     
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock = transport or UDPTransport()
     sock.settimeout(2.0)
     
     # Teste 2.1: ACK acumulativo em sequência normal
@@ -186,7 +189,7 @@ def teste_questao_2():
         esperado_ack = base_seq + len(msg)
         
         print(f"  → Enviando seq={base_seq}, payload={len(msg)}b")
-        sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+        sock.sendto(pkt.to_bytes(), server_addr)
         
         try:
             data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -205,7 +208,7 @@ def teste_questao_2():
             print("  ✗ Timeout ao aguardar ACK")
             break
         
-        time.sleep(0.3)
+        sock.sleep(0.3)
     
     # Teste 2.2: ACK acumulativo com pacotes fora de ordem
     print("\n[Teste 2.2] ACK acumulativo com pacotes FORA de ordem...")
@@ -235,7 +238,7 @@ def teste_questao_2():
         pkt = Packet(seq_num=pkt_info['seq'], ack_num=0, flags=0, window=0, payload=pkt_info['msg'])
         
         print(f"  → Enviando '{pkt_info['label']}' (seq={pkt_info['seq']})")
-        sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+        sock.sendto(pkt.to_bytes(), server_addr)
         
         try:
             data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -253,7 +256,7 @@ def teste_questao_2():
         except socket.timeout:
             print("  ✗ Timeout")
         
-        time.sleep(0.3)
+        sock.sleep(0.3)
     
     # Teste 2.3: Re-envio de ACK acumulativo (duplicata)
     print("\n[Teste 2.3] Re-envio de ACK quando recebe pacote duplicado...")
@@ -264,7 +267,7 @@ def teste_questao_2():
     pkt = Packet(seq_num=base_seq, ack_num=0, flags=0, window=0, payload=msg)
     
     print(f"  → Enviando pacote original (seq={base_seq})")
-    sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+    sock.sendto(pkt.to_bytes(), server_addr)
     
     try:
         data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -272,11 +275,11 @@ def teste_questao_2():
         primeiro_ack = ack_pkt.ack_num
         print(f"  ← Primeiro ACK: ack_num={primeiro_ack}")
         
-        time.sleep(0.3)
+        sock.sleep(0.3)
         
         # Envia DUPLICATA do mesmo pacote
         print(f"  → Enviando DUPLICATA (seq={base_seq})")
-        sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+        sock.sendto(pkt.to_bytes(), server_addr)
         
         data, addr = sock.recvfrom(BUFFER_SIZE)
         ack_pkt2 = Packet.from_bytes(data)
@@ -301,7 +304,7 @@ def teste_questao_2():
 # QUESTÃO 3: Controle de fluxo (janela do destinatário)
 # =============================================================================
 
-def teste_questao_3():
+def teste_questao_3(transport=None, server_addr=(SERVER_IP, SERVER_PORT)):
     """
     Testa o controle de fluxo baseado na janela do receptor.
     
@@ -315,7 +318,7 @@ def teste_questao_3():
     print("TESTE - QUESTÃO 3: Controle de Fluxo (Janela do Receptor)")
     print("="*70)
     
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock = transport or UDPTransport()
     sock.settimeout(2.0)
     
     # Teste 3.1: Verificação da janela inicial
@@ -327,7 +330,7 @@ def teste_questao_3():
     pkt = Packet(seq_num=base_seq, ack_num=0, flags=0, window=0, payload=msg)
     
     print(f"  → Enviando pacote (seq={base_seq})")
-    sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+    sock.sendto(pkt.to_bytes(), server_addr)
     
     try:
         data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -342,7 +345,7 @@ def teste_questao_3():
         print("  ✗ Timeout")
     
     base_seq += len(msg)
-    time.sleep(0.3)
+    sock.sleep(0.3)
     
     # Teste 3.2: Encher o buffer com pacotes fora de ordem
     print("\n[Teste 3.2] Enchendo buffer com pacotes FORA de ordem...")
@@ -368,7 +371,7 @@ def teste_questao_3():
         pkt = Packet(seq_num=seq, ack_num=0, flags=0, window=0, payload=payload)
         
         print(f"  → Enviando pacote {i+1} (seq={seq}) - FORA DE ORDEM")
-        sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+        sock.sendto(pkt.to_bytes(), server_addr)
         
         try:
             data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -388,7 +391,7 @@ def teste_questao_3():
         except socket.timeout:
             print("  ✗ Timeout")
         
-        time.sleep(0.2)
+        sock.sleep(0.2)
     
     # Verifica se janela diminuiu
     if len(janelas_observadas) >= 2:
@@ -403,7 +406,7 @@ def teste_questao_3():
     
     pkt = Packet(seq_num=primeiro_seq, ack_num=0, flags=0, window=0, payload=primeiro_payload)
     print(f"  → Enviando pacote 1 (seq={primeiro_seq}) - O QUE FALTAVA!")
-    sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+    sock.sendto(pkt.to_bytes(), server_addr)
     
     try:
         data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -429,7 +432,7 @@ def teste_questao_3():
     # Consulta janela atual
     msg_teste = b"X" * 10
     pkt = Packet(seq_num=base_seq, ack_num=0, flags=0, window=0, payload=msg_teste)
-    sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+    sock.sendto(pkt.to_bytes(), server_addr)
     
     try:
         data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -449,7 +452,7 @@ def teste_questao_3():
         for i in range(max_pacotes):
             payload = bytes([i]) * tamanho_pacote
             pkt = Packet(seq_num=base_seq, ack_num=0, flags=0, window=0, payload=payload)
-            sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+            sock.sendto(pkt.to_bytes(), server_addr)
             
             data, addr = sock.recvfrom(BUFFER_SIZE)
             ack_pkt = Packet.from_bytes(data)
@@ -487,7 +490,7 @@ def teste_questao_3():
         payload = bytes([ord('X') + (i % 20)]) * tamanho_payload_overflow
         pkt = Packet(seq_num=seq, ack_num=0, flags=0, window=0, payload=payload)
         
-        sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+        sock.sendto(pkt.to_bytes(), server_addr)
         
         try:
             data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -511,7 +514,7 @@ def teste_questao_3():
         except socket.timeout:
             print(f"  ✗ Timeout no pacote {i+1}")
         
-        time.sleep(0.1)
+        sock.sleep(0.1)
     
     print(f"\n  📊 Análise do overflow:")
     if len(janelas_overflow) > 0:
@@ -543,7 +546,7 @@ def teste_questao_3():
 # QUESTÃO 4: Controle de Congestionamento (AIMD - TCP Reno)
 # =============================================================================
 
-def teste_questao_4():
+def teste_questao_4(transport=None, server_addr=(SERVER_IP, SERVER_PORT)):
     """
     Testa o controle de congestionamento baseado no TCP Reno.
     REQUER: Servidor rodando (python3 servidor.py)
@@ -572,7 +575,7 @@ def teste_questao_4():
     print("Equação: cwnd = cwnd + MSS")
     print("-" * 50)
     
-    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock = transport or UDPTransport()
     sock.settimeout(2.0)
     
     # Criar controle de congestionamento
@@ -593,7 +596,7 @@ def teste_questao_4():
         old_cwnd = cc.cwnd
         print(f"  [{i+1}] Enviando seq={base_seq} ({len(msg)}b)...")
         
-        sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+        sock.sendto(pkt.to_bytes(), server_addr)
         
         try:
             data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -613,7 +616,7 @@ def teste_questao_4():
             print(f"      ✗ Timeout!")
             break
         
-        time.sleep(0.3)
+        sock.sleep(0.3)
     
     # Verificar resultado do Slow Start
     print(f"\n  📊 Resultado Slow Start:")
@@ -653,7 +656,7 @@ def teste_questao_4():
         old_cwnd = cc2.cwnd
         old_phase = cc2.get_phase()
         
-        sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+        sock.sendto(pkt.to_bytes(), server_addr)
         
         try:
             data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -674,7 +677,7 @@ def teste_questao_4():
             print(f"      ✗ Timeout!")
             break
         
-        time.sleep(0.3)
+        sock.sleep(0.3)
     
     if transicao_detectada:
         print(f"\n  ✓ Transição Slow Start → Congestion Avoidance verificada!")
@@ -706,7 +709,7 @@ def teste_questao_4():
         
         old_cwnd = cc3.cwnd
         
-        sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+        sock.sendto(pkt.to_bytes(), server_addr)
         
         try:
             data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -727,7 +730,7 @@ def teste_questao_4():
             print(f"      ✗ Timeout!")
             break
         
-        time.sleep(0.3)
+        sock.sleep(0.3)
     
     soma = sum(incrementos)
     print(f"\n  📊 Resultado Congestion Avoidance:")
@@ -851,7 +854,7 @@ def teste_questao_4():
     # Consulta rwnd do servidor
     msg_teste = b"TesteJanela"
     pkt = Packet(seq_num=base_seq3, ack_num=0, flags=0, window=0, payload=msg_teste)
-    sock.sendto(pkt.to_bytes(), (SERVER_IP, SERVER_PORT))
+    sock.sendto(pkt.to_bytes(), server_addr)
     
     try:
         data, addr = sock.recvfrom(BUFFER_SIZE)
@@ -904,6 +907,269 @@ def teste_questao_4():
     print("="*70)
 
 
+# =============================================================================
+# EXECUÇÃO EM MEMÓRIA (sem servidor, relógio virtual)
+# =============================================================================
+# Cada teste recebe uma MemoryNetwork própria com um ReliableServer ligado
+# por callback (servidor.attach_server). Os sleeps e timeouts correm no
+# relógio virtual: os testes levam milissegundos, são reprodutíveis pela
+# semente e, como as redes são independentes, podem rodar em paralelo.
+
+TESTES = {
+    "1": teste_questao_1,
+    "2": teste_questao_2,
+    "3": teste_questao_3,
+    "4": teste_questao_4,
+}
+
+
+def executar_em_memoria(teste, loss=0.0, delay=0.0001, jitter=0.0, reorder=0.0, seed=0):
+    """Executa um teste contra um servidor em memória; retorna a rede usada."""
+    from servidor import ReliableServer, attach_server
+    
+    network = MemoryNetwork(loss=loss, delay=delay, jitter=jitter, reorder=reorder, seed=seed)
+    server = ReliableServer(verbose=False, loss_probability=0.0)
+    attach_server(server, network.endpoint((SERVER_IP, SERVER_PORT)))
+    teste(transport=network.endpoint(), server_addr=(SERVER_IP, SERVER_PORT))
+    return network
+
+
+def _executar_capturado(numero, loss, seed):
+    """Executa um teste em memória capturando a saída (para rodar em paralelo)."""
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        network = executar_em_memoria(TESTES[numero], loss=loss, seed=seed)
+    return output.getvalue(), network.time()
+
+
+def executar_todos_em_memoria(numeros=tuple(TESTES), loss=0.0, seed=0, paralelo=False):
+    """Executa os testes escolhidos em memória, em série ou em processos separados."""
+    if not paralelo:
+        for numero in numeros:
+            executar_em_memoria(TESTES[numero], loss=loss, seed=seed)
+        return
+    with ProcessPoolExecutor() as pool:
+        resultados = list(pool.map(_executar_capturado, numeros,
+                                   [loss] * len(numeros), [seed] * len(numeros)))
+    for numero, (saida, tempo_virtual) in zip(numeros, resultados):
+        print(saida, end="")
+        print(f"[Questão {numero}: {tempo_virtual:.3f}s de tempo virtual]")
+
+
+# =============================================================================
+# TESTES UNITÁRIOS (asserções sobre cada componente, sem rede)
+# =============================================================================
+# Cada teste alimenta um componente isolado e confere o resultado com
+# assert; executar_unitarios() roda todos e retorna o número de falhas.
+
+def _segmento(seq, tamanho=500, agora=0.0):
+    """Entrada do buffer de retransmissão como Sender.send_packet a monta."""
+    return {'payload': bytes(tamanho), 'timestamp': agora, 'first_sent': agora,
+            'retransmitted': False}
+
+
+def teste_unitario_sack():
+    """Blocos SACK: ida e volta pelo payload e limite de MAX_SACK_BLOCKS."""
+    from servidor import ReorderBuffer
+
+    blocos = [(600, 1100), (2100, 3100), (4100, 4600)]
+    payload = encode_sack_blocks(blocos)
+    assert len(payload) == 8 * len(blocos), f"payload com {len(payload)} bytes"
+    assert decode_sack_blocks(payload) == blocos, decode_sack_blocks(payload)
+    assert decode_sack_blocks(payload + b"\x00" * 3) == blocos, "bloco incompleto decodificado"
+    assert decode_sack_blocks(b"") == []
+
+    # Seis intervalos fora de ordem: só MAX_SACK_BLOCKS vão no ACK, o mais recente primeiro
+    buffer = ReorderBuffer()
+    for seq in (6100, 1100, 2100, 3100, 4100, 5100):     # Buraco de 500b entre cada um
+        buffer.insert(seq, bytes(500))
+    blocos = buffer.sack_blocks()
+    assert len(blocos) == MAX_SACK_BLOCKS, blocos
+    assert blocos[0] == (5100, 5600), f"mais recente deveria vir primeiro: {blocos}"
+    assert blocos[1:] == [(1100, 1600), (2100, 2600), (3100, 3600)], blocos
+    assert decode_sack_blocks(encode_sack_blocks(blocos)) == blocos
+
+
+def teste_unitario_reordenacao():
+    """ReorderBuffer: nada sai antes do buraco; depois, entrega em ordem até o próximo."""
+    from servidor import ReorderBuffer
+
+    buffer = ReorderBuffer()
+    for seq in (1100, 600, 2100):                         # Faltam 100 e 1600
+        buffer.insert(seq, bytes(500))
+    assert buffer.sack_blocks() == [(2100, 2600), (600, 1600)], buffer.sack_blocks()
+    assert list(buffer.drain(100)) == [], "entregou com o buraco em 100"
+
+    buffer.insert(100, bytes(500))
+    entregues = [seq for seq, _ in buffer.drain(100)]
+    assert entregues == [100, 600, 1100], entregues
+    assert buffer.sack_blocks() == [(2100, 2600)], buffer.sack_blocks()
+    assert buffer.buffered_bytes == 500 and len(buffer) == 1
+
+    buffer.insert(1600, bytes(500))                       # Fecha o último buraco
+    entregues = [seq for seq, _ in buffer.drain(1600)]
+    assert entregues == [1600, 2100], entregues
+    assert buffer.sack_blocks() == [] and buffer.buffered_bytes == 0
+
+
+def teste_unitario_fila_retransmissao():
+    """RetransmissionQueue: scoreboard SACK, buracos e liberação pelo ACK cumulativo."""
+    from cliente import RetransmissionQueue
+
+    fila = RetransmissionQueue()
+    for seq in range(100, 2600, 500):                     # 100, 600, ..., 2100
+        fila.append(seq, _segmento(seq))
+    assert fila.mark_sacked(1100, 2100) == 2
+    assert fila.mark_sacked(1100, 2100) == 0, "bloco repetido marcou de novo"
+    assert fila.sacked_bytes == 1000 and fila.highest_sacked == 2100
+    assert [e['seq'] for e in fila.holes()] == [100, 600], [e['seq'] for e in fila.holes()]
+
+    liberados = fila.release(1600)
+    assert [e['seq'] for e in liberados] == [100, 600, 1100], [e['seq'] for e in liberados]
+    assert fila.sacked_bytes == 500, fila.sacked_bytes
+    assert fila.oldest()['seq'] == 1600 and len(fila) == 2
+    assert 1100 not in fila and 2100 in fila
+    assert list(fila.holes()) == [], "1600 está confirmado por SACK"
+
+
+def teste_unitario_karn():
+    """Algoritmo de Karn: ACK que cobre segmento retransmitido não gera amostra de RTT."""
+    from cliente import Sender
+
+    rede = MemoryNetwork(seed=0)
+    sender = Sender(timeout=0.2, verbose=False, transport=rede.endpoint())
+    relogio = sender.transport
+
+    for seq in (100, 600):
+        sender.unacked_packets.append(seq, _segmento(seq, agora=relogio.time()))
+    sender.unacked_packets[600]['retransmitted'] = True
+    relogio.sleep(0.050)
+    sender._remove_acked_packets(1100)
+    assert sender.rtt.samples == 0, "amostra de segmento retransmitido foi usada"
+    assert sender.rtt.srtt is None
+
+    sender.unacked_packets.append(1100, _segmento(1100, agora=relogio.time()))
+    relogio.sleep(0.030)
+    sender._remove_acked_packets(1600)
+    assert sender.rtt.samples == 1, sender.rtt.samples
+    assert abs(sender.rtt.srtt - 0.030) < 1e-9, sender.rtt.srtt
+    sender.transport.close()
+
+
+def teste_unitario_rto():
+    """RTTEstimator: RTO limitado a [min_rto, max_rto], com piso de granularidade."""
+    from cliente import RTTEstimator
+
+    assert RTTEstimator(initial_rto=50.0, max_rto=10.0).rto == 10.0
+    assert RTTEstimator(initial_rto=0.0, min_rto=0.1).rto == 0.1
+
+    estimador = RTTEstimator(initial_rto=1.0, min_rto=0.1, max_rto=2.0)
+    estimador.on_sample(0.001)                            # 0.001 + 4·0.0005 < min_rto
+    assert estimador.rto == 0.1, estimador.rto
+    estimador.on_sample(5.0)                              # Muito acima de max_rto
+    assert estimador.rto == 2.0, estimador.rto
+    for _ in range(5):
+        estimador.on_timeout()                            # Backoff não passa do teto
+    assert estimador.rto == 2.0, estimador.rto
+
+    # Sem jitter RTTVAR tende a 0: o termo G impede RTO == SRTT
+    estimador = RTTEstimator(initial_rto=1.0, min_rto=0.0, granularity=0.001)
+    for _ in range(200):
+        estimador.on_sample(0.010)
+    assert estimador.rto >= estimador.srtt + 0.001 - 1e-12, (estimador.srtt, estimador.rto)
+
+
+def teste_unitario_cubic():
+    """CUBIC: redução multiplicativa com β = 0.7 (e piso de 2·MSS)."""
+    from congestionamento import create_congestion_control
+
+    cc = create_congestion_control("cubic", verbose=False)
+    assert cc.BETA == 0.7
+    cc.cwnd = 100 * MSS
+    cc.on_loss(verbose=False)
+    assert abs(cc.cwnd - 70 * MSS) < 1e-6, cc.cwnd
+    assert abs(cc.ssthresh - 70 * MSS) < 1e-6, cc.ssthresh
+    assert cc.w_max == 100 * MSS, cc.w_max
+
+    cc.cwnd = 60 * MSS                                    # Abaixo do W_max anterior
+    cc.on_timeout(verbose=False)
+    assert cc.cwnd == MSS and abs(cc.ssthresh - 42 * MSS) < 1e-6, (cc.cwnd, cc.ssthresh)
+    assert abs(cc.w_max - 60 * MSS * 1.7 / 2) < 1e-6, "fast convergence"
+
+    cc.cwnd = 2 * MSS
+    cc.on_loss(verbose=False)
+    assert cc.ssthresh == 2 * MSS, cc.ssthresh
+
+
+def teste_unitario_histograma():
+    """Histogram: potências exatas de 2 caem no balde do próprio limite (le inclusivo)."""
+    from metricas import Histogram
+
+    histograma = Histogram("h", "teste", start=1.0, buckets=4)   # Limites 1, 2, 4, 8
+    assert histograma.bounds == [1.0, 2.0, 4.0, 8.0]
+    esperados = {0.0: 0, 0.5: 0, 1.0: 0, 1.0000001: 1, 2.0: 1, 3.0: 2, 4.0: 2,
+                 8.0: 3, 8.0000001: 4, 1e9: 4}
+    for valor, balde in esperados.items():
+        antes = list(histograma.counts)
+        histograma.observe(valor)
+        mudou = [i for i, (a, b) in enumerate(zip(antes, histograma.counts)) if a != b]
+        assert mudou == [balde], f"{valor} foi para o balde {mudou}, esperado {balde}"
+
+    amostras = dict(histograma.samples())
+    assert amostras['h_bucket{le="1.0"}'] == 3 and amostras['h_bucket{le="8.0"}'] == 8
+    assert amostras['h_bucket{le="+Inf"}'] == amostras['h_count'] == len(esperados)
+
+
+def teste_unitario_rastro():
+    """PacketTrace: ao dar a volta no buffer circular, só os mais recentes, em ordem."""
+    from rastro import PacketTrace, SEND
+
+    rastro = PacketTrace(capacity=4)
+    for i in range(4):
+        rastro.record(float(i), SEND, i, 0, 0, 0, 0.0)
+    assert list(rastro.records()['seq']) == [0, 1, 2, 3]  # Cheio, sem volta
+
+    for i in range(4, 10):
+        rastro.record(float(i), SEND, i, 0, 0, 0, 0.0)
+    registros = rastro.records()
+    assert list(registros['seq']) == [6, 7, 8, 9], list(registros['seq'])
+    assert list(registros['t']) == [6.0, 7.0, 8.0, 9.0]
+
+
+TESTES_UNITARIOS = {
+    "SACK (codificação e limite de blocos)": teste_unitario_sack,
+    "Buffer de reordenação": teste_unitario_reordenacao,
+    "Fila de retransmissão": teste_unitario_fila_retransmissao,
+    "Algoritmo de Karn": teste_unitario_karn,
+    "Limites do RTO": teste_unitario_rto,
+    "CUBIC (β = 0.7)": teste_unitario_cubic,
+    "Histograma (baldes de base 2)": teste_unitario_histograma,
+    "Rastro (buffer circular)": teste_unitario_rastro,
+}
+
+
+def executar_unitarios():
+    """Executa os testes unitários; retorna o número de falhas."""
+    print("\n" + "="*70)
+    print("TESTES UNITÁRIOS")
+    print("="*70)
+    falhas = 0
+    for nome, teste in TESTES_UNITARIOS.items():
+        try:
+            teste()
+        except AssertionError as e:
+            falhas += 1
+            print(f"  ✗ {nome}: {e}")
+        except Exception as e:
+            falhas += 1
+            print(f"  ✗ {nome}: {type(e).__name__}: {e}")
+        else:
+            print(f"  ✓ {nome}")
+    print("="*70)
+    print(f"{len(TESTES_UNITARIOS) - falhas}/{len(TESTES_UNITARIOS)} testes unitários passaram")
+    return falhas
+
+
 # =============================================================================
 # MENU PRINCIPAL
 # =============================================================================
@@ -921,6 +1187,8 @@ def menu_testes():
         print("3. Questão 3 - Controle de fluxo (janela do receptor)")
         print("4. Questão 4 - Controle de congestionamento (TCP Reno)")
         print("5. Executar todos os testes (1-4)")
+        print("6. Executar todos os testes em memória (sem servidor)")
+        print("7. Testes unitários (asserções, sem rede)")
         print("0. Sair")
         print("="*70)
         
@@ -940,6 +1208,10 @@ def menu_testes():
             teste_questao_2()
             teste_questao_3()
             teste_questao_4()
+        elif escolha == "6":
+            executar_todos_em_memoria()
+        elif escolha == "7":
+            executar_unitarios()
         elif escolha == "0":
             print("\nEncerrando testes...")
             break
@@ -950,6 +1222,22 @@ def menu_testes():
 
 
 if __name__ == "__main__":
+    import sys
+    
+    # --memoria: todos os testes contra um servidor em memória (sem terminal extra)
+    # --paralelo: um processo por teste | --perda=0.05: perda na rede virtual
+    # --unitarios: testes unitários (código de saída 1 se algum falhar)
+    if "--unitarios" in sys.argv:
+        sys.exit(1 if executar_unitarios() else 0)
+    
+    if "--memoria" in sys.argv or "--paralelo" in sys.argv:
+        loss = 0.0
+        for arg in sys.argv[1:]:
+            if arg.startswith("--perda="):
+                loss = float(arg.split("=", 1)[1])
+        executar_todos_em_memoria(loss=loss, paralelo="--paralelo" in sys.argv)
+        sys.exit(0)
+    
     print("""
     ╔══════════════════════════════════════════════════════════════════╗
     ║         TESTES - TRABALHO FINAL DE REDES DE COMPUTADORES        ║
@@ -959,6 +1247,7 @@ if __name__ == "__main__":
     de executar os testes!
     
     Execute em outro terminal: python3 servidor.py
+    (ou rode sem servidor: python3 testes.py --memoria)
     """)
     
     menu_testes()
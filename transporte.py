@@ -0,0 +1,208 @@
+"""
+Camada de Transporte de Datagramas - Trabalho Final Redes de Computadores (UFJF)
+
+Interface mínima usada por cliente, servidor e testes, no formato de um
+socket UDP (sendto/sendmsg/recvfrom/settimeout/setblocking) mais:
+    - time():               relógio do transporte
+    - sleep(s):             espera no relógio do transporte
+    - wait_readable(t):     espera até haver datagrama ou vencer t segundos
+    - on_datagram(handler): entrega por callback (servidor em memória)
+
+Implementações:
+    - UDPTransport:    socket UDP real, relógio de parede
+    - MemoryNetwork:   rede em memória com relógio virtual (simulador.EventLoop),
+                       perda, atraso, jitter e reordenação injetáveis e
+                       reprodutíveis por semente. Cada rede é independente,
+                       então vários cenários podem rodar em paralelo.
+
+Os erros seguem os do socket: socket.timeout quando o prazo vence e
+BlockingIOError em leitura não bloqueante sem dados.
+"""
+
+import socket
+import time
+import random
+import itertools
+import selectors
+from collections import deque
+from simulador import EventLoop
+
+
+class UDPTransport:
+    """Transporte sobre um socket UDP real (métodos do socket sem indireção)."""
+
+    def __init__(self, bind_addr=None, sock=None):
+        self.sock = sock or socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        if bind_addr is not None:
+            self.sock.bind(bind_addr)
+        # Caminho quente: chamadas vão direto para o socket
+        self.sendto = self.sock.sendto
+        self.recvfrom = self.sock.recvfrom
+        self.settimeout = self.sock.settimeout
+        self.gettimeout = self.sock.gettimeout
+        self.setblocking = self.sock.setblocking
+        if hasattr(self.sock, 'sendmsg'):
+            self.sendmsg = self.sock.sendmsg
+        self.time = time.time
+        self.sleep = time.sleep
+        self._selector = None
+
+    @property
+    def address(self):
+        return self.sock.getsockname()
+
+    def wait_readable(self, timeout):
+        """Espera até timeout segundos por um datagrama; retorna se há algo a ler."""
+        if self._selector is None:
+            self._selector = selectors.DefaultSelector()
+            self._selector.register(self.sock, selectors.EVENT_READ)
+        return bool(self._selector.select(timeout=max(0.0, timeout)))
+
+    def close(self):
+        if self._selector is not None:
+            self._selector.close()
+            self._selector = None
+        self.sock.close()
+
+
+# ═══════════════════════════════════════════════════════════════════════════
+# REDE EM MEMÓRIA (relógio virtual)
+# ═══════════════════════════════════════════════════════════════════════════
+# Cada sendto vira um evento de chegada no EventLoop da rede, após o atraso
+# sorteado. Quem espera (recvfrom/wait_readable/sleep) faz o relógio
+# avançar processando os eventos até o seu datagrama chegar ou o prazo
+# vencer: nada dorme de verdade, e a mesma semente reproduz a mesma troca.
+# ═══════════════════════════════════════════════════════════════════════════
+
+class MemoryNetwork:
+    """Rede em memória com perda, atraso, jitter e reordenação injetáveis.
+
+    loss:          probabilidade de descartar cada datagrama
+    delay:         atraso de propagação em um sentido (segundos virtuais)
+    jitter:        atraso extra uniforme em [0, jitter]
+    reorder:       probabilidade de um datagrama ser atrasado em
+                   reorder_delay a mais (os seguintes o ultrapassam)
+    """
+
+    def __init__(self, loss=0.0, delay=0.0001, jitter=0.0, reorder=0.0,
+                 reorder_delay=None, seed=None):
+        self.loss = loss
+        self.delay = delay
+        self.jitter = jitter
+        self.reorder = reorder
+        self.reorder_delay = reorder_delay if reorder_delay is not None else 2 * delay
+        self.rng = random.Random(seed)
+        self.loop = EventLoop()
+        self.endpoints = {}
+        self._ports = itertools.count(40000)
+        self.datagrams_sent = 0
+        self.datagrams_dropped = 0
+
+    def time(self):
+        return self.loop.now
+
+    def endpoint(self, addr=None):
+        """Cria um transporte ligado a addr (ou a uma porta livre)."""
+        if addr is None:
+            addr = ('127.0.0.1', next(self._ports))
+        if addr in self.endpoints:
+            raise OSError(f"Endereço em uso: {addr}")
+        transport = MemoryTransport(self, addr)
+        self.endpoints[addr] = transport
+        return transport
+
+    def _transmit(self, data, src, dst):
+        self.datagrams_sent += 1
+        rng = self.rng
+        if self.loss and rng.random() < self.loss:
+            self.datagrams_dropped += 1
+            return
+        latency = self.delay
+        if self.jitter:
+            latency += rng.uniform(0, self.jitter)
+        if self.reorder and rng.random() < self.reorder:
+            latency += self.reorder_delay
+        self.loop.schedule(latency, self._arrive, data, src, dst)
+
+    def _arrive(self, data, src, dst):
+        endpoint = self.endpoints.get(dst)
+        if endpoint is None:
+            self.datagrams_dropped += 1      # Ninguém escutando: descarta, como o UDP
+            return
+        if endpoint.handler is not None:
+            endpoint.handler(data, src)
+            return
+        endpoint.inbox.append((data, src))
+        if endpoint.waiting:
+            self.loop.stop()
+
+
+class MemoryTransport:
+    """Ponta de uma MemoryNetwork, com a mesma interface do UDPTransport."""
+
+    def __init__(self, network, addr):
+        self.network = network
+        self.address = addr
+        self.inbox = deque()
+        self.handler = None          # Callback(data, addr): entrega sem fila
+        self.waiting = False
+        self._timeout = None
+        self._blocking = True
+
+    def time(self):
+        return self.network.loop.now
+
+    def sendto(self, data, addr):
+        self.network._transmit(bytes(data), self.address, addr)
+        return len(data)
+
+    def sendmsg(self, buffers, ancdata=(), flags=0, address=None):
+        return self.sendto(b''.join(buffers), address)
+
+    def on_datagram(self, handler):
+        """Entrega cada datagrama a handler(data, addr) assim que ele chega."""
+        self.handler = handler
+
+    def settimeout(self, timeout):
+        self._timeout = timeout
+        self._blocking = timeout is None or timeout > 0
+
+    def gettimeout(self):
+        return self._timeout
+
+    def setblocking(self, flag):
+        self.settimeout(None if flag else 0.0)
+
+    def wait_readable(self, timeout):
+        """Avança o relógio virtual até chegar um datagrama ou vencer timeout."""
+        if self.inbox:
+            return True
+        loop = self.network.loop
+        deadline = None if timeout is None else loop.now + max(0.0, timeout)
+        self.waiting = True
+        try:
+            loop.run(until=deadline)
+        finally:
+            self.waiting = False
+        if not self.inbox and deadline is not None and loop.now < deadline:
+            loop.now = deadline      # Fila vazia: o prazo passa mesmo assim
+        return bool(self.inbox)
+
+    def recvfrom(self, bufsize):
+        if not self.inbox:
+            if not self._blocking:
+                raise BlockingIOError("nenhum datagrama disponível")
+            if not self.wait_readable(self._timeout):
+                raise socket.timeout("timed out")
+        data, addr = self.inbox.popleft()
+        return data[:bufsize], addr
+
+    def sleep(self, seconds):
+        """Dorme no relógio virtual (os eventos do intervalo são processados)."""
+        loop = self.network.loop
+        deadline = loop.now + seconds
+        loop.run(until=deadline)
+        loop.now = max(loop.now, deadline)
+
+    def close(self):
+        self.network.endpoints.pop(self.address, None)
@@ -1,6 +1,9 @@
 import struct
 import socket
 import random
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from functools import lru_cache
 
 # Configurações
 SERVER_IP = '127.0.0.1'
@@ -13,6 +16,16 @@ SYN = 0b00000001
 ACK = 0b00000010
 FIN = 0b00000100
 ENC = 0b00001000  # Flag indicando pacote criptografado
+SACK = 0b00010000 # Flag indicando blocos SACK no payload do ACK
+
+# SACK: cada bloco [início, fim) ocupa 8 bytes no payload do ACK
+MAX_SACK_BLOCKS = 4
+SACK_BLOCK_FORMAT = '!II'
+SACK_BLOCK = struct.Struct(SACK_BLOCK_FORMAT)
+
+# Cabeçalho: seq_num (4) | ack_num (4) | flags (2) | window (2)
+HEADER = struct.Struct('!IIHH')   # Pré-compilado: sem reinterpretar o formato a cada pacote
+HEADER_SIZE = HEADER.size
 
 # Estados da Conexão
 STATE_CLOSED = 0
@@ -22,6 +35,8 @@ STATE_SYN_RCVD = 3
 STATE_ESTABLISHED = 4
 STATE_FIN_WAIT = 5
 
+_HAS_SENDMSG = hasattr(socket.socket, 'sendmsg')
+
 class Security:
     """Implementa criptografia simples (XOR) para Questão 5."""
     
@@ -30,15 +45,10 @@ class Security:
         self.encryption_enabled = False
     
     def encrypt(self, data):
-        """Criptografa dados com XOR."""
+        """Criptografa dados com XOR (byte i ^ key[i % len(key)])."""
         if not self.encryption_enabled or not data:
             return data
-        
-        output = bytearray()
-        key_len = len(self.key)
-        for i, byte in enumerate(data):
-            output.append(byte ^ self.key[i % key_len])
-        return bytes(output)
+        return xor_with_key(data, self.key)
     
     def decrypt(self, data):
         """Descriptografa dados (XOR é simétrico)."""
@@ -52,9 +62,81 @@ class Security:
     
     def set_key(self, key):
         """Define chave de criptografia."""
-        self.key = key
+        self.key = bytes(key)
         self.encryption_enabled = True
 
+
+@lru_cache(maxsize=256)
+def _keystream(key, length):
+    """Chave repetida até `length` bytes, como inteiro (cache por (chave, tamanho))."""
+    repeated = key * (length // len(key) + 1)
+    return int.from_bytes(repeated[:length], 'big')
+
+
+def xor_with_key(data, key):
+    """XOR do payload inteiro com a chave repetida, de uma vez só.
+
+    Converte payload e keystream em inteiros grandes e faz um único XOR
+    (em C), em vez de um laço Python por byte. O resultado é idêntico ao
+    esquema byte a byte: saída[i] = data[i] ^ key[i % len(key)].
+    """
+    length = len(data)
+    value = int.from_bytes(data, 'big') ^ _keystream(bytes(key), length)
+    return value.to_bytes(length, 'big')
+
+
+class CryptoPipeline:
+    """Estágio de cifra fora do laço de rede (pool de threads ou processos).
+
+    submit() entrega o XOR a um worker e devolve na hora; ready() gera os
+    resultados já prontos na ordem de submissão, parando no primeiro ainda
+    pendente, de modo que a ordem de entrega é sempre preservada. A fila é
+    limitada e submit() nunca espera o pool: com max_pending itens pendentes
+    ele recusa o novo item (retorna False) e quem chama decide o que fazer.
+    """
+
+    def __init__(self, workers=2, max_pending=64, processes=False):
+        executor_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+        self.executor = executor_cls(max_workers=workers)
+        self.workers = workers
+        self.processes = processes
+        self.max_pending = max_pending
+        self._pending = deque()   # (future, tag) em ordem de submissão
+
+    def submit(self, data, key, tag=None):
+        """Agenda XOR(data, key); tag acompanha o resultado em ready().
+
+        Retorna False, sem agendar, se a fila está cheia (não bloqueia).
+        """
+        if len(self._pending) >= self.max_pending:
+            return False
+        if self.processes:
+            data = bytes(data)             # memoryview não é serializável
+        future = self.executor.submit(xor_with_key, data, key)
+        self._pending.append((future, tag))
+        return True
+
+    def full(self):
+        return len(self._pending) >= self.max_pending
+
+    def ready(self):
+        """Gera (tag, resultado) dos itens concluídos, em ordem."""
+        while self._pending and self._pending[0][0].done():
+            future, tag = self._pending.popleft()
+            yield tag, future.result()
+
+    def drain(self):
+        """Espera e gera todos os itens pendentes, em ordem."""
+        while self._pending:
+            future, tag = self._pending.popleft()
+            yield tag, future.result()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+    def __len__(self):
+        return len(self._pending)
+
 class Packet:
     def __init__(self, seq_num, ack_num, flags, window, payload=b''):
         self.seq_num = seq_num
@@ -63,21 +145,34 @@ class Packet:
         self.window = window
         self.payload = payload
 
+    def header_bytes(self):
+        return HEADER.pack(self.seq_num, self.ack_num, self.flags, self.window)
+
     def to_bytes(self):
-        header = struct.pack('!IIHH', self.seq_num, self.ack_num, self.flags, self.window)
-        return header + self.payload
+        return self.header_bytes() + self.payload
+
+    def send_to(self, sock, addr):
+        """Envia o pacote sem concatenar cabeçalho e payload.
+
+        Com sendmsg o kernel junta os dois buffers (scatter/gather), então o
+        payload nunca é copiado em Python; sem sendmsg (Windows) cai no
+        sendto(to_bytes()).
+        """
+        if not self.payload:
+            return sock.sendto(self.header_bytes(), addr)
+        if _HAS_SENDMSG:
+            return sock.sendmsg([self.header_bytes(), self.payload], (), 0, addr)
+        return sock.sendto(self.to_bytes(), addr)
 
     @staticmethod
     def from_bytes(packet_bytes):
+        """Decodifica um datagrama; o payload é uma memoryview (sem cópia)."""
         # Verifica se o pacote tem o tamanho mínimo do cabeçalho
-        if len(packet_bytes) < 12:
+        if len(packet_bytes) < HEADER_SIZE:
             raise ValueError("Pacote muito pequeno / corrompido")
-            
-        header_size = struct.calcsize('!IIHH')
-        header = packet_bytes[:header_size]
-        payload = packet_bytes[header_size:]
         
-        seq_num, ack_num, flags, window = struct.unpack('!IIHH', header)
+        seq_num, ack_num, flags, window = HEADER.unpack_from(packet_bytes)
+        payload = memoryview(packet_bytes)[HEADER_SIZE:]
         return Packet(seq_num, ack_num, flags, window, payload)
 
     def __repr__(self):
@@ -86,4 +181,20 @@ class Packet:
         if self.flags & ACK: flag_str.append("ACK")
         if self.flags & FIN: flag_str.append("FIN")
         if self.flags & ENC: flag_str.append("ENC")
+        if self.flags & SACK: flag_str.append("SACK")
         return f"[Seq={self.seq_num} | Ack={self.ack_num} | Win={self.window} | Flags={'|'.join(flag_str)} | Payload={len(self.payload)}b]"
+
+
+def encode_sack_blocks(blocks):
+    """Codifica blocos SACK [(início, fim), ...] para o payload do ACK."""
+    buffer = bytearray(SACK_BLOCK.size * len(blocks))
+    for i, (start, end) in enumerate(blocks):
+        SACK_BLOCK.pack_into(buffer, i * SACK_BLOCK.size, start, end)
+    return bytes(buffer)
+
+
+def decode_sack_blocks(payload):
+    """Decodifica o payload de um ACK com flag SACK em [(início, fim), ...]."""
+    block_size = SACK_BLOCK.size
+    return [SACK_BLOCK.unpack_from(payload, offset)
+            for offset in range(0, len(payload) - block_size + 1, block_size)]